@@ -1,13 +1,24 @@
-from flask import Flask, request, jsonify
-import pandas as pd
+from flask import Flask, Response, request, jsonify, stream_with_context
 import io
-import excel_reader
+import json
 import os
-import tempfile
-import db_processor
+import itertools
+import threading
+import time
+import job_store
+import import_journal
+import metrics
+import multipart_upload
+import upload_cache
 from dotenv import load_dotenv
 import logging
 from functools import wraps
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.exceptions import BadRequest, RequestEntityTooLarge
+
+# pandas 와 supabase 를 쓰는 모듈(excel_reader, db_processor, delta_index, validation)은
+# 처음 필요한 요청에서 import 한다. cold start 에서 GET / 같은 요청은 이 import 비용을 내지 않는다
+# (benchmarks/startup.py 로 import 시간 예산을 확인)
 
 # 환경 변수 로드
 load_dotenv()
@@ -17,6 +28,24 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
+# 요청 본문 최대 크기(byte). 넘으면 413 (워크북은 메모리에 받아서 파싱하므로 이 크기까지 메모리를 쓴다)
+app.config['MAX_CONTENT_LENGTH'] = int(os.getenv('MAX_CONTENT_LENGTH', str(200 * 1024 * 1024)))
+
+# 비동기 업로드(async=true) 작업 상태 저장소와 백그라운드 작업자
+jobs = job_store.JobStore()
+job_executor = ThreadPoolExecutor(max_workers=int(os.getenv('JOB_WORKERS', '2')))
+# 업로드 내용(sha256)별 이전 import 결과. 같은 파일을 다시 올리면 DB 에 쓰지 않고 이 결과를 반환한다
+uploads = upload_cache.UploadCache()
+# 검증에 실패했거나 적재하지 못한 행 (GET /quarantine). quarantine_store() 로 처음 쓸 때 만든다
+_quarantine = None
+_singleton_lock = threading.Lock()
+
+# GET /jobs/<id>/data 의 기본/최대 페이지 크기
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+def query_flag(name):
+    return request.args.get(name, 'false').lower() in ('1', 'true', 'yes')
 
 # 토큰 검증 데코레이터 함수
 def token_required(f):
@@ -36,10 +65,134 @@ def token_required(f):
         return f(*args, **kwargs)
     return decorated
 
+@app.errorhandler(RequestEntityTooLarge)
+def upload_too_large(e):
+    return jsonify({"error": f"Upload is larger than {app.config['MAX_CONTENT_LENGTH']} bytes"}), 413
+
+@app.errorhandler(BadRequest)
+def bad_request(e):
+    return jsonify({"error": e.description}), 400
+
 @app.route('/', methods=['GET'])
 def home():
     return jsonify({"message": "Welcome to the API"})
 
+def quarantine_store():
+    global _quarantine
+    if _quarantine is None:
+        with _singleton_lock:
+            if _quarantine is None:
+                import validation
+                _quarantine = validation.Quarantine()
+    return _quarantine
+
+def make_processor(resume, run_metrics=None, source=None, delta=False):
+    import db_processor
+    import delta_index
+    # resume=true 이면 파일 이름별 journal 로 이미 적재된 사건은 건너뛰고 upsert 로 쓴다
+    journal = import_journal.ImportJournal() if resume else None
+    # delta=true 이면 사건 시트에서 이전 업로드 이후 새로 생기거나 바뀐 행만 upsert 로 쓴다 (누적 export 용)
+    index = delta_index.DeltaIndex() if delta else None
+    # Supabase client 와 참조 테이블 캐시는 프로세스 전체에서 하나를 처음 쓸 때 만들어 공유하고,
+    # 요청별 집계(insert 수, 실패, metrics)를 담는 DataProcessor 만 요청마다 만든다
+    return db_processor.DataProcessor(journal=journal, metrics=run_metrics, quarantine=quarantine_store(), source=source,
+                                      delta_index=index, lookup_cache=db_processor.get_lookup_cache())
+
+def warm_up(preload_lookups=False):
+    """무거운 모듈 import 와 Supabase client, quarantine 생성을 미리 해 둔다. 단계별 소요 시간(초)을 반환한다.
+
+    preload_lookups=True 이면 참조 테이블(죄목, 처분, 업종, 업소)을 다시 조회해서 공유 캐시를 새 값으로 바꾼다.
+    """
+    timings = {}
+    started = time.perf_counter()
+    import excel_reader  # noqa: F401
+    import db_processor
+    timings['imports'] = round(time.perf_counter() - started, 4)
+
+    started = time.perf_counter()
+    db_processor.get_supabase_client()
+    quarantine_store()
+    timings['clients'] = round(time.perf_counter() - started, 4)
+
+    if preload_lookups:
+        started = time.perf_counter()
+        make_processor(False).preload_lookups()
+        timings['preload_lookups'] = round(time.perf_counter() - started, 4)
+    return timings
+
+def tee_frames(frames, sink):
+    # 적재하는 사건을 중첩 dict 로도 sink 에 넘긴다 (keep_data=true 는 job 저장소, format=ndjson 은 응답)
+    for sheet in frames:
+        sink(sheet.to_json())
+        yield sheet
+
+def ndjson_response(lines):
+    return Response(stream_with_context(line + '\n' for line in lines), mimetype='application/x-ndjson')
+
+def import_succeeded(summary):
+    # 요청 자체가 실패했거나, 실패한 batch 나 실패로 기록된 행이 있으면 캐시하지 않는다 (다시 올리면 실패한 행을 다시 시도)
+    # 모든 업로드 경로(/upload-csv, 비동기 job, /upload/<kind>)가 이 기준으로 캐시한다
+    return summary is not None and not summary.get('failed_batches') and not summary.get('failure_count')
+
+def upload_summary(summary, processor, reader):
+    # 적재 요약에 검증 단계에서 거부된 행 수를 더하고, 거부 이유도 일부 실패 내용(failures) 앞에 넣는다
+    summary = dict(summary or {}, **processor.import_summary(), rejected_rows=reader.rejected_rows)
+    summary['failures'] = (reader.rejections + summary['failures'])[:processor.max_failure_samples]
+    return summary
+
+def cached_response(cached, file_path=None):
+    # 같은 내용의 파일을 이미 처리했으면 이전 결과를 그대로 반환 (Supabase 요청 없음)
+    response = dict(cached, cached=True)
+    if request.args.get('format') != 'ndjson':
+        return jsonify(response), 200
+    # format=ndjson 은 저장해 둔 파싱 결과가 있으면 그것을, 없으면 업로드 파일을 다시 파싱해서 보낸다
+    job_id = cached.get('job_id')
+    if job_id is not None and jobs.count_data(job_id):
+        lines = jobs.iter_data(job_id)
+    else:
+        import excel_reader
+        sheet = excel_reader.ExcelReader().case_frame_from_csv(file_path) if file_path else None
+        cases = sheet.to_json() if sheet is not None else []
+        lines = (json.dumps(case, ensure_ascii=False, default=str) for case in cases)
+    return ndjson_response(itertools.chain([json.dumps(response, ensure_ascii=False, default=str)], lines))
+
+def run_case_import_job(job_id, file_path, source_key=None, keep_data=False, digest=None, filename=None, upload_size=0,
+                        delta=False):
+    jobs.start(job_id)
+
+    def on_batch(batch_summary):
+        # 쓰지 않은 행 중 delta import 에서 바뀌지 않았거나 journal 로 건너뛴 행은 실패가 아니므로
+        # 동기 업로드와 같이 실제로 실패로 기록된 수(failure_count)를 센다
+        jobs.increment(
+            job_id,
+            rows_parsed=batch_summary['dispositions'],
+            rows_inserted=batch_summary['rows_inserted'],
+            failures=batch_summary['failure_count']
+        )
+
+    try:
+        import excel_reader
+        run_metrics = metrics.Metrics(metrics.REGISTRY)
+        reader = excel_reader.ExcelReader(metrics=run_metrics, quarantine=quarantine_store(), source=filename)
+        frames = reader.iter_case_frames_from_csv(file_path)
+        if keep_data:
+            frames = tee_frames(frames, lambda records: jobs.append_data(job_id, records))
+        processor = make_processor(source_key is not None, run_metrics, filename, delta)
+        summary = processor.process_case_frames(frames, on_batch=on_batch, source_key=source_key)
+        summary = upload_summary(summary, processor, reader)
+        logger.info(f"Job {job_id} finished: {summary} {run_metrics.summary()}")
+        jobs.finish(job_id)
+        if digest is not None and import_succeeded(summary):
+            response = {"message": "File successfully processed", "summary": summary, "job_id": job_id}
+            if keep_data:
+                response["data_url"] = f"/jobs/{job_id}/data"
+            uploads.put(digest, filename, upload_size, response)
+    except Exception as e:
+        logger.error(f"Job {job_id} failed: {str(e)}")
+        jobs.finish(job_id, error=str(e))
+    finally:
+        os.remove(file_path)
+
 @app.route('/upload-csv', methods=['POST'])
 @token_required
 def upload_csv():
@@ -52,35 +205,275 @@ def upload_csv():
     if file.filename == '':
         return jsonify({"error": "No selected file"}), 400
 
+    resume = query_flag('resume')
+    source_key = file.filename if resume else None
+    delta = query_flag('delta')
+    # 이 업로드의 단계별 소요 시간과 Supabase 요청 수 (응답의 metrics)
+    run_metrics = metrics.Metrics(metrics.REGISTRY)
+
+    # force=true 이면 같은 내용의 업로드를 이미 처리했더라도 다시 적재한다
+    use_cache = not query_flag('force')
+    keep_data = query_flag('keep_data')
+    # async=true 는 항상 파일로 저장한 뒤 처리한다 (stream=true 무시)
+    stream = query_flag('stream') and not query_flag('async')
+    temp_file_path = None
+
     try:
-        # Save the uploaded file to a temporary location
-        temp_dir = tempfile.gettempdir()
-        temp_file_path = os.path.join(temp_dir, file.filename)
-        file.save(temp_file_path)
-        
-        # Process the file using ExcelReader
-        reader = excel_reader.ExcelReader()
-        
-        result = reader.case_data_from_csv(temp_file_path)
-        logger.info(f"Uploaded Result: {result}")
+        # stream=true 가 아니면 업로드를 임시 파일(클라이언트 파일 이름이 아닌 mkstemp 경로)에 쓰면서 sha256 을 계산한다
+        if not stream:
+            with run_metrics.stage('save_upload'):
+                temp_file_path, digest, upload_size = upload_cache.save_upload(file.stream, suffix='.csv')
+            cached = uploads.get(digest) if use_cache else None
+            if cached is not None:
+                logger.info(f"Upload cache hit for file: {file.filename} ({digest})")
+                try:
+                    return cached_response(cached, temp_file_path)
+                finally:
+                    os.remove(temp_file_path)
+
+        # async=true 이면 작업 id 를 바로 반환하고 백그라운드에서 처리 (/jobs/<id> 로 진행 상황 조회)
+        if query_flag('async'):
+            job_id = jobs.create(file.filename)
+            job_executor.submit(
+                run_case_import_job, job_id, temp_file_path, source_key, keep_data, digest, file.filename, upload_size, delta
+            )
+            temp_file_path = None  # 작업이 끝나면 작업자가 지운다
+            logger.info(f"Queued job {job_id} for file: {file.filename}")
+            return jsonify({
+                "message": "File accepted for processing",
+                "job_id": job_id,
+                "status_url": f"/jobs/{job_id}"
+            }), 202
+
+        # 기본 응답은 요약(건수, 생성된 사건 id, 일부 실패 내용)만 담는다.
+        # 파싱 결과 전체가 필요하면 keep_data=true (/jobs/<id>/data 로 페이지 단위 조회) 또는 format=ndjson 사용
+        ndjson = request.args.get('format') == 'ndjson'
+        job_id = jobs.create(file.filename) if keep_data else None
+        if job_id is not None:
+            jobs.start(job_id)
+
+        import excel_reader
+        reader = excel_reader.ExcelReader(metrics=run_metrics, quarantine=quarantine_store(), source=file.filename)
+        processor = make_processor(resume, run_metrics, file.filename, delta)
+
+        # stream=true 이면 업로드 스트림을 chunk 단위로 읽어 완성된 사건부터 바로 DB 에 쓴다.
+        # 이 경우 내용 전체를 읽기 전에는 hash 를 알 수 없으므로 캐시는 처리 후 저장만 한다
+        if stream:
+            hashing_stream = upload_cache.HashingReader(file.stream)
+            try:
+                frames = reader.iter_case_frames_from_csv(hashing_stream)
+            except ValueError as e:
+                logger.error(f"Error reading CSV file: {str(e)}")
+                return jsonify({"error": "Could not read CSV file"}), 400
+        else:
+            sheet = reader.case_frame_from_csv(temp_file_path)
+            if sheet is None:
+                return jsonify({"error": "Could not read CSV file"}), 400
+            frames = [sheet]
+
+        data = []
+        if ndjson:
+            frames = tee_frames(frames, data.extend)
+        if job_id is not None:
+            frames = tee_frames(frames, lambda records: jobs.append_data(job_id, records))
+
+        summary = None
         try:
-            db_processor.DataProcessor().process_case_sheet_data(result)
+            summary = processor.process_case_frames(frames, source_key=source_key)
         except Exception as e:
             logger.error(f"Error processing case sheet data: {str(e)}")
-        
-        os.remove(temp_file_path)
-        
-        logger.info(f"Processing file: {file.filename}")
-        
-        # Return the processed data
-        return jsonify({
+        succeeded = import_succeeded(summary)
+        # rejected_rows 는 검증 단계에서, quarantined 는 적재 단계에서 제외되어 quarantine 에 보관된 행 수
+        summary = upload_summary(summary, processor, reader)
+
+        if job_id is not None:
+            jobs.increment(
+                job_id,
+                rows_parsed=summary.get('dispositions', 0),
+                rows_inserted=summary.get('rows_inserted', 0),
+                failures=summary['failure_count']
+            )
+            jobs.finish(job_id)
+
+        logger.info(f"Processing file: {file.filename} {run_metrics.summary()}")
+        response = {
             "message": "File successfully processed",
-            "data": result
-        }), 200
+            "summary": summary
+        }
+        if job_id is not None:
+            response["job_id"] = job_id
+            response["data_url"] = f"/jobs/{job_id}/data"
+
+        if stream:
+            digest, upload_size = hashing_stream.digest, hashing_stream.size
+        if succeeded:
+            uploads.put(digest, file.filename, upload_size, response)
+        response["metrics"] = run_metrics.summary()
+
+        # format=ndjson 이면 첫 줄에 요약, 이후 한 줄에 사건 하나씩
+        if ndjson:
+            return ndjson_response(itertools.chain(
+                [json.dumps(response, ensure_ascii=False, default=str)],
+                (json.dumps(case, ensure_ascii=False, default=str) for case in data)
+            ))
+        return jsonify(response), 200
 
     except Exception as e:
         logger.error(f"Error processing file: {str(e)}")
         return jsonify({"error": str(e)}), 500
+    finally:
+        if temp_file_path is not None and os.path.exists(temp_file_path):
+            os.remove(temp_file_path)
+
+def import_sheet(reader, processor, kind, upload, csv, source_key=None):
+    # 시트 하나를 읽어서 적재하고 (요약, 성공 여부)를 반환한다. 읽지 못한 경우 요약은 None
+    if kind == 'cases':
+        # CSV 는 업로드를 받는 동안 chunk 단위로 파싱해서 완성된 사건부터 적재
+        if csv:
+            try:
+                frames = reader.iter_case_frames_from_csv(upload)
+            except ValueError as e:
+                logger.error(f"Error reading {kind} CSV: {str(e)}")
+                return None, False
+        else:
+            sheet = reader.read_sheet(upload, kind)
+            if sheet is None:
+                return None, False
+            frames = [sheet]
+        summary = processor.process_case_frames(frames, source_key=source_key)
+        return summary, import_succeeded(summary)
+
+    data = reader.read_sheet(upload, kind, csv=csv)
+    if data is None:
+        return None, False
+    if kind == 'reports':
+        ok = processor.process_report_frame(data, source_key=source_key)
+    else:
+        ok = processor.process_accusation_frame(data)
+    return {"records": len(data)}, ok
+
+# 사건(cases), 신고(reports), 고발(accusations) 시트를 .xlsx 또는 .csv 로 받아서 적재한다.
+# multipart 본문은 request.files(임시 파일 복사) 대신 MultipartFileReader 로 읽는다:
+# CSV 는 받는 동안 바로 파싱하고, 워크북(zip)은 끝까지 받아야 열 수 있으므로 메모리에 받은 뒤 파싱한다
+@app.route('/upload/<kind>', methods=['POST'])
+@token_required
+def upload_sheet(kind):
+    logger.info(f"Upload endpoint called: {kind}")
+    import excel_reader
+    if kind not in excel_reader.SHEET_KINDS:
+        return jsonify({"error": f"Unknown sheet kind: {kind} (choose from {', '.join(excel_reader.SHEET_KINDS)})"}), 404
+    boundary = request.mimetype_params.get('boundary')
+    if request.mimetype != 'multipart/form-data' or not boundary:
+        return jsonify({"error": "Expected a multipart/form-data upload"}), 400
+
+    run_metrics = metrics.Metrics(metrics.REGISTRY)
+    upload = multipart_upload.MultipartFileReader(request.stream, boundary, max_size=app.config['MAX_CONTENT_LENGTH'])
+    filename = upload.filename
+    if filename == '':
+        return jsonify({"error": "No selected file"}), 400
+    extension = os.path.splitext(filename.lower())[1]
+    csv = extension in excel_reader.CSV_EXTENSIONS
+    if not csv and extension not in excel_reader.WORKBOOK_EXTENSIONS:
+        return jsonify({"error": f"Unsupported file type: {extension or filename}"}), 400
+
+    resume = query_flag('resume')
+    source_key = f'{filename}:{kind}' if resume else None
+    hashing_stream = upload_cache.HashingReader(upload)
+    if csv:
+        source = hashing_stream
+    else:
+        with run_metrics.stage('receive_upload'):
+            source = io.BytesIO(hashing_stream.read())
+        # 워크북은 파싱 전에 hash 를 알 수 있으므로 같은 내용, 같은 시트 종류의 이전 결과를 그대로 반환
+        cached = uploads.get(f'{hashing_stream.digest}:{kind}') if not query_flag('force') else None
+        if cached is not None:
+            logger.info(f"Upload cache hit for file: {filename} ({kind})")
+            return jsonify(dict(cached, cached=True)), 200
+
+    reader = excel_reader.ExcelReader(metrics=run_metrics, quarantine=quarantine_store(), source=filename)
+    processor = make_processor(resume, run_metrics, filename, query_flag('delta') and kind == 'cases')
+    try:
+        summary, succeeded = import_sheet(reader, processor, kind, source, csv, source_key)
+    except RequestEntityTooLarge:
+        raise
+    except Exception as e:
+        logger.error(f"Error processing {kind} sheet: {str(e)}")
+        summary, succeeded = {}, False
+    if summary is None:
+        return jsonify({"error": f"Could not read {kind} sheet from {filename}"}), 400
+
+    summary = upload_summary(summary, processor, reader)
+    logger.info(f"Processing file: {filename} ({kind}) {run_metrics.summary()}")
+    response = {
+        "message": "File successfully processed",
+        "kind": kind,
+        "summary": summary
+    }
+    if succeeded and import_succeeded(summary):
+        uploads.put(f'{hashing_stream.digest}:{kind}', filename, hashing_stream.size, response)
+    response["metrics"] = run_metrics.summary()
+    return jsonify(response), 200
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+@token_required
+def get_job(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job), 200
+
+# keep_data=true 로 업로드한 작업의 파싱 결과. offset/limit 으로 페이지 단위 조회하거나 format=ndjson 으로 전체를 스트리밍
+@app.route('/jobs/<job_id>/data', methods=['GET'])
+@token_required
+def get_job_data(job_id):
+    if jobs.get(job_id) is None:
+        return jsonify({"error": "Job not found"}), 404
+
+    offset = max(request.args.get('offset', 0, type=int), 0)
+    if request.args.get('format') == 'ndjson':
+        return ndjson_response(jobs.iter_data(job_id, offset))
+
+    limit = min(max(request.args.get('limit', DEFAULT_PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+    total = jobs.count_data(job_id)
+    data = [json.loads(payload) for payload in jobs.iter_data(job_id, offset, limit)]
+    next_offset = offset + len(data)
+    return jsonify({
+        "job_id": job_id,
+        "offset": offset,
+        "limit": limit,
+        "total": total,
+        "next_offset": next_offset if next_offset < total else None,
+        "data": data
+    }), 200
+
+# 검증에 실패했거나 적재하지 못해 제외된 행과 그 이유. source(업로드 파일 이름)로 거를 수 있다
+@app.route('/quarantine', methods=['GET'])
+@token_required
+def get_quarantine():
+    source = request.args.get('source')
+    limit = min(max(request.args.get('limit', DEFAULT_PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+    return jsonify({
+        "source": source,
+        "total": quarantine_store().count(source),
+        "rows": list(quarantine_store().iter_rows(source, limit))
+    }), 200
+
+# cold start 직후(배포, cron 등)에 호출해서 첫 업로드 요청이 import/연결 비용을 내지 않도록 한다.
+# preload_lookups=true 이면 참조 테이블도 미리 조회 (다른 곳에서 참조 테이블을 고친 뒤 공유 캐시를 새로 고칠 때도 호출)
+@app.route('/warmup', methods=['GET'])
+@token_required
+def warmup():
+    timings = warm_up(query_flag('preload_lookups'))
+    logger.info(f"Warm-up finished: {timings}")
+    return jsonify({"message": "Warm", "seconds": timings}), 200
+
+# METRICS_ENABLED=true 일 때만 노출. 값은 이 프로세스(서버리스 인스턴스)가 처리한 요청의 누적값이다.
+@app.route('/metrics', methods=['GET'])
+@token_required
+def prometheus_metrics():
+    if os.getenv('METRICS_ENABLED', 'false').lower() not in ('1', 'true', 'yes'):
+        return jsonify({"error": "Metrics are disabled"}), 404
+    return metrics.REGISTRY.render_prometheus(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
 
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
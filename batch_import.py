@@ -0,0 +1,241 @@
+"""여러 해의 DASI export(.xlsx / .csv)를 한 번에 적재하는 batch import.
+
+    python batch_import.py ./exports                       # 모든 코어로 파싱, 하나의 writer 로 적재
+    python batch_import.py ./exports --workers 4 --max-rps 20 --kinds cases,reports
+    python batch_import.py ./exports --resume --json result.json
+    python batch_import.py ./exports --delta                # 사건 시트는 지난 delta import 이후 바뀐 행만 적재
+    python batch_import.py ./exports --parse-only          # DB 에 쓰지 않고 파싱만
+
+파일/시트(사건, 신고, 고발)마다 process pool 에서 따로 파싱하고, 파싱이 끝나는 순서대로
+메인 프로세스의 DataProcessor 하나가 DB 에 쓴다. 파싱과 적재는 동시에 진행되며,
+Supabase 요청 수는 --max-rps 로 제한한다.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import db_processor
+import delta_index
+import excel_reader
+import import_journal
+from metrics import Metrics, REGISTRY
+from rate_limit import TokenBucket
+from validation import Quarantine
+
+KIND_SHEETS = excel_reader.SHEET_KINDS
+WORKBOOK_EXTENSIONS = excel_reader.WORKBOOK_EXTENSIONS
+CSV_EXTENSIONS = excel_reader.CSV_EXTENSIONS
+
+def discover_files(root: str) -> List[str]:
+    # 하위 디렉터리까지 찾고, 엑셀이 열려 있을 때 생기는 ~$ 잠금 파일은 제외
+    if os.path.isfile(root):
+        return [root]
+    paths = []
+    for directory, _, names in os.walk(root):
+        for name in names:
+            if name.startswith('~$'):
+                continue
+            if name.lower().endswith(WORKBOOK_EXTENSIONS + CSV_EXTENSIONS):
+                paths.append(os.path.join(directory, name))
+    return sorted(paths)
+
+def source_name(root: str, path: str) -> str:
+    # 결과, journal, quarantine 에 쓰는 파일 이름 (디렉터리 기준 상대 경로)
+    return os.path.relpath(path, root) if os.path.isdir(root) else os.path.basename(path)
+
+def plan_jobs(root: str, paths: List[str], kinds: List[str]) -> List[Tuple[str, str, str]]:
+    # 워크북은 시트 종류마다 하나씩, CSV 는 사건 시트 하나
+    jobs = []
+    for path in paths:
+        if path.lower().endswith(CSV_EXTENSIONS):
+            if 'cases' in kinds:
+                jobs.append((path, 'cases', source_name(root, path)))
+        else:
+            jobs.extend((path, kind, source_name(root, path)) for kind in kinds)
+    return jobs
+
+def init_worker() -> None:
+    # fork 된 자식 프로세스는 부모의 Supabase 연결 풀을 쓰지 않는다 (파싱만 하므로 새로 만들지도 않음)
+    db_processor.reset_supabase_client()
+
+def count_rows(kind: str, data: Any) -> int:
+    if kind == 'cases':
+        return len(data.dispositions)
+    if kind == 'accusations':
+        return len(data.persons)
+    return len(data)
+
+def parse_job(path: str, kind: str, source: str) -> Dict[str, Any]:
+    """자식 프로세스에서 실행. 시트 종류별로 CaseSheet, ReportSheet, AccusationSheet 를 반환한다."""
+    started = time.perf_counter()
+    result = {'file': source, 'kind': kind, 'data': None, 'rows': 0, 'status': 'parsed', 'error': None}
+    # 검증에 실패한 행은 quarantine 에 파일 이름으로 보관하고 나머지만 변환
+    reader = excel_reader.ExcelReader(quarantine=Quarantine(), source=source)
+    try:
+        if path.lower().endswith(CSV_EXTENSIONS):
+            data = reader.read_sheet(path, kind, csv=True)
+        elif KIND_SHEETS[kind] not in reader.read_workbook(path, [KIND_SHEETS[kind]]):
+            result['status'] = 'skipped'
+            data = None
+        else:
+            data = reader.read_sheet(path, kind)
+        if data is None and result['status'] == 'parsed':
+            result['status'] = 'failed'
+            result['error'] = 'could not read file'
+    except Exception as e:
+        data = None
+        result['status'] = 'failed'
+        result['error'] = str(e)
+    if data is not None:
+        result['data'] = data
+        result['rows'] = count_rows(kind, data)
+    result['rejected_rows'] = reader.rejected_rows
+    result['parse_seconds'] = round(time.perf_counter() - started, 3)
+    return result
+
+def iter_parsed(jobs: List[Tuple[str, str, str]], workers: int, max_pending: int) -> Iterator[Dict[str, Any]]:
+    # 파싱이 끝난 순서대로 반환. 적재가 파싱보다 느려도 메모리에 쌓이는 결과가 max_pending 개를 넘지 않도록 나눠서 제출
+    queue = list(reversed(jobs))
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+        pending = set()
+        while queue or pending:
+            while queue and len(pending) < max_pending:
+                pending.add(executor.submit(parse_job, *queue.pop()))
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+def write_result(processor: db_processor.DataProcessor, result: Dict[str, Any], source_key: Optional[str]) -> bool:
+    kind, data = result['kind'], result['data']
+    if kind == 'cases':
+        return processor.process_case_frame(data, source_key=source_key)
+    if kind == 'reports':
+        return processor.process_report_frame(data, source_key=source_key)
+    return processor.process_accusation_frame(data)
+
+def import_summary_delta(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+    # 공유 processor 의 누적 요약에서 파일 하나만큼의 차이
+    inserted = {
+        table: count - before['inserted_rows'].get(table, 0)
+        for table, count in after['inserted_rows'].items()
+        if count != before['inserted_rows'].get(table, 0)
+    }
+    return {
+        'inserted_rows': inserted,
+        'skipped_records': after['skipped_records'] - before['skipped_records'],
+        'failure_count': after['failure_count'] - before['failure_count'],
+        'failures': after['failures'][len(before['failures']):],
+        'quarantined': after['quarantined'] - before['quarantined'],
+        'unchanged_rows': after['unchanged_rows'] - before['unchanged_rows'],
+    }
+
+def run_import(root: str, kinds: List[str], workers: int, processor: Optional[db_processor.DataProcessor],
+               resume: bool = False, out=sys.stderr) -> List[Dict[str, Any]]:
+    paths = discover_files(root)
+    jobs = plan_jobs(root, paths, kinds)
+    print(f'{len(paths)} files, {len(jobs)} sheets, {workers} parse workers', file=out)
+
+    started = time.perf_counter()
+    results = []
+    for done, result in enumerate(iter_parsed(jobs, workers, max_pending=workers * 2), start=1):
+        name = result['file']
+        if result['status'] == 'parsed' and processor is not None:
+            processor.source = name
+            # resume=true 이면 파일/시트별 journal 로 이미 적재된 레코드를 건너뜀
+            source_key = f'{name}:{result["kind"]}' if resume else None
+            before = processor.import_summary()
+            write_started = time.perf_counter()
+            try:
+                ok = write_result(processor, result, source_key)
+            except Exception as e:
+                processor._record_failure(f"Error importing {name} ({result['kind']}): {e}")
+                ok = False
+            result['write_seconds'] = round(time.perf_counter() - write_started, 3)
+            result.update(import_summary_delta(before, processor.import_summary()))
+            result['status'] = 'imported' if ok and not result['failure_count'] else 'partial'
+        result.pop('data')
+        results.append(result)
+
+        inserted = sum(result.get('inserted_rows', {}).values())
+        detail = f'{result["rows"]} rows parsed in {result["parse_seconds"]}s'
+        if result['rejected_rows']:
+            detail += f' ({result["rejected_rows"]} rejected)'
+        if 'write_seconds' in result:
+            detail += f', {inserted} inserted in {result["write_seconds"]}s, {result["failure_count"]} failures'
+            if result['unchanged_rows']:
+                detail += f', {result["unchanged_rows"]} unchanged'
+        if result['error']:
+            detail += f' ({result["error"]})'
+        print(f'[{done}/{len(jobs)}] {name} {result["kind"]}: {result["status"]} - {detail}', file=out)
+
+    elapsed = time.perf_counter() - started
+    total_rows = sum(result['rows'] for result in results)
+    print(f'done in {elapsed:.1f}s: {total_rows} rows, {total_rows / elapsed if elapsed else 0:.0f} rows/s', file=out)
+    return results
+
+def print_summary(results: List[Dict[str, Any]], out=sys.stdout) -> None:
+    columns = ['file', 'kind', 'status', 'rows', 'rejected_rows', 'inserted', 'failures', 'parse_seconds', 'write_seconds']
+    rows = [
+        {
+            **result,
+            'inserted': sum(result.get('inserted_rows', {}).values()),
+            'failures': result.get('failure_count', ''),
+            'write_seconds': result.get('write_seconds', ''),
+        }
+        for result in results
+    ]
+    widths = {column: max(len(column), *(len(str(row[column])) for row in rows)) for column in columns} if rows else {}
+    print('  '.join(column.ljust(widths.get(column, 0)) for column in columns), file=out)
+    for row in rows:
+        print('  '.join(str(row[column]).ljust(widths[column]) for column in columns), file=out)
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description='Import a directory of DASI workbooks and CSV exports')
+    parser.add_argument('path', help='directory (searched recursively) or a single file')
+    parser.add_argument('--kinds', default=','.join(KIND_SHEETS), help='comma separated sheet kinds')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='parse processes')
+    parser.add_argument('--max-rps', type=float, default=float(os.getenv('IMPORT_MAX_RPS', '0')),
+                        help='Supabase requests per second (0 = SUPABASE_MAX_RPS, or unlimited if unset)')
+    parser.add_argument('--batch-size', type=int, default=db_processor.DEFAULT_BATCH_SIZE)
+    parser.add_argument('--concurrency', type=int, default=db_processor.DEFAULT_CONCURRENCY, help='concurrent DB requests')
+    parser.add_argument('--resume', action='store_true', help='skip records already imported from the same file')
+    parser.add_argument('--delta', action='store_true',
+                        help='write only case rows that are new or changed since the last delta import')
+    parser.add_argument('--parse-only', action='store_true', help='parse without writing to Supabase')
+    parser.add_argument('--json', help='write per-file results to this file')
+    args = parser.parse_args(argv)
+
+    kinds = [kind for kind in args.kinds.split(',') if kind]
+    unknown = [kind for kind in kinds if kind not in KIND_SHEETS]
+    if unknown:
+        parser.error(f'unknown kinds: {", ".join(unknown)} (choose from {", ".join(KIND_SHEETS)})')
+
+    processor = None
+    run_metrics = Metrics(REGISTRY)
+    if not args.parse_only:
+        processor = db_processor.DataProcessor(
+            batch_size=args.batch_size,
+            concurrency=args.concurrency,
+            journal=import_journal.ImportJournal() if args.resume else None,
+            metrics=run_metrics,
+            rate_limiter=TokenBucket(args.max_rps) if args.max_rps > 0 else None,
+            quarantine=Quarantine(),
+            delta_index=delta_index.DeltaIndex() if args.delta else None,
+        )
+
+    results = run_import(args.path, kinds, max(args.workers, 1), processor, resume=args.resume)
+    print_summary(results)
+    if processor is not None:
+        summary = run_metrics.summary()
+        print(f'{summary["db_requests"]} Supabase requests, {summary["db_seconds"]}s', file=sys.stderr)
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(results, file, indent=2, ensure_ascii=False, default=str)
+    return 0 if all(result['status'] in ('imported', 'parsed', 'skipped') for result in results) else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
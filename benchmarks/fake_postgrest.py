@@ -0,0 +1,199 @@
+import collections
+import csv
+import itertools
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+# 벤치마크용 PostgREST 대역. supabase-py(postgrest-py)가 보내는 요청 중 이 프로젝트가 쓰는 것만 처리한다.
+#   GET  /rest/v1/<table>?select=...&col=eq.value&col=in.(a,b)&offset=..&limit=..
+#   POST /rest/v1/<table>            insert (on_conflict 가 있으면 upsert)
+#   POST /rest/v1/rpc/<function>     배포되지 않은 함수로 응답 (PGRST202)
+# 테이블/연산별 요청 수를 기록해서 행당 왕복 횟수를 계산할 수 있게 한다.
+
+class FakeDatabase:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.tables: Dict[str, List[Dict[str, Any]]] = collections.defaultdict(list)
+        # (table, column) -> 문자열 값 -> 행 목록. eq/in 조회와 on_conflict 확인에 사용
+        self._indexes: Dict[Tuple[str, str], Dict[str, List[Dict[str, Any]]]] = {}
+        self.requests: Dict[str, int] = collections.Counter()
+        self.rows_written: Dict[str, int] = collections.Counter()
+
+    def _index(self, table: str, column: str) -> Dict[str, List[Dict[str, Any]]]:
+        key = (table, column)
+        if key not in self._indexes:
+            index = collections.defaultdict(list)
+            for row in self.tables[table]:
+                index[str(row.get(column))].append(row)
+            self._indexes[key] = index
+        return self._indexes[key]
+
+    def _append(self, table: str, row: Dict[str, Any]) -> Dict[str, Any]:
+        row = dict(row)
+        row.setdefault('id', next(self._ids))
+        self.tables[table].append(row)
+        for (indexed_table, column), index in self._indexes.items():
+            if indexed_table == table:
+                index[str(row.get(column))].append(row)
+        return row
+
+    def seed(self, table: str, rows: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            for row in rows:
+                self._append(table, row)
+
+    def count(self, operation: str, table: str) -> None:
+        with self._lock:
+            self.requests[f'{operation} {table}'] += 1
+
+    def select(self, table: str, filters: List[Tuple[str, str, str]],
+               offset: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = None
+            for column, operator, value in filters:
+                index = self._index(table, column)
+                values = [value] if operator == 'eq' else parse_in_values(value)
+                matches = [row for item in values for row in index.get(item, ())]
+                if rows is None:
+                    rows = matches
+                else:
+                    ids = {id(row) for row in matches}
+                    rows = [row for row in rows if id(row) in ids]
+            if rows is None:
+                rows = self.tables[table]
+            end = None if limit is None else offset + limit
+            return [dict(row) for row in rows[offset:end]]
+
+    def insert(self, table: str, payload: List[Dict[str, Any]], on_conflict: Optional[List[str]] = None,
+               ignore_duplicates: bool = False) -> List[Dict[str, Any]]:
+        with self._lock:
+            result = []
+            for row in payload:
+                existing = self._find_conflict(table, row, on_conflict) if on_conflict else None
+                if existing is not None:
+                    if not ignore_duplicates:
+                        existing.update(row)
+                        result.append(dict(existing))
+                    continue
+                result.append(dict(self._append(table, row)))
+            self.rows_written[table] += len(result)
+            return result
+
+    def _find_conflict(self, table: str, row: Dict[str, Any], columns: List[str]) -> Optional[Dict[str, Any]]:
+        candidates = self._index(table, columns[0]).get(str(row.get(columns[0])), ())
+        for candidate in candidates:
+            if all(str(candidate.get(column)) == str(row.get(column)) for column in columns):
+                return candidate
+        return None
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'requests': dict(self.requests),
+                'rows_written': dict(self.rows_written),
+                'tables': {table: len(rows) for table, rows in self.tables.items()},
+            }
+
+def parse_in_values(value: str) -> List[str]:
+    # in.(a,"b,c") 형식. 예약 문자가 들어간 값은 postgrest-py 가 큰따옴표로 감싼다
+    return next(csv.reader([value[1:-1]], quotechar='"', skipinitialspace=True), [])
+
+def parse_filters(query: List[Tuple[str, str]]) -> Tuple[List[Tuple[str, str, str]], Dict[str, str]]:
+    filters = []
+    options = {}
+    for key, value in query:
+        operator, _, operand = value.partition('.')
+        if key in ('select', 'offset', 'limit', 'on_conflict', 'order', 'columns'):
+            options[key] = value
+        elif operator in ('eq', 'in'):
+            filters.append((key, operator, operand))
+    return filters, options
+
+class FakePostgrestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # keep-alive 연결에서 응답이 Nagle/delayed ACK 때문에 ~40ms 씩 늦어지지 않도록
+    disable_nagle_algorithm = True
+    database: FakeDatabase = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _route(self) -> Tuple[str, List[Tuple[str, str]]]:
+        url = urlsplit(self.path)
+        return url.path.split('/rest/v1/', 1)[-1], parse_qsl(url.query, keep_blank_values=True)
+
+    def _send(self, status: int, body: Any) -> None:
+        payload = json.dumps(body, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _read_body(self) -> Any:
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'null')
+
+    def do_GET(self):
+        table, query = self._route()
+        filters, options = parse_filters(query)
+        self.database.count('select', table)
+        limit = int(options['limit']) if 'limit' in options else None
+        rows = self.database.select(table, filters, int(options.get('offset', 0)), limit)
+        self._send(200, rows)
+
+    def do_POST(self):
+        path, query = self._route()
+        body = self._read_body()
+        if path.startswith('rpc/'):
+            self.database.count('rpc', path[4:])
+            self._send(404, {'code': 'PGRST202', 'message': f'Could not find the function {path[4:]}', 'details': None, 'hint': None})
+            return
+
+        _, options = parse_filters(query)
+        on_conflict = [column for column in options.get('on_conflict', '').split(',') if column]
+        ignore_duplicates = 'ignore-duplicates' in (self.headers.get('Prefer') or '')
+        self.database.count('upsert' if on_conflict else 'insert', path)
+        rows = body if isinstance(body, list) else [body]
+        self._send(201, self.database.insert(path, rows, on_conflict or None, ignore_duplicates))
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # 벤치마크 프로세스가 끝나면서 연결을 끊는 것은 정상 종료
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+class FakePostgrest:
+    """로컬 스레드에서 실행되는 PostgREST 대역 서버. url 을 SUPABASE_URL 로 쓰면 된다."""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0):
+        self.database = FakeDatabase()
+        handler = type('Handler', (FakePostgrestHandler,), {'database': self.database})
+        self.server = _Server((host, port), handler)
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> 'FakePostgrest':
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> 'FakePostgrest':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
@@ -0,0 +1,97 @@
+import pandas as pd
+
+from excel_reader import Helper
+
+# 벡터화 이전의 ExcelReader.process_csv_data (행 단위 loop).
+# 속도 비교 기준(parse_csv_legacy 단계)과 결과 동일성 확인(--check)에 사용한다.
+
+def legacy_process_csv_data(df):
+    df.fillna("", inplace=True)
+    excel_data = df.to_numpy()
+    data_array = []
+
+    prev_case_id = ""
+    current_case = None
+
+    for row in excel_data:
+        case_id = row[3]  # 사건번호
+
+        # 처분 정보 생성
+        disposition = {
+            "charge": row[9],  # 죄목
+            "charge_detail": row[10],  # 세부죄목
+            "disposition": row[11],  # 처분결과
+            "disposition_detail": row[12],  # 세부처분결과
+            "disposal_date": row[4].strftime("%Y-%m-%d") if isinstance(row[4], pd.Timestamp) else str(row[4]),  # 처분일자
+            "fine_amount": row[13]
+        }
+
+        # 피의자 정보 추출
+        name = "성명불상" if row[1] == "" else row[1]
+
+        # 같은 사건인지 확인
+        if case_id != prev_case_id:
+            if current_case is not None:
+                data_array.append(current_case)
+
+            current_case = {
+                "case": Helper().make_case_json(row),
+                "persons": [{
+                    "business_name": row[0],
+                    "name": name,
+                    "role": row[2],
+                    "dispositions": [disposition]
+                }]
+            }
+        else:
+            # 같은 사건의 피의자 정보 처리
+            for person in current_case["persons"]:
+                if person["name"] == name:
+                    person["dispositions"].append(disposition)
+                    break
+            else:
+                current_case["persons"].append({
+                    "business_name": row[0],
+                    "name": name,
+                    "role": row[2],
+                    "dispositions": [disposition]
+                })
+
+        prev_case_id = case_id
+
+    if current_case is not None:
+        data_array.append(current_case)
+
+    return data_array
+
+def edge_case_frame():
+    """process_csv_data 와 위 loop 의 결과를 비교할 작은 사건 시트 (--check).
+
+    무작위 데이터에는 잘 나오지 않는 경우를 고정된 행으로 담는다: 빈 피의자 이름(NaN 과 ""),
+    엑셀 날짜(Timestamp)와 문자열, 빈 값이 섞인 처분일자, 떨어져서 다시 나오는 사건번호,
+    같은 사건 안에서 떨어져서 다시 나오는 피의자, 빈 세부죄목/세부처분결과/벌금/비고.
+    """
+    from benchmarks.synthetic import CASE_HEADER
+    nan = float('nan')
+    rows = [
+        ['업소A', '김철수', '대표', '2024형제1', pd.Timestamp('2024-01-05'), '서울경찰청', '수사과', '담당자', '02-000-0000',
+         '성매매처벌법위반', '알선', '벌금', '구약식', 3000000, nan],
+        ['업소A', nan, '종업원', '2024형제1', '2024-01-06', '서울경찰청', '수사과', '담당자', '02-000-0000',
+         '청소년보호법위반', nan, '기소유예', nan, nan, '비고'],
+        ['업소A', '김철수', '대표', '2024형제1', nan, '서울경찰청', '수사과', '담당자', '02-000-0000',
+         '성매매처벌법위반', '광고', '벌금', '구약식', 500000, nan],
+        ['업소B', '', '실장', '2024형제2', pd.Timestamp('2024-02-01 13:30'), '부산지방검찰청', '형사부', '검사', nan,
+         '성매매처벌법위반', '알선', '징역', '집행유예', nan, nan],
+        ['업소B', nan, '실장', '2024형제2', '2024/02/02', '부산지방검찰청', '형사부', '검사', nan,
+         '풍속영업규제법위반', nan, '무혐의', nan, nan, nan],
+        # 앞의 사건번호가 떨어져서 다시 나오면 별도의 사건으로 묶는다
+        ['업소A', '김철수', '대표', '2024형제1', '2024-03-01', '서울경찰청', '수사과', '담당자', '02-000-0000',
+         '성매매처벌법위반', '알선', '벌금', '구약식', 1000000, nan],
+        ['업소C', '이영희', '대표', '2024형제3', pd.Timestamp('2024-04-01'), '서울시청', '민생사법경찰단', '수사관', '02-111-1111',
+         '성매매처벌법위반', '알선', '벌금', '구약식', 2000000, nan],
+        ['업소C', '박민수', '종업원', '2024형제3', pd.Timestamp('2024-04-01'), '서울시청', '민생사법경찰단', '수사관', '02-111-1111',
+         '성매매처벌법위반', '알선', '기소유예', nan, nan, nan],
+        ['업소C', '이영희', '대표', '2024형제3', '2024-04-02', '서울시청', '민생사법경찰단', '수사관', '02-111-1111',
+         '청소년보호법위반', nan, '벌금', '구약식', 500000, nan],
+    ]
+    return pd.DataFrame(rows, columns=CASE_HEADER)
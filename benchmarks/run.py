@@ -0,0 +1,216 @@
+"""Excel/CSV -> Supabase 파이프라인 벤치마크.
+
+    python -m benchmarks.run                          # 1k, 10k 행, 전체 단계
+    python -m benchmarks.run --sizes 100000,1000000 --stages parse_csv,ingest_cases
+    python -m benchmarks.run --json bench.json --check
+
+단계마다 별도 프로세스에서 실행해서 peak RSS 를 단계별로 측정하고,
+ingest 단계는 로컬 가짜 PostgREST(benchmarks.fake_postgrest)에 쓰면서 요청 수를 센다.
+ingest 단계의 시간에는 파싱이 포함되지 않지만 peak RSS 에는 포함된다.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+from benchmarks import synthetic
+from benchmarks.fake_postgrest import FakePostgrest
+
+DEFAULT_SIZES = [1000, 10000]
+DEFAULT_DATA_DIR = os.path.join(tempfile.gettempdir(), 'dasi_benchmarks')
+
+def _stage_parse_csv(path: str) -> Tuple[int, float]:
+    import excel_reader
+    start = time.perf_counter()
+    sheet = excel_reader.ExcelReader().case_frame_from_csv(path)
+    return len(sheet.dispositions), time.perf_counter() - start
+
+def _stage_parse_csv_json(path: str) -> Tuple[int, float]:
+    import excel_reader
+    start = time.perf_counter()
+    data = excel_reader.ExcelReader().case_data_from_csv(path)
+    return sum(len(person['dispositions']) for case in data for person in case['persons']), time.perf_counter() - start
+
+def _stage_parse_csv_legacy(path: str) -> Tuple[int, float]:
+    import pandas as pd
+    from benchmarks.reference import legacy_process_csv_data
+    start = time.perf_counter()
+    # 기존 방식 그대로 모든 열을 타입 추론으로 읽는다
+    data = legacy_process_csv_data(pd.read_csv(path, header=0))
+    return sum(len(person['dispositions']) for case in data for person in case['persons']), time.perf_counter() - start
+
+def _stage_parse_xlsx(path: str) -> Tuple[int, float]:
+    import excel_reader
+    start = time.perf_counter()
+    result = excel_reader.ExcelReader().workbook_to_json(path)
+    rows = sum(len(person['dispositions']) for case in result['cases'] for person in case['persons'])
+    rows += len(result['reports'])
+    rows += sum(len(item['accusations']['accused_person']) for item in result['accusations'])
+    return rows, time.perf_counter() - start
+
+def _stage_ingest_cases(path: str) -> Tuple[int, float]:
+    import db_processor, excel_reader
+    sheet = excel_reader.ExcelReader().case_frame_from_csv(path)
+    processor = db_processor.DataProcessor()
+    start = time.perf_counter()
+    processor.process_case_frame(sheet)
+    return len(sheet.dispositions), time.perf_counter() - start
+
+def _stage_ingest_reports(path: str) -> Tuple[int, float]:
+    import db_processor, excel_reader
+    sheet = excel_reader.ExcelReader().read_sheet(path, 'reports')
+    processor = db_processor.DataProcessor()
+    start = time.perf_counter()
+    processor.process_report_frame(sheet)
+    return len(sheet), time.perf_counter() - start
+
+def _stage_ingest_accusations(path: str) -> Tuple[int, float]:
+    import db_processor, excel_reader
+    sheet = excel_reader.ExcelReader().read_sheet(path, 'accusations')
+    processor = db_processor.DataProcessor()
+    start = time.perf_counter()
+    processor.process_accusation_frame(sheet)
+    return len(sheet.persons), time.perf_counter() - start
+
+# 단계 이름 -> (입력 파일 종류, 실행 함수)
+STAGES: Dict[str, Tuple[str, Callable[[str], Tuple[int, float]]]] = {
+    'parse_csv': ('csv', _stage_parse_csv),
+    'parse_csv_json': ('csv', _stage_parse_csv_json),
+    'parse_csv_legacy': ('csv', _stage_parse_csv_legacy),
+    'parse_xlsx': ('xlsx', _stage_parse_xlsx),
+    'ingest_cases': ('csv', _stage_ingest_cases),
+    'ingest_reports': ('xlsx', _stage_ingest_reports),
+    'ingest_accusations': ('xlsx', _stage_ingest_accusations),
+}
+
+def run_worker(stage: str, path: str, result_path: str) -> None:
+    if stage in ('check', 'check_edge_cases'):
+        ok = check_parity(path) if stage == 'check' else check_edge_cases()
+        with open(result_path, 'w') as file:
+            json.dump({'ok': ok}, file)
+        return
+
+    rows, elapsed = STAGES[stage][1](path)
+    with open(result_path, 'w') as file:
+        json.dump({
+            'rows': rows,
+            'seconds': elapsed,
+            # Linux 의 ru_maxrss 단위는 KB
+            'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        }, file)
+
+def spawn_worker(stage: str, path: str, env: Dict[str, str] = None) -> Dict[str, Any]:
+    # 단계마다 새 프로세스에서 실행 (부모 프로세스의 메모리 사용량이 peak RSS 에 섞이지 않도록 부모에서는 파싱하지 않음)
+    with tempfile.NamedTemporaryFile(suffix='.json') as result:
+        process = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.run', '--worker', stage, '--input', path, '--result', result.name],
+            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+        )
+        if process.returncode != 0:
+            raise RuntimeError(f'{stage} failed:\n{process.stderr}')
+        with open(result.name) as file:
+            return json.load(file)
+
+def run_stage(stage: str, path: str) -> Dict[str, Any]:
+    with FakePostgrest() as server:
+        server.database.seed('disposition_types', synthetic.disposition_types())
+        env = dict(os.environ, SUPABASE_URL=server.url, SUPABASE_KEY='bench.bench.bench')
+        measured = spawn_worker(stage, path, env)
+        snapshot = server.database.snapshot()
+
+    requests = sum(snapshot['requests'].values())
+    return {
+        'stage': stage,
+        'rows': measured['rows'],
+        'seconds': round(measured['seconds'], 4),
+        'rows_per_second': round(measured['rows'] / measured['seconds'], 1) if measured['seconds'] else None,
+        'requests': requests,
+        'round_trips_per_row': round(requests / measured['rows'], 4) if measured['rows'] else None,
+        'peak_rss_mb': round(measured['peak_rss_mb'], 1),
+        'requests_by_table': snapshot['requests'],
+    }
+
+def check_parity(path: str) -> bool:
+    """벡터화된 process_csv_data 결과가 기존 행 단위 loop 결과와 같은지 확인한다."""
+    import excel_reader
+    import pandas as pd
+    from benchmarks.reference import legacy_process_csv_data
+    reader = excel_reader.ExcelReader()
+    return reader.process_csv_data(reader.read_csv_file(path)) == legacy_process_csv_data(pd.read_csv(path, header=0))
+
+def check_edge_cases() -> bool:
+    """reference.edge_case_frame 의 경계 사례에서도 결과가 같은지 확인한다.
+
+    날짜 타입과 문자열이 섞인 열은 워크북에서만 나오므로 DataFrame 을 그대로 비교하고,
+    같은 행을 CSV 로 저장해서 check_parity(스키마 dtype 으로 읽는 경로)로도 비교한다.
+    """
+    import excel_reader
+    from benchmarks.reference import edge_case_frame, legacy_process_csv_data
+    frame = edge_case_frame()
+    ok = excel_reader.ExcelReader().process_csv_data(frame.copy()) == legacy_process_csv_data(frame.copy())
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'edge_cases.csv')
+        frame.to_csv(path, index=False)
+        return ok and check_parity(path)
+
+def print_table(results: List[Dict[str, Any]]) -> None:
+    columns = ['size', 'stage', 'rows', 'seconds', 'rows_per_second', 'requests', 'round_trips_per_row', 'peak_rss_mb']
+    widths = {column: max(len(column), *(len(str(result[column])) for result in results)) for column in columns}
+    print('  '.join(column.ljust(widths[column]) for column in columns))
+    for result in results:
+        print('  '.join(str(result[column]).ljust(widths[column]) for column in columns))
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description='DASI import pipeline benchmark')
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)), help='comma separated row counts')
+    parser.add_argument('--stages', default=','.join(STAGES), help='comma separated stage names')
+    parser.add_argument('--data-dir', default=DEFAULT_DATA_DIR, help='where generated inputs are cached')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='write results to this file')
+    parser.add_argument('--check', action='store_true',
+                        help='compare process_csv_data with the legacy loop (edge cases and each size)')
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    parser.add_argument('--input', help=argparse.SUPPRESS)
+    parser.add_argument('--result', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        run_worker(args.worker, args.input, args.result)
+        return 0
+
+    stages = [stage for stage in args.stages.split(',') if stage]
+    unknown = [stage for stage in stages if stage not in STAGES]
+    if unknown:
+        parser.error(f'unknown stages: {", ".join(unknown)} (choose from {", ".join(STAGES)})')
+
+    results = []
+    parity_ok = True
+    if args.check:
+        parity_ok = spawn_worker('check_edge_cases', '')['ok']
+        print(f'parity edge cases: {"ok" if parity_ok else "MISMATCH"}', file=sys.stderr)
+    for size in (int(size) for size in args.sizes.split(',') if size):
+        kinds = {STAGES[stage][0] for stage in stages} | ({'csv'} if args.check else set())
+        inputs = synthetic.ensure_inputs(args.data_dir, size, args.seed, sorted(kinds))
+        if args.check:
+            ok = spawn_worker('check', inputs['csv'])['ok']
+            parity_ok = parity_ok and ok
+            print(f'parity {size}: {"ok" if ok else "MISMATCH"}', file=sys.stderr)
+        for stage in stages:
+            result = run_stage(stage, inputs[STAGES[stage][0]])
+            result['size'] = size
+            results.append(result)
+            print(f'{size} {stage}: {result["rows_per_second"]} rows/s', file=sys.stderr)
+
+    print_table(results)
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(results, file, indent=2, ensure_ascii=False)
+    return 0 if parity_ok else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
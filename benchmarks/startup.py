@@ -0,0 +1,107 @@
+"""api/index.py cold start 벤치마크.
+
+    python -m benchmarks.startup                       # 5 번 측정, import 시간 예산 확인
+    python -m benchmarks.startup --runs 10 --budget 0.3 --json startup.json
+
+측정마다 새 프로세스에서 api/index.py 를 import 하고(cold start), 첫 GET / 응답 시간과
+warm_up(preload_lookups=True) 시간을 잰다. warm-up 은 로컬 가짜 PostgREST(benchmarks.fake_postgrest)에 요청한다.
+import 시간 중앙값이 예산(--budget, IMPORT_BUDGET_SECONDS)을 넘거나, import 만으로 pandas/supabase 가
+로드되면 종료 코드 1 을 반환한다.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_RUNS = 5
+DEFAULT_IMPORT_BUDGET_SECONDS = float(os.getenv('IMPORT_BUDGET_SECONDS', '0.5'))
+# api/index.py import 시점에는 로드되면 안 되는 모듈 (첫 업로드 요청 또는 warm-up 에서 로드)
+HEAVY_MODULES = ('pandas', 'numpy', 'supabase', 'excel_reader', 'db_processor')
+
+def run_worker(result_path: str) -> None:
+    sys.path[:0] = [ROOT, os.path.join(ROOT, 'api')]
+    start = time.perf_counter()
+    import index
+    import_seconds = time.perf_counter() - start
+    loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+
+    client = index.app.test_client()
+    start = time.perf_counter()
+    client.get('/')
+    first_request_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    timings = index.warm_up(preload_lookups=True)
+    warm_up_seconds = time.perf_counter() - start
+
+    with open(result_path, 'w') as file:
+        json.dump({
+            'import_seconds': import_seconds,
+            'first_request_seconds': first_request_seconds,
+            'warm_up_seconds': warm_up_seconds,
+            'warm_up': timings,
+            'heavy_modules_loaded': loaded,
+        }, file)
+
+def spawn_worker(env: Dict[str, str]) -> Dict[str, Any]:
+    with tempfile.NamedTemporaryFile(suffix='.json') as result:
+        process = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.startup', '--worker', '--result', result.name],
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+        )
+        if process.returncode != 0:
+            raise RuntimeError(f'startup worker failed:\n{process.stderr}')
+        with open(result.name) as file:
+            return json.load(file)
+
+def run(runs: int) -> List[Dict[str, Any]]:
+    # worker 프로세스의 import 측정에 섞이지 않도록 부모에서만 import (synthetic 은 pandas 를 씀)
+    from benchmarks import synthetic
+    from benchmarks.fake_postgrest import FakePostgrest
+    with FakePostgrest() as server:
+        server.database.seed('disposition_types', synthetic.disposition_types())
+        env = dict(os.environ, SUPABASE_URL=server.url, SUPABASE_KEY='bench.bench.bench')
+        return [spawn_worker(env) for _ in range(runs)]
+
+def summarize(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    summary = {}
+    for key in ('import_seconds', 'first_request_seconds', 'warm_up_seconds'):
+        values = [result[key] for result in results]
+        summary[key] = {'median': round(statistics.median(values), 4), 'max': round(max(values), 4)}
+    summary['heavy_modules_loaded'] = sorted({name for result in results for name in result['heavy_modules_loaded']})
+    return summary
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description='api/index.py cold start benchmark')
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS, help='fresh interpreter runs')
+    parser.add_argument('--budget', type=float, default=DEFAULT_IMPORT_BUDGET_SECONDS,
+                        help='maximum median import time in seconds')
+    parser.add_argument('--json', help='write results to this file')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--result', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        run_worker(args.result)
+        return 0
+
+    summary = summarize(run(max(args.runs, 1)))
+    for key in ('import_seconds', 'first_request_seconds', 'warm_up_seconds'):
+        print(f'{key:<22} median {summary[key]["median"]:.4f}s  max {summary[key]["max"]:.4f}s')
+    ok = summary['import_seconds']['median'] <= args.budget and not summary['heavy_modules_loaded']
+    if summary['heavy_modules_loaded']:
+        print(f'modules loaded at import: {", ".join(summary["heavy_modules_loaded"])}', file=sys.stderr)
+    print(f'import budget {args.budget:.3f}s: {"ok" if ok else "EXCEEDED"}', file=sys.stderr)
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(dict(summary, budget_seconds=args.budget), file, indent=2)
+    return 0 if ok else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
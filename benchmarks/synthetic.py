@@ -0,0 +1,136 @@
+import csv
+import datetime
+import os
+import random
+from typing import Any, Iterator, List
+
+from openpyxl import Workbook
+
+import excel_reader
+
+# ExcelReader 가 열 번호로 읽는 DASI 시트와 같은 열 구성의 가짜 데이터를 만든다.
+# (process_csv_data: 15열, make_report_json: 16열, accusation_data_to_json: 8열)
+
+CASE_HEADER = ['업소명', '성명', '구분', '사건번호', '처분일자', '기관', '부서', '담당자', '연락처',
+               '죄목', '세부죄목', '처분결과', '세부처분결과', '벌금', '비고']
+REPORT_HEADER = ['신고일', '신고처', '신고번호', '업소명', '비고', '주소', '신고내용', '신고유형', '업종',
+                 '처리기관', '부서', '담당자', '연락처', '처리결과', '처리내용', '회신일']
+ACCUSATION_HEADER = ['업소명', '비고', '피고발인', '죄목', '업종', '고발일', '주소', '고발기관']
+
+OFFICES = ['서울경찰청', '부산지방검찰청', '수원지방법원', '서울시청', '경기남부경찰청']
+ROLES = ['대표', '종업원', '실장', '광고업자']
+NAMES = ['김', '이', '박', '최', '정', '강', '조', '윤', '장', '임']
+CHARGES = [('성매매처벌법위반', '알선'), ('성매매처벌법위반', '광고'), ('청소년보호법위반', ''), ('풍속영업규제법위반', '')]
+CATEGORIES = ['키스방', '안마', '오피스텔', '휴게텔', '유흥주점']
+REPORT_TYPES = ['성매매업소운영', '성매매알선광고', '성매매구인광고', '불법옥외광고물', '기타']
+REPORT_RESULTS = ['단속예정', '단속완료', '정황없음', '자진정비', '각하(중복)', '확인불가', '접속차단', '처리종결', '']
+
+# 처분 종류는 DB 에 미리 등록되어 있어야 한다 (CommonProcessor.get_disposition_id 는 생성하지 않음)
+DISPOSITIONS = [('벌금', '구약식'), ('기소유예', ''), ('징역', '집행유예'), ('무혐의', '')]
+
+def disposition_types() -> List[dict]:
+    return [{'name': name, 'detail_name': detail or None} for name, detail in DISPOSITIONS]
+
+def _date(rng: random.Random) -> datetime.datetime:
+    return datetime.datetime(2024, 1, 1) + datetime.timedelta(days=rng.randint(0, 365))
+
+def _business(rng: random.Random, rows: int) -> str:
+    # 업소 수는 행 수의 약 1/10 (같은 업소가 여러 사건/신고에 반복해서 등장)
+    return f'업소{rng.randint(0, max(rows // 10, 1))}'
+
+def _address(rng: random.Random, business: str) -> str:
+    if rng.random() < 0.4:
+        return f'https://example.com/{business}'
+    return f'서울시 {rng.choice(["강남구", "마포구", "중구"])} {rng.randint(1, 999)}'
+
+def case_rows(rows: int, seed: int = 0) -> Iterator[List[Any]]:
+    """사건 시트 행. 사건 하나에 1~4행, 사건 안에서 같은 피의자가 여러 처분을 받을 수 있다."""
+    rng = random.Random(seed)
+    produced = 0
+    case_number = 0
+    while produced < rows:
+        case_number += 1
+        office = rng.choice(OFFICES)
+        people = [(rng.choice(NAMES) + rng.choice(NAMES), rng.choice(ROLES)) for _ in range(rng.randint(1, 2))]
+        business = _business(rng, rows)
+        for _ in range(min(rng.randint(1, 4), rows - produced)):
+            name, role = rng.choice(people)
+            charge, charge_detail = rng.choice(CHARGES)
+            disposition, disposition_detail = rng.choice(DISPOSITIONS)
+            yield [
+                business, name if rng.random() > 0.05 else None, role, f'2024형제{case_number}',
+                _date(rng), office, '수사과', '담당자', '02-000-0000',
+                charge, charge_detail, disposition, disposition_detail,
+                rng.choice([None, 500000, 1000000, 3000000]), '',
+            ]
+            produced += 1
+
+def report_rows(rows: int, seed: int = 0) -> Iterator[List[Any]]:
+    rng = random.Random(seed)
+    for number in range(rows):
+        business = _business(rng, rows)
+        received = _date(rng) if rng.random() < 0.7 else None
+        yield [
+            _date(rng), rng.choice(OFFICES), f'신고-{number}', business, '', _address(rng, business),
+            '신고 내용', rng.choice(REPORT_TYPES), rng.choice(CATEGORIES),
+            rng.choice(OFFICES), '생활안전과', '담당자', '02-000-0000', rng.choice(REPORT_RESULTS), '처리 내용', received,
+        ]
+
+def accusation_rows(rows: int, seed: int = 0) -> Iterator[List[Any]]:
+    """고발 시트 행. 연속된 행의 업소명이 같으면 같은 고발로 묶인다."""
+    rng = random.Random(seed)
+    produced = 0
+    business_number = 0
+    while produced < rows:
+        business_number += 1
+        business = f'고발업소{business_number}'
+        accused_at = _date(rng)
+        office = rng.choice(OFFICES)
+        address = _address(rng, business)
+        category = rng.choice(CATEGORIES)
+        for _ in range(min(rng.randint(1, 3), rows - produced)):
+            person = f'{rng.choice(ROLES)}({rng.choice(NAMES)}{rng.choice(NAMES)})' if rng.random() > 0.1 else rng.choice(ROLES)
+            yield [business, '', person, rng.choice(CHARGES)[0], category, accused_at, address, office]
+            produced += 1
+
+def write_case_csv(path: str, rows: int, seed: int = 0) -> str:
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.writer(file)
+        writer.writerow(CASE_HEADER)
+        for row in case_rows(rows, seed):
+            row[4] = row[4].strftime('%Y-%m-%d')
+            writer.writerow(['' if value is None else value for value in row])
+    return path
+
+def write_workbook(path: str, rows: int, seed: int = 0) -> str:
+    """세 시트를 모두 rows 행씩 담은 워크북. 대용량도 메모리를 적게 쓰도록 write_only 모드로 쓴다."""
+    workbook = Workbook(write_only=True)
+    sheets = [
+        (excel_reader.CASE_SHEET, CASE_HEADER, case_rows),
+        (excel_reader.REPORT_SHEET, REPORT_HEADER, report_rows),
+        (excel_reader.ACCUSATION_SHEET, ACCUSATION_HEADER, accusation_rows),
+    ]
+    for title, header, generate in sheets:
+        sheet = workbook.create_sheet(title)
+        sheet.append(header)
+        for row in generate(rows, seed):
+            sheet.append(row)
+    workbook.save(path)
+    return path
+
+def ensure_inputs(directory: str, rows: int, seed: int = 0, kinds=('csv', 'xlsx')) -> dict:
+    """directory 에 rows 행짜리 CSV/워크북을 만들고 경로를 반환한다. 이미 있으면 다시 만들지 않는다."""
+    os.makedirs(directory, exist_ok=True)
+    writers = {
+        'csv': (f'cases_{rows}_{seed}.csv', write_case_csv),
+        'xlsx': (f'dasi_{rows}_{seed}.xlsx', write_workbook),
+    }
+    paths = {}
+    for kind in kinds:
+        file_name, write = writers[kind]
+        path = paths[kind] = os.path.join(directory, file_name)
+        if not os.path.exists(path):
+            # 중간에 멈춰도 불완전한 파일이 남지 않도록 임시 파일에 쓴 뒤 이름 변경
+            write(path + '.tmp', rows, seed)
+            os.replace(path + '.tmp', path)
+    return paths
@@ -0,0 +1,196 @@
+import numpy as np
+import pandas as pd
+from typing import List, Dict, Any
+
+CASE_COLUMNS = ['number', 'agency', 'office', 'office_dept', 'office_tel', 'officer', 'memo']
+PERSON_COLUMNS = ['business_name', 'name', 'role']
+DISPOSITION_COLUMNS = ['charge', 'charge_detail', 'disposition', 'disposition_detail', 'disposal_date', 'fine_amount']
+
+# 신고 시트 (신고 하나당 업소, 처리결과 하나)
+REPORT_COLUMNS = ['reported_at', 'reported_to', 'number', 'content_body', 'report_type_id']
+REPORT_DISPOSITION_COLUMNS = ['office', 'office_dept', 'officer', 'office_tel', 'received_at', 'disposition_id', 'content_body']
+# 고발 시트 (업소 하나당 고발 하나, 고발마다 피고발인/죄목 여러 개)
+ACCUSATION_COLUMNS = ['accused_at', 'office']
+ACCUSED_PERSON_COLUMNS = ['name', 'role']
+# 업소. type 이 online 이면 address 열의 값을 url 로 쓴다 (Helper.make_business_json)
+BUSINESS_COLUMNS = ['name', 'category', 'type', 'address']
+
+# 같은 값이 반복되는 열은 정수 코드(category)로 저장
+CATEGORICAL_COLUMNS = {
+    'agency', 'office', 'office_dept', 'business_name', 'role',
+    'charge', 'charge_detail', 'disposition', 'disposition_detail', 'disposal_date',
+    'reported_at', 'reported_to', 'received_at', 'category', 'type',
+}
+
+def to_column(name, values):
+    if name not in CATEGORICAL_COLUMNS:
+        return values
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    return pd.Categorical.from_codes(codes, categories=uniques)
+
+def object_values(series):
+    # category 열도 원래 값(object)으로 되돌림
+    return series.to_numpy(dtype=object)
+
+def to_frame(columns: Dict[str, Any]) -> pd.DataFrame:
+    return pd.DataFrame({name: to_column(name, values) for name, values in columns.items()})
+
+def records(frame: pd.DataFrame, columns: List[str]) -> List[Dict[str, Any]]:
+    # 행마다 columns 를 키로 하는 dict
+    return [dict(zip(columns, values)) for values in zip(*(object_values(frame[name]) for name in columns))]
+
+def business_json(business: Dict[str, Any]) -> Dict[str, Any]:
+    # Helper.make_business_json 과 같은 형태 (온라인 업소는 url, 그 외는 address)
+    address = business['address']
+    business = {'name': business['name'], 'category': business['category'], 'type': business['type']}
+    business['url' if business['type'] == 'online' else 'address'] = address
+    return business
+
+class CaseSheet:
+    """사건 시트(사건 -> 피의자 -> 처분)의 열 기반 중간 표현.
+
+    cases        : 사건 하나당 한 행 (CASE_COLUMNS)
+    persons      : 피의자 하나당 한 행 (PERSON_COLUMNS + case_index), case_index 순으로 정렬
+    dispositions : 처분(원본 행) 하나당 한 행 (DISPOSITION_COLUMNS + person_index), person_index 순으로 정렬
+
+    case_index / person_index 는 각각 cases / persons 안에서의 위치이다.
+    중첩 dict 가 필요할 때만 to_json() 으로 변환한다.
+    """
+    __slots__ = ('cases', 'persons', 'dispositions')
+
+    def __init__(self, cases: pd.DataFrame, persons: pd.DataFrame, dispositions: pd.DataFrame):
+        self.cases = cases
+        self.persons = persons
+        self.dispositions = dispositions
+
+    @classmethod
+    def from_columns(cls, cases: Dict[str, Any], persons: Dict[str, Any], dispositions: Dict[str, Any]) -> 'CaseSheet':
+        return cls(to_frame(cases), to_frame(persons), to_frame(dispositions))
+
+    def __len__(self) -> int:
+        return len(self.cases)
+
+    def slice(self, start: int, stop: int) -> 'CaseSheet':
+        """start 번째부터 stop 번째 전까지의 사건과 그 피의자/처분만 담은 CaseSheet 를 반환한다."""
+        stop = min(stop, len(self.cases))
+        person_start, person_stop = np.searchsorted(self.persons['case_index'].to_numpy(), [start, stop])
+        disposition_start, disposition_stop = np.searchsorted(
+            self.dispositions['person_index'].to_numpy(), [person_start, person_stop]
+        )
+
+        persons = self.persons.iloc[person_start:person_stop].reset_index(drop=True)
+        persons['case_index'] -= start
+        dispositions = self.dispositions.iloc[disposition_start:disposition_stop].reset_index(drop=True)
+        dispositions['person_index'] -= person_start
+        return CaseSheet(self.cases.iloc[start:stop].reset_index(drop=True), persons, dispositions)
+
+    def take(self, mask: np.ndarray) -> 'CaseSheet':
+        """mask 가 True 인 처분(원본 행)과 그 처분이 속한 피의자/사건만 담은 CaseSheet 를 반환한다."""
+        dispositions = self.dispositions[mask].reset_index(drop=True)
+        person_used = np.unique(dispositions['person_index'].to_numpy())
+        persons = self.persons.iloc[person_used].reset_index(drop=True)
+        case_used = np.unique(persons['case_index'].to_numpy())
+        # 남은 행 안에서의 위치로 다시 번호를 매긴다 (정렬 순서는 유지됨)
+        dispositions['person_index'] = np.searchsorted(person_used, dispositions['person_index'].to_numpy())
+        persons['case_index'] = np.searchsorted(case_used, persons['case_index'].to_numpy())
+        return CaseSheet(self.cases.iloc[case_used].reset_index(drop=True), persons, dispositions)
+
+    def to_json(self) -> List[Dict[str, Any]]:
+        """ExcelReader.process_csv_data 와 같은 중첩 dict 구조로 변환한다."""
+        dispositions = records(self.dispositions, DISPOSITION_COLUMNS)
+
+        persons = [dict(person, dispositions=[]) for person in records(self.persons, PERSON_COLUMNS)]
+        for person_index, disposition in zip(self.dispositions['person_index'].to_numpy(), dispositions):
+            persons[person_index]['dispositions'].append(disposition)
+
+        data_array = [{'case': case, 'persons': []} for case in records(self.cases, CASE_COLUMNS)]
+        for case_index, person in zip(self.persons['case_index'].to_numpy(), persons):
+            data_array[case_index]['persons'].append(person)
+        return data_array
+
+class ReportSheet:
+    """신고 시트의 열 기반 중간 표현. 세 DataFrame 모두 신고 하나당 한 행이고 같은 위치끼리 같은 신고이다.
+
+    reports      : REPORT_COLUMNS
+    businesses   : BUSINESS_COLUMNS (신고된 업소)
+    dispositions : REPORT_DISPOSITION_COLUMNS (처리결과, received_at 이 비어 있으면 처리결과 없음)
+    """
+    __slots__ = ('reports', 'businesses', 'dispositions')
+
+    def __init__(self, reports: pd.DataFrame, businesses: pd.DataFrame, dispositions: pd.DataFrame):
+        self.reports = reports
+        self.businesses = businesses
+        self.dispositions = dispositions
+
+    @classmethod
+    def from_columns(cls, reports: Dict[str, Any], businesses: Dict[str, Any], dispositions: Dict[str, Any]) -> 'ReportSheet':
+        return cls(to_frame(reports), to_frame(businesses), to_frame(dispositions))
+
+    def __len__(self) -> int:
+        return len(self.reports)
+
+    def slice(self, start: int, stop: int) -> 'ReportSheet':
+        return ReportSheet(*(frame.iloc[start:stop].reset_index(drop=True)
+                             for frame in (self.reports, self.businesses, self.dispositions)))
+
+    def to_json(self) -> List[Dict[str, Any]]:
+        """ExcelReader.report_data_from_df 가 만들던 것과 같은 중첩 dict 구조로 변환한다."""
+        return [
+            dict(report, disposition=disposition, business=business_json(business))
+            for report, disposition, business in zip(
+                records(self.reports, REPORT_COLUMNS),
+                records(self.dispositions, REPORT_DISPOSITION_COLUMNS),
+                records(self.businesses, BUSINESS_COLUMNS),
+            )
+        ]
+
+class AccusationSheet:
+    """고발 시트의 열 기반 중간 표현. 연속된 같은 업소의 행이 고발 하나가 된다.
+
+    accusations : 고발 하나당 한 행 (ACCUSATION_COLUMNS)
+    businesses  : accusations 와 같은 위치의 업소 (BUSINESS_COLUMNS). 고발마다 업소를 새로 만든다
+    persons     : 피고발인 하나당 한 행 (ACCUSED_PERSON_COLUMNS + accusation_index), accusation_index 순으로 정렬
+    charges     : 고발별 중복을 뺀 죄목 (charge + accusation_index), accusation_index 순으로 정렬
+    """
+    __slots__ = ('accusations', 'businesses', 'persons', 'charges')
+
+    def __init__(self, accusations: pd.DataFrame, businesses: pd.DataFrame, persons: pd.DataFrame, charges: pd.DataFrame):
+        self.accusations = accusations
+        self.businesses = businesses
+        self.persons = persons
+        self.charges = charges
+
+    @classmethod
+    def from_columns(cls, accusations: Dict[str, Any], businesses: Dict[str, Any],
+                     persons: Dict[str, Any], charges: Dict[str, Any]) -> 'AccusationSheet':
+        return cls(to_frame(accusations), to_frame(businesses), to_frame(persons), to_frame(charges))
+
+    def __len__(self) -> int:
+        return len(self.accusations)
+
+    def slice(self, start: int, stop: int) -> 'AccusationSheet':
+        """start 번째부터 stop 번째 전까지의 고발과 그 피고발인/죄목만 담은 AccusationSheet 를 반환한다."""
+        stop = min(stop, len(self.accusations))
+        children = []
+        for frame in (self.persons, self.charges):
+            child_start, child_stop = np.searchsorted(frame['accusation_index'].to_numpy(), [start, stop])
+            child = frame.iloc[child_start:child_stop].reset_index(drop=True)
+            child['accusation_index'] -= start
+            children.append(child)
+        return AccusationSheet(self.accusations.iloc[start:stop].reset_index(drop=True),
+                               self.businesses.iloc[start:stop].reset_index(drop=True), *children)
+
+    def to_json(self) -> List[Dict[str, Any]]:
+        """ExcelReader.accusation_data_from_df 가 만들던 것과 같은 중첩 dict 구조로 변환한다."""
+        accusations = [
+            dict(accusation, accused_person=[], charge=[]) for accusation in records(self.accusations, ACCUSATION_COLUMNS)
+        ]
+        for accusation_index, person in zip(self.persons['accusation_index'].to_numpy(),
+                                            records(self.persons, ACCUSED_PERSON_COLUMNS)):
+            accusations[accusation_index]['accused_person'].append(person)
+        for accusation_index, charge in zip(self.charges['accusation_index'].to_numpy(), object_values(self.charges['charge'])):
+            accusations[accusation_index]['charge'].append(charge)
+        return [
+            {'business': business_json(business), 'accusations': accusation}
+            for business, accusation in zip(records(self.businesses, BUSINESS_COLUMNS), accusations)
+        ]
@@ -1,116 +1,790 @@
 import supabase
+import httpx
 import os 
 import dotenv
-from typing import List, Dict, Any, Optional
+from postgrest.exceptions import APIError
+from postgrest.utils import SyncClient, sanitize_param
+from import_journal import ImportJournal, record_hash
+from case_sheet import (CaseSheet, ReportSheet, AccusationSheet, CASE_COLUMNS, REPORT_DISPOSITION_COLUMNS,
+                        ACCUSATION_COLUMNS, BUSINESS_COLUMNS, business_json, records)
+from delta_index import DeltaIndex, case_fingerprints
+from metrics import Metrics, REGISTRY
+from rate_limit import AdaptiveBatchSize, RetryPolicy, TokenBucket
+from validation import Quarantine
+import numpy as np
+import pandas as pd
+import logging
+import threading
+import time
+import itertools
+import collections
+import re
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+from typing import List, Dict, Any, Optional, Iterator, Iterable, Tuple, Callable
+
+# 행 단위 실패는 import_summary 의 실패 수/일부 실패 내용으로만 돌려주고, 로그에는 debug 로만 남긴다
+logger = logging.getLogger(__name__)
+
+# 한 번의 요청으로 묶어서 insert 할 최대 행 수
+DEFAULT_BATCH_SIZE = 500
+# in_() 조회 한 번에 넣을 값의 URL 인코딩 후 최대 길이(byte). 조회는 GET 요청이라 gateway 의 URL 길이 제한(보통 8KB)을
+# 넘으면 414 로 실패한다. 한글은 글자당 9 byte(%XX x 3)로 인코딩되므로 값 개수가 아닌 길이로 나눈다
+LOOKUP_MAX_QUERY_BYTES = int(os.getenv('LOOKUP_MAX_QUERY_BYTES', '4000'))
+# 업로드 응답에 담을 최대 실패 내용 수
+DEFAULT_FAILURE_SAMPLES = 20
+# 동시에 보낼 수 있는 최대 DB 요청 수
+DEFAULT_CONCURRENCY = int(os.getenv('DB_CONCURRENCY', '4'))
+# 사건 시트 적재 방식: 'client' (PostgREST insert) 또는 'rpc' (ingest_case_sheet 함수 한 번 호출)
+DEFAULT_INGEST_MODE = os.getenv('INGEST_MODE', 'client')
+# 프로세스 전체의 초당 Supabase 요청 수 (0 이면 제한 없음). 모든 processor 가 같은 token bucket 을 공유
+DEFAULT_MAX_RPS = float(os.getenv('SUPABASE_MAX_RPS', '0'))
+DEFAULT_BURST = int(os.getenv('SUPABASE_BURST', '0')) or None
+# 일시적인 오류(429, 5xx, timeout 등)에서 요청을 보낼 최대 횟수와 첫 재시도 간격(초)
+DEFAULT_RETRY_ATTEMPTS = int(os.getenv('SUPABASE_RETRY_ATTEMPTS', '4'))
+DEFAULT_RETRY_BASE_SECONDS = float(os.getenv('SUPABASE_RETRY_BASE_SECONDS', '0.5'))
+# batch 크기를 응답 시간/오류에 따라 조절할지 여부와, 늘릴 수 있는 요청당 최대 응답 시간(초)
+ADAPTIVE_BATCH_SIZE = os.getenv('ADAPTIVE_BATCH_SIZE', 'true').lower() in ('1', 'true', 'yes')
+ADAPTIVE_BATCH_TARGET_SECONDS = float(os.getenv('ADAPTIVE_BATCH_TARGET_SECONDS', '1.0'))
+# 참조 테이블 캐시 항목의 유지 시간(초, 0 이면 만료 없음). 오래 떠 있는 서버가 다른 곳에서 수정/삭제된 업소·죄목의
+# 오래된 id 를 계속 쓰지 않도록 테이블별로 처음 채운 뒤 이 시간이 지나면 비우고 다시 조회한다
+LOOKUP_CACHE_TTL_SECONDS = float(os.getenv('LOOKUP_CACHE_TTL_SECONDS', '300'))
+# foreign key 위반. 캐시에 있던 참조 id 가 DB 에서 삭제된 경우이므로 해당 테이블 캐시를 비운다
+FOREIGN_KEY_VIOLATION = '23503'
+# 다시 보내도 결과가 같은 연산 (응답을 받지 못한 경우에도 재시도)
+IDEMPOTENT_OPERATIONS = ('select', 'upsert')
+# batch 크기 조절에 응답 시간을 반영하는 연산
+WRITE_OPERATIONS = ('insert', 'upsert')
+# 요청이 DB 에 반영되지 않은 것이 확실한 PostgREST/PostgreSQL 오류 코드
+#   PGRST000-003: DB 연결 실패, 연결 풀 대기 시간 초과 등
+#   40001, 40P01: serialization failure, deadlock (트랜잭션 롤백)
+#   53300: 연결 수 초과, 57014: statement timeout (롤백), 08xxx: 연결 오류
+TRANSIENT_ERROR_CODES = {'PGRST000', 'PGRST001', 'PGRST002', 'PGRST003', '40001', '40P01', '53300', '57014'}
+
+# 사건/피의자/처분/신고를 자연키 기준 upsert 로 쓸지 여부. migrations/20261018010000_natural_keys.sql,
+# 20261018011000_case_person_person_key.sql 의 unique index 가 없는 DB 에서는 on conflict 가 모두 실패하므로
+# 인덱스를 만든 뒤에만 켠다. journal, delta import 는 이 값과 관계없이 upsert 로 쓴다 (인덱스가 있어야 쓸 수 있다)
+UPSERT_NATURAL_KEYS = os.getenv('UPSERT_NATURAL_KEYS', 'false').lower() in ('1', 'true', 'yes')
+
+# 이름을 알 수 없는 피의자. 한 사건에 여러 명일 수 있으므로 피의자 자연키(case_person.person_key)에서 제외한다
+ANONYMOUS_PERSON_NAME = '성명불상'
+
+# delta import 에서 사건 시트 행의 fingerprint 를 기록하는 이름 (사건번호가 해마다 겹치지 않으므로 하나만 사용)
+DELTA_DATASET = 'cases'
+
+# 각 스레드가 마지막으로 받은 PostgREST 응답의 HTTP 상태 코드 (create_pooled_client 의 response hook 이 기록).
+# APIError.code 에는 JSON 본문의 code 만 들어 있어서, {"message": "API rate limit exceeded"} 같은 JSON 429/5xx 는
+# code 가 None 이고 상태 코드로만 구분할 수 있다
+_response_status = threading.local()
+
+def record_response_status(response: httpx.Response) -> None:
+    _response_status.code = response.status_code
+
+def last_response_status() -> Optional[int]:
+    return getattr(_response_status, 'code', None)
+
+def is_retryable(error: Exception, idempotent: bool, status: Optional[int] = None) -> bool:
+    """다시 보내도 되는 오류인지 판단한다. status 는 오류 응답의 HTTP 상태 코드 (알 수 있는 경우).
+
+    요청이 처리되지 않은 것이 확실한 오류(연결 실패, 429, 롤백된 트랜잭션)는 모든 연산을 재시도하고,
+    응답을 받지 못해 처리 여부를 알 수 없는 오류(읽기 timeout, gateway 5xx)는 idempotent 연산만 재시도한다.
+    """
+    if isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)):
+        return True
+    if isinstance(error, APIError):
+        code = str(error.code)
+        if code in TRANSIENT_ERROR_CODES or code.startswith('08'):
+            return True
+        # 상태 코드를 모르면 JSON 이 아닌 응답(gateway 오류 등)에서 code 에 들어간 HTTP 상태 코드(int)를 쓴다
+        if status is None and isinstance(error.code, int):
+            status = error.code
+        if status == 429 or code == '429':
+            return True
+        return idempotent and status is not None and status >= 500
+    return idempotent and isinstance(error, (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError))
+
+def chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    # list 뿐 아니라 generator 도 size 개씩 묶어서 반환
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def person_key(name: Any) -> Optional[str]:
+    # case_person.person_key 와 같은 값. 이름이 비어 있거나 성명불상이면 None
+    if name is None or pd.isna(name):
+        return None
+    name = str(name)
+    if name.strip() == '' or name.startswith(ANONYMOUS_PERSON_NAME):
+        return None
+    return name
+
+def referenced_table(error: APIError) -> Optional[str]:
+    # foreign key 위반 오류의 details (Key (business_id)=(...) is not present in table "businesses".) 에서 참조 테이블 이름
+    match = re.search(r'table "(\w+)"', str(error.details or ''))
+    return match.group(1) if match else None
+
+def chunked_by_length(values: Iterable[Any], max_bytes: int = LOOKUP_MAX_QUERY_BYTES) -> Iterator[List[Any]]:
+    # in_() 필터에 들어갈 값(PostgREST 따옴표 처리 + URL 인코딩 + 구분자 %2C)의 길이 합이 max_bytes 를 넘지 않도록 묶는다.
+    # 값 하나가 max_bytes 보다 길면 그 값만 따로 보낸다
+    chunk = []
+    length = 0
+    for value in values:
+        size = len(quote(sanitize_param(value), safe='')) + 3
+        if chunk and length + size > max_bytes:
+            yield chunk
+            chunk = []
+            length = 0
+        chunk.append(value)
+        length += size
+    if chunk:
+        yield chunk
+
+class LookupCache:
+    """charge_types, disposition_types, business_types, businesses 조회 결과를 메모리에 보관한다.
+
+    키는 테이블별로 다음과 같다.
+      - charge_types, disposition_types: (name, detail_name 또는 None)
+      - business_types, businesses: name
+    """
+    TABLES = ('charge_types', 'disposition_types', 'business_types', 'businesses')
+
+    def __init__(self, ttl: float = LOOKUP_CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._tables: Dict[str, Dict[Any, str]] = {table: {} for table in self.TABLES}
+        # 테이블별로 비어 있던 캐시에 처음 값을 넣은 시각 (ttl 이 지나면 테이블 전체를 비움)
+        self._filled_at: Dict[str, Optional[float]] = {table: None for table in self.TABLES}
+
+    def get(self, table: str, key: Any) -> Optional[str]:
+        filled_at = self._filled_at[table]
+        if self.ttl > 0 and filled_at is not None and time.monotonic() - filled_at > self.ttl:
+            self.invalidate(table)
+            return None
+        return self._tables[table].get(key)
+
+    def _touch(self, table: str) -> None:
+        if self._filled_at[table] is None:
+            self._filled_at[table] = time.monotonic()
+
+    def put(self, table: str, key: Any, value: str) -> None:
+        with self._lock:
+            self._touch(table)
+            self._tables[table][key] = value
+
+    def load(self, table: str, rows: List[Dict[str, Any]]) -> None:
+        entries = {}
+        for row in rows:
+            if 'detail_name' in row:
+                # detail_name 없이 조회하면 이름이 같은 첫 번째 행을 돌려주는 SELECT 와 동일하게 동작
+                entries.setdefault((row['name'], None), row['id'])
+                entries[(row['name'], row['detail_name'] or None)] = row['id']
+            else:
+                entries.setdefault(row['name'], row['id'])
+        # rows 는 테이블 전체(select_all)이므로 기존 항목을 바꿔 끼우고 만료 시각도 새로 센다
+        with self._lock:
+            self._tables[table] = entries
+            self._filled_at[table] = time.monotonic()
+
+    def invalidate(self, table: Optional[str] = None) -> None:
+        """table 을 지정하면 해당 테이블만, 지정하지 않으면 전체 캐시를 비운다."""
+        with self._lock:
+            tables = self.TABLES if table is None else (table,)
+            for name in tables:
+                self._tables[name] = {}
+                self._filled_at[name] = None
+
+    def size(self, table: Optional[str] = None) -> int:
+        if table is not None:
+            return len(self._tables[table])
+        return sum(len(entries) for entries in self._tables.values())
+
+_client: Optional[supabase.Client] = None
+# _client 를 만든 프로세스. fork 된 자식 프로세스는 부모의 연결 풀을 쓰지 않고 새로 만든다
+_client_pid: Optional[int] = None
+_client_lock = threading.Lock()
+
+def create_pooled_client() -> supabase.Client:
+    dotenv.load_dotenv()
+
+    client = supabase.create_client(os.getenv('SUPABASE_URL'), os.getenv('SUPABASE_KEY'))
+    # PostgREST 요청에 쓰이는 httpx client 를 keep-alive 연결 풀 설정을 적용한 client 로 교체
+    limits = httpx.Limits(
+        max_connections=int(os.getenv('SUPABASE_MAX_CONNECTIONS', '20')),
+        max_keepalive_connections=int(os.getenv('SUPABASE_MAX_KEEPALIVE_CONNECTIONS', '10')),
+        keepalive_expiry=float(os.getenv('SUPABASE_KEEPALIVE_EXPIRY', '30')),
+    )
+    default_session = client.postgrest.session
+    client.postgrest.session = SyncClient(
+        base_url=default_session.base_url,
+        headers=default_session.headers,
+        timeout=default_session.timeout,
+        follow_redirects=True,
+        http2=True,
+        limits=limits,
+        # 오류 응답의 HTTP 상태 코드를 재시도 판단(is_retryable)에 쓰도록 기록
+        event_hooks={'response': [record_response_status]},
+    )
+    default_session.close()
+    return client
+
+def get_supabase_client() -> supabase.Client:
+    """프로세스 전체에서 공유하는 Supabase client 를 반환한다. 처음 호출될 때 한 번만 생성된다."""
+    global _client, _client_pid
+    if _client is None or _client_pid != os.getpid():
+        with _client_lock:
+            if _client is None or _client_pid != os.getpid():
+                _client = create_pooled_client()
+                _client_pid = os.getpid()
+    return _client
+
+def reset_supabase_client() -> None:
+    # 연결 풀을 닫고 다음 호출에서 새로 만들도록 한다 (fork 된 자식 프로세스 등에서 사용)
+    global _client, _client_pid
+    with _client_lock:
+        # 부모 프로세스에서 만든 연결은 닫지 않고 버리기만 한다 (닫으면 부모와 공유하는 socket 에 종료 frame 을 보냄)
+        if _client is not None and _client_pid == os.getpid():
+            _client.postgrest.session.close()
+        _client = None
+        _client_pid = None
+
+_rate_limiter: Optional[TokenBucket] = None
+_lookup_cache: Optional[LookupCache] = None
+
+def get_lookup_cache() -> LookupCache:
+    """프로세스 전체에서 공유하는 참조 테이블 캐시. 오래 떠 있는 서버(warm instance)는 요청마다 다시 조회하지 않는다."""
+    global _lookup_cache
+    if _lookup_cache is None:
+        with _client_lock:
+            if _lookup_cache is None:
+                _lookup_cache = LookupCache()
+    return _lookup_cache
+
+def get_rate_limiter() -> Optional[TokenBucket]:
+    """SUPABASE_MAX_RPS 가 설정되어 있으면 프로세스 전체에서 공유하는 token bucket 을 반환한다."""
+    global _rate_limiter
+    if _rate_limiter is None and DEFAULT_MAX_RPS > 0:
+        with _client_lock:
+            if _rate_limiter is None:
+                _rate_limiter = TokenBucket(DEFAULT_MAX_RPS, DEFAULT_BURST)
+    return _rate_limiter
 
 class DbConnector:
-    def __init__(self):
-        dotenv.load_dotenv()
-        
-        self.SUPABASE_URL = os.getenv('SUPABASE_URL')
-        self.SUPABASE_KEY = os.getenv('SUPABASE_KEY')        
-        self.supabase = supabase.create_client(self.SUPABASE_URL, self.SUPABASE_KEY)
+    def __init__(self, lookup_cache: Optional[LookupCache] = None, client: Optional[supabase.Client] = None,
+                 metrics: Optional[Metrics] = None, rate_limiter: Optional[TokenBucket] = None,
+                 batch_sizer: Optional[AdaptiveBatchSize] = None):
+        self.supabase = client if client is not None else get_supabase_client()
+        self.SUPABASE_URL = self.supabase.supabase_url
+        self.SUPABASE_KEY = self.supabase.supabase_key
+        self.lookup_cache = lookup_cache
+        self.metrics = metrics if metrics is not None else REGISTRY
+        self.rate_limiter = rate_limiter if rate_limiter is not None else get_rate_limiter()
+        # batch_sizer 가 있으면 여러 행을 쓰는 요청의 응답 시간과 오류를 알려서 batch 크기를 조절
+        self.batch_sizer = batch_sizer
+        self.retry = RetryPolicy(DEFAULT_RETRY_ATTEMPTS, DEFAULT_RETRY_BASE_SECONDS)
+
+    def _execute(self, query: Any, table: str, operation: str) -> Any:
+        # 모든 Supabase 요청은 여기를 거쳐서 테이블/연산별 요청 수, 지연 시간, 반환 행 수를 기록
+        # 일시적인 오류는 jitter 를 넣은 지수 backoff 로 다시 보낸다 (is_retryable)
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                waited = self.rate_limiter.acquire()
+                if waited:
+                    self.metrics.record_stage('rate_limit_wait', waited)
+            start = time.perf_counter()
+            _response_status.code = None
+            try:
+                response = query.execute()
+            except Exception as e:
+                self.metrics.record_request(table, operation, time.perf_counter() - start, error=True)
+                if self.lookup_cache is not None and isinstance(e, APIError) and str(e.code) == FOREIGN_KEY_VIOLATION:
+                    # 캐시의 id 가 가리키는 행이 삭제된 경우. 다음 조회에서 DB 의 현재 값을 다시 읽도록 비운다
+                    referenced = referenced_table(e)
+                    self.lookup_cache.invalidate(referenced if referenced in LookupCache.TABLES else None)
+                status = last_response_status()
+                if self.batch_sizer is not None and operation in WRITE_OPERATIONS:
+                    # 과부하(429, 5xx, timeout 등 일시적인 오류)일 때만 batch 를 줄인다.
+                    # 23505, 23503, 22P02 같은 데이터 오류는 서버 부하와 관계없으므로 응답 시간만 반영
+                    self.batch_sizer.record(time.perf_counter() - start, error=is_retryable(e, True, status))
+                attempt += 1
+                if attempt >= self.retry.attempts or not is_retryable(e, operation in IDEMPOTENT_OPERATIONS, status):
+                    raise
+                delay = self.retry.delay(attempt - 1)
+                self.metrics.record_stage('retry_wait', delay)
+                time.sleep(delay)
+                continue
+            seconds = time.perf_counter() - start
+            rows = len(response.data) if isinstance(response.data, list) else 0
+            self.metrics.record_request(table, operation, seconds, rows)
+            # 행 하나짜리 요청(업소 하나 생성 등)은 batch 크기와 관계없이 빠르므로 반영하지 않는다
+            if self.batch_sizer is not None and operation in WRITE_OPERATIONS and rows > 1:
+                self.batch_sizer.record(seconds)
+            return response
+
+    def select_all(self, table: str, columns: str, page_size: int = 1000) -> List[Dict[str, Any]]:
+        # PostgREST 의 최대 반환 행 수 제한을 넘지 않도록 range 로 나눠서 조회
+        rows = []
+        start = 0
+        while True:
+            response = self._execute(self.supabase.table(table).select(columns).range(start, start + page_size - 1), table, 'select')
+            rows.extend(response.data)
+            if len(response.data) < page_size:
+                return rows
+            start += page_size
+
+    def _cached(self, table: str, key: Any) -> Optional[str]:
+        if self.lookup_cache is None:
+            return None
+        return self.lookup_cache.get(table, key)
+
+    def _remember(self, table: str, key: Any, value: str) -> str:
+        if self.lookup_cache is not None:
+            self.lookup_cache.put(table, key, value)
+        return value
 
 class BusinessProcessor(DbConnector):
     def insert_business_data(self, data: Dict[str, Any]) -> str:
-        response = self.supabase.table('businesses').insert(data).execute()
-        return response.data[0]['id']
+        response = self._execute(self.supabase.table('businesses').insert(data), 'businesses', 'insert')
+        business_id = response.data[0]['id']
+        if 'name' in data:
+            self._remember('businesses', data['name'], business_id)
+        return business_id
     
     def get_business_id(self, name: str) -> Optional[str]:
-        response = self.supabase.table('businesses').select('id').eq('name', name).execute()
+        cached = self._cached('businesses', name)
+        if cached is not None:
+            return cached
+        response = self._execute(self.supabase.table('businesses').select('id').eq('name', name), 'businesses', 'select')
         if len(response.data) == 0:
             return None
-        return response.data[0]['id']
+        return self._remember('businesses', name, response.data[0]['id'])
     
     def get_business_type(self, type: str = None, category: str = None) -> str:
-        response = self.supabase.table('business_types').select('id').eq('name', category).execute()
+        cached = self._cached('business_types', category)
+        if cached is not None:
+            return cached
+        response = self._execute(self.supabase.table('business_types').select('id').eq('name', category), 'business_types', 'select')
         if len(response.data) == 0:  # 데이터가 없는 경우 새로 생성
             insert_data = {'name': category}
             if type is not None:
                 insert_data['type'] = type
-            response = self.supabase.table('business_types').insert(insert_data).execute()
-        return response.data[0]['id']
+            response = self._execute(self.supabase.table('business_types').insert(insert_data), 'business_types', 'insert')
+        return self._remember('business_types', category, response.data[0]['id'])
+
+    def get_business_ids(self, names: Iterable[str], max_bytes: int = LOOKUP_MAX_QUERY_BYTES) -> Dict[str, str]:
+        """이름별 업소 id. 캐시에 없는 이름만 in_() 으로 max_bytes 길이씩 나눠 조회하고, DB 에 없는 이름은 결과에서 빠진다."""
+        ids = {}
+        missing = []
+        for name in dict.fromkeys(names):
+            cached = self._cached('businesses', name)
+            if cached is not None:
+                ids[name] = cached
+            else:
+                missing.append(name)
+        for chunk in chunked_by_length(missing, max_bytes):
+            response = self._execute(self.supabase.table('businesses').select('id, name').in_('name', chunk), 'businesses', 'select')
+            for row in response.data:
+                # 이름이 같은 업소가 여러 개면 첫 번째 행 (get_business_id 와 동일)
+                if row['name'] not in ids:
+                    ids[row['name']] = self._remember('businesses', row['name'], row['id'])
+        return ids
+
+    def get_business_type_ids(self, types: Dict[str, Optional[str]], max_bytes: int = LOOKUP_MAX_QUERY_BYTES) -> Dict[str, str]:
+        """업종(category) -> type 을 받아 업종별 id 를 반환한다. 없는 업종은 한 번의 bulk insert 로 만든다."""
+        ids = {}
+        missing = []
+        for category in types:
+            cached = self._cached('business_types', category)
+            if cached is not None:
+                ids[category] = cached
+            else:
+                missing.append(category)
+        for chunk in chunked_by_length(missing, max_bytes):
+            response = self._execute(self.supabase.table('business_types').select('id, name').in_('name', chunk), 'business_types', 'select')
+            for row in response.data:
+                if row['name'] not in ids:
+                    ids[row['name']] = self._remember('business_types', row['name'], row['id'])
+
+        rows = []
+        for category in missing:
+            if category in ids:
+                continue
+            insert_data = {'name': category}
+            if types[category] is not None:
+                insert_data['type'] = types[category]
+            rows.append(insert_data)
+        for chunk in chunked(rows, DEFAULT_BATCH_SIZE):
+            # type 이 없는 행은 get_business_type 과 같이 컬럼 기본값을 쓰도록 missing=default
+            response = self._execute(self.supabase.table('business_types').insert(chunk, default_to_null=False), 'business_types', 'insert')
+            for row, inserted in zip(chunk, response.data):
+                ids[row['name']] = self._remember('business_types', row['name'], inserted['id'])
+        return ids
+
+    # 여러 업소를 한 번에 insert 하고, 입력 순서대로 생성된 id 목록을 반환
+    def insert_business_data_bulk(self, data: List[Dict[str, Any]]) -> List[str]:
+        response = self._execute(self.supabase.table('businesses').insert(data, default_to_null=False), 'businesses', 'insert')
+        ids = [row['id'] for row in response.data]
+        for row, business_id in zip(data, ids):
+            if 'name' in row:
+                self._remember('businesses', row['name'], business_id)
+        return ids
 
 class AccusationProcessor(DbConnector):
     def insert_accusation_data(self, business_id: str, accused_at: Any, office: str) -> str:
         if hasattr(accused_at, 'isoformat'):
             accused_at = accused_at.isoformat()    
-        response = self.supabase.table('accusations').insert({
+        response = self._execute(self.supabase.table('accusations').insert({
             'business_id': business_id, 
             'accused_at': accused_at, 
             'office': office
-        }).execute()
+        }), 'accusations', 'insert')
         return response.data[0]['id']
     
     def insert_accused_person(self, accusation_id: str, name: str, role: str) -> None:
-        self.supabase.table('accused_person').insert({
+        self._execute(self.supabase.table('accused_person').insert({
             'accusation_id': accusation_id, 
             'name': name, 
             'role': role
-        }).execute()
+        }), 'accused_person', 'insert')
     
     def insert_accusation_charge(self, accusation_id: str, charge_id: str) -> None:
-        self.supabase.table('accusation_charges').insert({
+        self._execute(self.supabase.table('accusation_charges').insert({
             'accusation_id': accusation_id, 
             'charge_id': charge_id
-        }).execute()
+        }), 'accusation_charges', 'insert')
+
+    # 여러 행을 한 번에 insert 하고, 입력 순서대로 생성된 id 목록을 반환
+    def insert_accusation_data_bulk(self, data: List[Dict[str, Any]]) -> List[str]:
+        rows = [
+            dict(row, accused_at=row['accused_at'].isoformat()) if hasattr(row['accused_at'], 'isoformat') else row
+            for row in data
+        ]
+        response = self._execute(self.supabase.table('accusations').insert(rows), 'accusations', 'insert')
+        return [row['id'] for row in response.data]
+
+    def insert_accused_person_bulk(self, data: List[Dict[str, Any]]) -> None:
+        self._execute(self.supabase.table('accused_person').insert(data), 'accused_person', 'insert')
+
+    def insert_accusation_charge_bulk(self, data: List[Dict[str, Any]]) -> None:
+        self._execute(self.supabase.table('accusation_charges').insert(data), 'accusation_charges', 'insert')
 
 class ReportProcessor(DbConnector):
     def insert_report_data(self, data: Dict[str, Any]) -> str:
-        response = self.supabase.table('reports').insert(data).execute()
+        response = self._execute(self.supabase.table('reports').insert(data), 'reports', 'insert')
         return response.data[0]['id']
     
     def insert_report_disposition(self, data: Dict[str, Any]) -> str:
-        response = self.supabase.table('report_dispositions').insert(data).execute()
+        response = self._execute(self.supabase.table('report_dispositions').insert(data), 'report_dispositions', 'insert')
+        return response.data[0]['id']
+
+    # 신고번호 / report_id 를 기준으로 upsert (다시 실행해도 중복 생성되지 않음)
+    def upsert_report_data(self, data: Dict[str, Any]) -> str:
+        response = self._execute(self.supabase.table('reports').upsert(data, on_conflict='number'), 'reports', 'upsert')
         return response.data[0]['id']
+
+    def upsert_report_disposition(self, data: Dict[str, Any]) -> str:
+        response = self._execute(self.supabase.table('report_dispositions').upsert(data, on_conflict='report_id'), 'report_dispositions', 'upsert')
+        return response.data[0]['id']
+
+    # 여러 행을 한 번에 insert 하고, 입력 순서대로 생성된 id 목록을 반환
+    def insert_report_data_bulk(self, data: List[Dict[str, Any]]) -> List[str]:
+        response = self._execute(self.supabase.table('reports').insert(data), 'reports', 'insert')
+        return [row['id'] for row in response.data]
+
+    def insert_report_disposition_bulk(self, data: List[Dict[str, Any]]) -> None:
+        self._execute(self.supabase.table('report_dispositions').insert(data), 'report_dispositions', 'insert')
+
+    # 한 요청 안에 같은 키가 두 번 들어가면 upsert 가 실패하므로 마지막 행만 보내고, 반환된 id 는 입력 순서대로 다시 매핑한다
+    def upsert_report_data_bulk(self, data: List[Dict[str, Any]]) -> List[str]:
+        unique_rows = {str(row['number']): row for row in data}
+        response = self._execute(self.supabase.table('reports').upsert(list(unique_rows.values()), on_conflict='number'), 'reports', 'upsert')
+        ids = {str(row['number']): row['id'] for row in response.data}
+        return [ids[str(row['number'])] for row in data]
+
+    def upsert_report_disposition_bulk(self, data: List[Dict[str, Any]]) -> None:
+        unique_rows = {row['report_id']: row for row in data}
+        self._execute(self.supabase.table('report_dispositions').upsert(
+            list(unique_rows.values()), on_conflict='report_id'
+        ), 'report_dispositions', 'upsert')
         
 class CaseProcessor(DbConnector):
     def insert_case_data(self, data: Dict[str, Any]) -> str:
-        response = self.supabase.table('cases').insert(data).execute()
+        response = self._execute(self.supabase.table('cases').insert(data), 'cases', 'insert')
         return response.data[0]['id']
         
     def insert_case_person_data(self, data):
-        response = self.supabase.table('case_person').insert(data).execute()
+        response = self._execute(self.supabase.table('case_person').insert(data), 'case_person', 'insert')
         return response.data[0]['id']
     
     def insert_case_person_dispositions(self, data):
-        response = self.supabase.table('case_person_dispositions').insert(data).execute()
+        response = self._execute(self.supabase.table('case_person_dispositions').insert(data), 'case_person_dispositions', 'insert')
         return response.data[0]['id']
 
+    # migrations/20261018000000_ingest_case_sheet.sql 의 함수로 사건 시트 전체를 한 트랜잭션에 적재
+    def ingest_case_sheet_rpc(self, data: List[Dict[str, Any]]) -> Dict[str, Any]:
+        payload = [{'case': item['case'], 'persons': item['persons']} for item in data]
+        response = self._execute(self.supabase.rpc('ingest_case_sheet', {'payload': payload}), 'ingest_case_sheet', 'rpc')
+        return response.data
+
+    # 여러 행을 한 번에 insert 하고, 입력 순서대로 생성된 id 목록을 반환
+    def insert_case_data_bulk(self, data: List[Dict[str, Any]]) -> List[str]:
+        response = self._execute(self.supabase.table('cases').insert(data), 'cases', 'insert')
+        return [row['id'] for row in response.data]
+
+    def insert_case_person_data_bulk(self, data: List[Dict[str, Any]]) -> List[str]:
+        response = self._execute(self.supabase.table('case_person').insert(data), 'case_person', 'insert')
+        return [row['id'] for row in response.data]
+
+    def insert_case_person_dispositions_bulk(self, data: List[Dict[str, Any]]) -> List[str]:
+        response = self._execute(self.supabase.table('case_person_dispositions').insert(data), 'case_person_dispositions', 'insert')
+        return [row['id'] for row in response.data]
+
+    # 자연키 기준 upsert. 한 요청 안에 같은 키가 두 번 들어가면 upsert 가 실패하므로 하나로 합쳐서 보내고,
+    # 반환된 id 는 입력 순서대로 다시 매핑한다.
+    def upsert_case_data_bulk(self, data: List[Dict[str, Any]]) -> List[str]:
+        unique_rows = {str(row['number']): row for row in data}
+        response = self._execute(self.supabase.table('cases').upsert(list(unique_rows.values()), on_conflict='number'), 'cases', 'upsert')
+        ids = {str(row['number']): row['id'] for row in response.data}
+        return [ids[str(row['number'])] for row in data]
+
+    def upsert_case_person_data_bulk(self, data: List[Dict[str, Any]]) -> List[str]:
+        # 성명불상/이름 없는 피의자는 자연키가 없으므로 (person_key 가 null) 합치지 않고 그대로 insert 한다
+        named = [row for row in data if person_key(row['name']) is not None]
+        anonymous = [row for row in data if person_key(row['name']) is None]
+        ids = {}
+        if named:
+            unique_rows = {(row['case_id'], person_key(row['name'])): row for row in named}
+            response = self._execute(self.supabase.table('case_person').upsert(
+                list(unique_rows.values()), on_conflict='case_id,person_key'
+            ), 'case_person', 'upsert')
+            ids = {(row['case_id'], person_key(row['name'])): row['id'] for row in response.data}
+        anonymous_ids = iter(self.insert_case_person_data_bulk(anonymous) if anonymous else [])
+        return [
+            ids[(row['case_id'], person_key(row['name']))] if person_key(row['name']) is not None else next(anonymous_ids)
+            for row in data
+        ]
+
+    def upsert_case_person_dispositions_bulk(self, data: List[Dict[str, Any]], update: bool = False) -> int:
+        # update=True 이면 같은 자연키의 기존 행(벌금 등)을 새 값으로 덮어쓴다. 기본은 기존 행을 그대로 둔다.
+        # 덮어쓸 때 한 요청 안에 같은 키가 두 번 들어가면 실패하므로 마지막 행만 보낸다.
+        # 실제로 쓴 행 수를 반환한다 (기존 행을 그대로 둔 경우 응답에 포함되지 않음)
+        unique_rows = {(row['person_id'], row['charge_id'], row['disposition_id'], row['disposal_date']): row for row in data}
+        response = self._execute(self.supabase.table('case_person_dispositions').upsert(
+            list(unique_rows.values()),
+            on_conflict='person_id,charge_id,disposition_id,disposal_date',
+            ignore_duplicates=not update
+        ), 'case_person_dispositions', 'upsert')
+        return len(response.data)
+
 class CommonProcessor(DbConnector):
     def get_charge_id(self, charge: str, detail_name: str) -> str:
+        key = (charge, detail_name or None)
+        cached = self._cached('charge_types', key)
+        if cached is not None:
+            return cached
         query = self.supabase.table('charge_types').select('id').eq('name', charge)
         if detail_name: 
             query = query.eq('detail_name', detail_name)
-        response = query.execute()
+        response = self._execute(query, 'charge_types', 'select')
         if len(response.data) == 0: 
-            response = self.supabase.table('charge_types').insert({'name': charge, 'detail_name': detail_name}).execute()
-        return response.data[0]['id']
+            response = self._execute(self.supabase.table('charge_types').insert({'name': charge, 'detail_name': detail_name}), 'charge_types', 'insert')
+        return self._remember('charge_types', key, response.data[0]['id'])
+
+    def get_charge_ids(self, charges: Iterable[str], max_bytes: int = LOOKUP_MAX_QUERY_BYTES) -> Dict[str, str]:
+        """세부 죄명 없이 죄명만으로 찾는 get_charge_id(charge, None) 를 여러 죄명에 대해 한꺼번에 처리한다.
+
+        캐시에 없는 죄명은 in_() 으로 max_bytes 길이씩 나눠 조회하고, DB 에도 없는 죄명은 한 번의 bulk insert 로 만든다.
+        """
+        ids = {}
+        missing = []
+        for charge in dict.fromkeys(charges):
+            cached = self._cached('charge_types', (charge, None))
+            if cached is not None:
+                ids[charge] = cached
+            else:
+                missing.append(charge)
+        for chunk in chunked_by_length(missing, max_bytes):
+            response = self._execute(self.supabase.table('charge_types').select('id, name').in_('name', chunk), 'charge_types', 'select')
+            for row in response.data:
+                if row['name'] not in ids:
+                    ids[row['name']] = self._remember('charge_types', (row['name'], None), row['id'])
+
+        rows = [{'name': charge, 'detail_name': None} for charge in missing if charge not in ids]
+        for chunk in chunked(rows, DEFAULT_BATCH_SIZE):
+            response = self._execute(self.supabase.table('charge_types').insert(chunk), 'charge_types', 'insert')
+            for row, inserted in zip(chunk, response.data):
+                ids[row['name']] = self._remember('charge_types', (row['name'], None), inserted['id'])
+        return ids
     
     def get_disposition_id(self, disposition: str, detail_name: str) -> str:
+        key = (disposition, detail_name or None)
+        cached = self._cached('disposition_types', key)
+        if cached is not None:
+            return cached
         query = self.supabase.table('disposition_types').select('id').eq('name', disposition)
         if detail_name: 
             query = query.eq('detail_name', detail_name)
-        response = query.execute()
-        return response.data[0]['id']
+        response = self._execute(query, 'disposition_types', 'select')
+        return self._remember('disposition_types', key, response.data[0]['id'])
 
 class DataProcessor:
-    def __init__(self):
-        self.business_processor = BusinessProcessor()
-        self.accusation_processor = AccusationProcessor()
-        self.case_processor = CaseProcessor()
-        self.common_processor = CommonProcessor()
-        self.report_processor = ReportProcessor()
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE, concurrency: int = DEFAULT_CONCURRENCY,
+                 client: Optional[supabase.Client] = None, ingest_mode: str = DEFAULT_INGEST_MODE,
+                 journal: Optional[ImportJournal] = None, metrics: Optional[Metrics] = None,
+                 rate_limiter: Optional[TokenBucket] = None, quarantine: Optional[Quarantine] = None,
+                 source: Optional[str] = None, delta_index: Optional[DeltaIndex] = None,
+                 lookup_cache: Optional[LookupCache] = None):
+        # batch_size 가 0 이하이면 행 단위로 insert (기존 방식)
+        self.batch_size = batch_size
+        # 서로 독립적인 사건/신고/고발 단위를 동시에 처리할 최대 작업자 수 (1 이면 순차 처리)
+        self.concurrency = concurrency
+        # 'rpc' 이면 사건 시트를 DB 함수 한 번 호출로 적재하고, 실패하면 client 방식으로 대체
+        self.ingest_mode = ingest_mode
+        self._rpc_available = True
+        # journal 이 있으면 파일별로 적재가 끝난 레코드를 기록해서 다시 실행할 때 건너뛴다
+        self.journal = journal
+        self.skipped_records = 0
+        # delta_index 가 있으면 사건 시트에서 이전 업로드 이후 새로 생기거나 바뀐 행만 upsert 로 쓴다
+        self.delta_index = delta_index
+        self.unchanged_rows = 0
+        # 이 업로드에서 지금까지 나온 delta key 별 행 수 (같은 key 의 행을 순서로 구분한다, case_fingerprints)
+        self._delta_occurrences = collections.Counter()
+        # 사건/피의자/처분/신고를 자연키 기준 upsert 로 쓸지 여부 (UPSERT_NATURAL_KEYS)
+        self.upsert = UPSERT_NATURAL_KEYS or journal is not None or delta_index is not None
+        # 모든 processor 가 같은 Supabase client(연결 풀)와 참조 테이블 캐시를 공유
+        client = client if client is not None else get_supabase_client()
+        # 단계별 소요 시간과 테이블/연산별 요청 수는 이 processor 의 metrics 와 프로세스 전체 REGISTRY 에 함께 기록
+        self.metrics = metrics if metrics is not None else Metrics(REGISTRY)
+        # lookup_cache 를 넘기면 여러 processor(요청)가 참조 테이블 조회 결과를 공유 (get_lookup_cache)
+        self.lookup_cache = lookup_cache if lookup_cache is not None else LookupCache()
+        # batch 크기는 batch_size 에서 시작해서 쓰기 요청의 응답 시간과 오류에 따라 조절된다 (ADAPTIVE_BATCH_SIZE)
+        self.batch_sizer = AdaptiveBatchSize(batch_size, target_seconds=ADAPTIVE_BATCH_TARGET_SECONDS) \
+            if batch_size > 0 and ADAPTIVE_BATCH_SIZE else None
+        # rate_limiter 가 있으면 모든 processor 의 요청을 합쳐서 초당 요청 수를 제한 (없으면 SUPABASE_MAX_RPS)
+        connector_args = (self.lookup_cache, client, self.metrics, rate_limiter, self.batch_sizer)
+        self.business_processor = BusinessProcessor(*connector_args)
+        self.accusation_processor = AccusationProcessor(*connector_args)
+        self.case_processor = CaseProcessor(*connector_args)
+        self.common_processor = CommonProcessor(*connector_args)
+        self.report_processor = ReportProcessor(*connector_args)
+        # 테이블별로 실제 insert 된 행 수
+        self.inserted_rows: Dict[str, int] = collections.Counter()
+        # 생성(upsert)된 사건 id 와 실패 내용. 실패는 응답에 담을 수 있도록 앞의 max_failure_samples 개만 보관
+        self.case_ids: List[Any] = []
+        self.failures: List[str] = []
+        self.failure_count = 0
+        self.max_failure_samples = DEFAULT_FAILURE_SAMPLES
+        # 적재하지 못한 레코드(없는 죄목/처분, 행 단위 insert 실패)는 quarantine 에 source 이름으로 보관하고 나머지는 계속 처리
+        self.quarantine = quarantine
+        self.source = source
+        self.quarantined = 0
+        self._stats_lock = threading.Lock()
+
+    def current_batch_size(self) -> int:
+        # 행 단위 방식(batch_size <= 0)에서도 묶어서 처리하는 곳(journal, stream)은 DEFAULT_BATCH_SIZE 를 쓴다
+        if self.batch_sizer is not None:
+            return self.batch_sizer.size
+        return self.batch_size if self.batch_size > 0 else DEFAULT_BATCH_SIZE
+
+    def _chunks(self, items: Iterable[Any]) -> Iterator[List[Any]]:
+        # chunked 와 같지만 chunk 마다 그 시점의 batch 크기를 쓴다
+        iterator = iter(items)
+        while True:
+            chunk = list(itertools.islice(iterator, self.current_batch_size()))
+            if not chunk:
+                return
+            yield chunk
+
+    def _count_inserted(self, table: str, count: int = 1) -> None:
+        with self._stats_lock:
+            self.inserted_rows[table] += count
+
+    def _record_cases(self, case_ids: List[Any]) -> None:
+        with self._stats_lock:
+            self.case_ids.extend(case_ids)
+        self._count_inserted('cases', len(case_ids))
+
+    def _record_failure(self, message: str) -> None:
+        logger.debug(message)
+        with self._stats_lock:
+            self.failure_count += 1
+            if len(self.failures) < self.max_failure_samples:
+                self.failures.append(message)
+
+    def _quarantine(self, kind: str, rows: List[Tuple[str, Any]]) -> None:
+        # (이유, 레코드) 목록
+        with self._stats_lock:
+            self.quarantined += len(rows)
+        if self.quarantine is not None:
+            self.quarantine.add(self.source, kind, [(None, reason, record) for reason, record in rows])
+
+    def import_summary(self) -> Dict[str, Any]:
+        """업로드 응답용 요약: 테이블별 insert 수, 생성된 사건 id, 실패 수와 일부 실패 내용."""
+        with self._stats_lock:
+            return {
+                'inserted_rows': dict(self.inserted_rows),
+                'case_ids': list(self.case_ids),
+                'skipped_records': self.skipped_records,
+                'failure_count': self.failure_count,
+                'failures': list(self.failures),
+                'quarantined': self.quarantined,
+                'unchanged_rows': self.unchanged_rows,
+                'batch_size': self.current_batch_size(),
+            }
+
+    def _run_parallel(self, func: Callable[[Any], Any], items: List[Any]) -> List[Any]:
+        # 각 item 안에서는 부모 -> 자식 순서대로 처리되고, item 끼리만 동시에 실행된다
+        if self.concurrency <= 1 or len(items) <= 1:
+            return [func(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(items))) as executor:
+            return list(executor.map(func, items))
+
+    def _process_journaled(self, records: List[Dict[str, Any]], source_key: str,
+                           process: Callable[[List[Dict[str, Any]]], bool]) -> bool:
+        # 처리 중에 레코드가 수정되므로 hash 는 먼저 계산
+        with self.metrics.stage('journal'):
+            hashes = [record_hash(record) for record in records]
+            done = self.journal.completed(source_key, hashes)
+        pending = [(hash_, record) for hash_, record in zip(hashes, records) if hash_ not in done]
+        with self._stats_lock:
+            self.skipped_records += len(records) - len(pending)
+
+        # batch 단위로 처리하고 성공한 batch 만 checkpoint 에 기록
+        success = True
+        for chunk in self._chunks(pending):
+            if process([record for _, record in chunk]):
+                self.journal.mark_done(source_key, [hash_ for hash_, _ in chunk])
+            else:
+                success = False
+        return success
+
+    # 참조 테이블 전체를 미리 캐시에 올려둔다. 캐시에 없는 값은 기존처럼 조회 시점에 채워진다.
+    def preload_lookups(self, tables: Optional[List[str]] = None) -> None:
+        columns = {
+            'charge_types': 'id, name, detail_name',
+            'disposition_types': 'id, name, detail_name',
+            'business_types': 'id, name',
+            'businesses': 'id, name',
+        }
+        with self.metrics.stage('preload_lookups'):
+            for table in tables or LookupCache.TABLES:
+                self.lookup_cache.load(table, self.common_processor.select_all(table, columns[table]))
+
+    # 다른 작업자가 참조 테이블을 수정한 경우 오래 실행되는 프로세스에서 호출
+    def invalidate_lookups(self, table: Optional[str] = None) -> None:
+        self.lookup_cache.invalidate(table)
     
     def process_persons_data(self, data_array: List[Dict[str, Any]]) -> bool:
         success = True
         try:
             # person 데이터 삽입 
             for data in data_array:
-                print(data)
                 if 'business_name' not in data:
                     success = False
-                    print(f"Missing business_name in data: {data}")
+                    self._record_failure(f"Missing business_name in data: {data}")
                     continue
                     
                 person_insert = {k: v for k, v in data.items() if k != 'business_name' and k != 'dispositions'}
@@ -120,11 +794,15 @@ class DataProcessor:
                     business_id = self.business_processor.insert_business_data({'name': data['business_name']})
                 
                 person_insert['business_id'] = business_id
-                person_id = self.case_processor.insert_case_person_data(person_insert)
+                if self.upsert:
+                    person_id = self.case_processor.upsert_case_person_data_bulk([person_insert])[0]
+                else:
+                    person_id = self.case_processor.insert_case_person_data(person_insert)
+                self._count_inserted('case_person')
                 
                 # disposition 데이터 삽입
                 if 'dispositions' not in data or not data['dispositions']:
-                    print(f"No dispositions for person with business: {data['business_name']}")
+                    logger.debug(f"No dispositions for person with business: {data['business_name']}")
                     continue
                     
                 for disposition in data['dispositions']:
@@ -139,25 +817,142 @@ class DataProcessor:
                         disposition_insert['charge_id'] = charge_id
                         disposition_insert['disposition_id'] = disposition_id
                     elif not charge_id:
-                        print(f"Person ID: {person_id} have no charge: {disposition['charge']} {disposition["charge_detail"]}")
+                        self._record_failure(f"Person ID: {person_id} have no charge: {disposition['charge']} {disposition['charge_detail']}")
                         success = False
                     elif not disposition_id:
-                        print(f"Person ID: {person_id} have no disposition: {disposition['disposition']} {disposition["disposition_detail"]}")
+                        self._record_failure(f"Person ID: {person_id} have no disposition: {disposition['disposition']} {disposition['disposition_detail']}")
                         success = False
                     
                     try:
-                        self.case_processor.insert_case_person_dispositions(disposition_insert)
+                        if self.upsert:
+                            written = self.case_processor.upsert_case_person_dispositions_bulk(
+                                [disposition_insert], update=self.delta_index is not None
+                            )
+                        else:
+                            self.case_processor.insert_case_person_dispositions(disposition_insert)
+                            written = 1
+                        self._count_inserted('case_person_dispositions', written)
                     except Exception as e:
-                        print(f"Error processing disposition data: {e}")
-                print(f"Person ID: {person_id} processed successfully")
+                        self._record_failure(f"Error processing disposition data: {e}")
                         
         except Exception as e:
-            print(f"Error processing persons data: {e}")
+            self._record_failure(f"Error processing persons data: {e}")
             success = False
         
         return success
     
-    def process_case_sheet_data(self, data_array: List[Dict[str, Any]]) -> bool:
+    def process_persons_data_batched(self, data_array: List[Dict[str, Any]]) -> bool:
+        success = True
+        persons = []
+        for data in data_array:
+            if 'business_name' not in data:
+                success = False
+                self._record_failure(f"Missing business_name in data: {data}")
+                continue
+            persons.append(data)
+
+        try:
+            # 같은 업소명은 한 번만 조회/생성 (이후 조회는 lookup cache 에서 처리)
+            business_ids = {}
+            for name in dict.fromkeys(person['business_name'] for person in persons):
+                business_id = self.business_processor.get_business_id(name)
+                if not business_id:
+                    business_id = self.business_processor.insert_business_data({'name': name})
+                business_ids[name] = business_id
+        except Exception as e:
+            self._record_failure(f"Error processing business data: {e}")
+            return False
+
+        for person_chunk in self._chunks(persons):
+            try:
+                person_inserts = []
+                for data in person_chunk:
+                    person_insert = {k: v for k, v in data.items() if k != 'business_name' and k != 'dispositions'}
+                    person_insert['business_id'] = business_ids[data['business_name']]
+                    person_inserts.append(person_insert)
+                if self.upsert:
+                    person_ids = self.case_processor.upsert_case_person_data_bulk(person_inserts)
+                else:
+                    person_ids = self.case_processor.insert_case_person_data_bulk(person_inserts)
+                self._count_inserted('case_person', len(person_ids))
+            except Exception as e:
+                self._record_failure(f"Error processing persons data: {e}")
+                success = False
+                continue
+
+            # 생성된 person id 를 처분 행에 연결
+            disposition_inserts = []
+            for data, person_id in zip(person_chunk, person_ids):
+                for disposition in data.get('dispositions') or []:
+                    try:
+                        charge_id = self.common_processor.get_charge_id(disposition["charge"], disposition["charge_detail"])
+                        disposition_id = self.common_processor.get_disposition_id(disposition["disposition"], disposition["disposition_detail"])
+                    except Exception as e:
+                        self._record_failure(f"Person ID: {person_id} have no charge/disposition: {disposition}: {e}")
+                        self._quarantine('cases', [('unknown charge/disposition', dict(disposition, person_id=person_id))])
+                        success = False
+                        continue
+
+                    disposition_inserts.append({
+                        'fine_amount': disposition["fine_amount"] if disposition["fine_amount"] else 0,
+                        'person_id': person_id,
+                        'disposal_date': disposition["disposal_date"],
+                        'charge_id': charge_id,
+                        'disposition_id': disposition_id,
+                    })
+
+            for disposition_chunk in self._chunks(disposition_inserts):
+                try:
+                    if self.upsert:
+                        written = self.case_processor.upsert_case_person_dispositions_bulk(
+                            disposition_chunk, update=self.delta_index is not None
+                        )
+                    else:
+                        written = len(self.case_processor.insert_case_person_dispositions_bulk(disposition_chunk))
+                    self._count_inserted('case_person_dispositions', written)
+                except Exception as e:
+                    self._record_failure(f"Error processing disposition data: {e}")
+                    success = False
+
+        return success
+
+    def process_case_sheet_data_rpc(self, data_array: List[Dict[str, Any]]) -> Optional[bool]:
+        """ingest_case_sheet 함수로 적재한다. 함수를 쓸 수 없으면 None 을 반환한다."""
+        try:
+            result = self.case_processor.ingest_case_sheet_rpc(data_array)
+        except Exception as e:
+            # 호출이 실패하면 트랜잭션이 롤백되므로 client 방식으로 다시 적재할 수 있다
+            logger.warning(f"Case sheet RPC failed, falling back to client-side ingest: {e}")
+            if getattr(e, 'code', None) == 'PGRST202':  # 함수가 배포되지 않은 경우 이후 호출도 client 방식 사용
+                self._rpc_available = False
+            return None
+
+        self._record_cases(result['case_ids'])
+        self._count_inserted('case_person', result['persons'])
+        self._count_inserted('case_person_dispositions', result['dispositions'])
+        for skipped in result['skipped_dispositions']:
+            self._record_failure(f"Person ID: {skipped['person_id']} have no disposition: {skipped['disposition']} {skipped['disposition_detail']}")
+        self._quarantine('cases', [('unknown disposition', skipped) for skipped in result['skipped_dispositions']])
+        return not result['skipped_dispositions']
+
+    def process_case_sheet_data(self, data_array: List[Dict[str, Any]], source_key: Optional[str] = None) -> bool:
+        # source_key(파일 이름 등)가 주어지면 journal 에 기록된 사건은 건너뛰고 나머지만 적재
+        if self.journal is not None and source_key is not None:
+            return self._process_journaled(data_array, source_key, self.process_case_sheet_data)
+
+        if self.ingest_mode == 'rpc' and self._rpc_available:
+            with self.metrics.stage('write_cases_rpc'):
+                result = self.process_case_sheet_data_rpc(data_array)
+            if result is not None:
+                return result
+
+        if self.batch_size > 0:
+            return self.process_case_sheet_data_batched(data_array)
+
+        with self.metrics.stage('write_cases'):
+            return self._process_case_sheet_rows(data_array)
+
+    def _process_case_sheet_rows(self, data_array: List[Dict[str, Any]]) -> bool:
         person_array = []
         
         for data in data_array:
@@ -166,97 +961,698 @@ class DataProcessor:
                         
             try:
                 case_insert = {k: v for k, v in case_data.items() if k != 'business_name'}
-                case_id = self.case_processor.insert_case_data(case_insert)
+                if self.upsert:
+                    case_id = self.case_processor.upsert_case_data_bulk([case_insert])[0]
+                else:
+                    case_id = self.case_processor.insert_case_data(case_insert)
+                self._record_cases([case_id])
                 
                 for person in person_data:
                     person['case_id'] = case_id
                     person_array.append(person)
                     
             except Exception as e:
-                print(f"Error processing business data: {e}")
+                self._record_failure(f"Error processing business data: {e}")
         
         if person_array:
             result = self.process_persons_data(person_array)
             return result
         
         return False
+
+    def _resolve_business_names(self, names: Iterable[str]) -> Dict[str, str]:
+        # 업소 이름 -> id. 기존 업소는 in_() 조회로, 없는 업소는 이름만 넣어 bulk insert 한다 (사건 시트에는 업종이 없음)
+        names = list(dict.fromkeys(names))
+        ids = self.business_processor.get_business_ids(names)
+        missing = [{'name': name} for name in names if name not in ids]
+        for chunk in self._chunks(missing):
+            ids.update(zip((row['name'] for row in chunk), self.business_processor.insert_business_data_bulk(chunk)))
+        return ids
+
+    def _prepare_case_lookups(self, persons: List[Dict[str, Any]]) -> None:
+        # 병렬 처리 중에 같은 업소/죄목이 동시에 생성되지 않도록 먼저 한 번씩 조회/생성해서 캐시에 올려둔다
+        self._resolve_business_names([person['business_name'] for person in persons if 'business_name' in person])
+
+        dispositions = [disposition for person in persons for disposition in person.get('dispositions') or []]
+        for charge, detail_name in dict.fromkeys((d["charge"], d["charge_detail"]) for d in dispositions):
+            self.common_processor.get_charge_id(charge, detail_name)
+        for disposition, detail_name in dict.fromkeys((d["disposition"], d["disposition_detail"]) for d in dispositions):
+            try:
+                self.common_processor.get_disposition_id(disposition, detail_name)
+            except Exception:
+                pass  # 없는 처분은 행을 넣을 때 실패로 기록된다
+
+    def _process_case_chunk(self, chunk: List[Dict[str, Any]]) -> bool:
+        try:
+            case_inserts = [{k: v for k, v in data['case'].items() if k != 'business_name'} for data in chunk]
+            if self.upsert:
+                case_ids = self.case_processor.upsert_case_data_bulk(case_inserts)
+            else:
+                case_ids = self.case_processor.insert_case_data_bulk(case_inserts)
+            self._record_cases(case_ids)
+        except Exception as e:
+            self._record_failure(f"Error processing case data: {e}")
+            return False
+
+        person_array = []
+        for data, case_id in zip(chunk, case_ids):
+            for person in data['persons']:
+                person['case_id'] = case_id
+                person_array.append(person)
+        return self.process_persons_data_batched(person_array)
+
+    def process_case_sheet_data_batched(self, data_array: List[Dict[str, Any]]) -> bool:
+        persons = [person for data in data_array for person in data['persons']]
+        if not persons:
+            return False
+
+        try:
+            with self.metrics.stage('resolve_lookups'):
+                self._prepare_case_lookups(persons)
+        except Exception as e:
+            self._record_failure(f"Error processing business data: {e}")
+            return False
+
+        # 사건은 batch_size 단위로 묶어서 insert 하고, 묶음끼리는 동시에 처리
+        with self.metrics.stage('write_cases'):
+            results = self._run_parallel(self._process_case_chunk, list(self._chunks(data_array)))
+        return all(results)
     
-    def process_report_data(self, data: List[Dict[str, Any]]) -> bool:
+    def _prepare_frame_lookups(self, sheet: CaseSheet) -> Dict[str, Dict[Any, Optional[str]]]:
+        # _prepare_case_lookups 와 같지만 고유한 값만 열에서 바로 꺼낸다
+        # 조회한 id 는 sheet 단위로 따로 들고 있어서, 쓰는 도중에 공유 캐시가 만료/무효화되어도 행이 빠지지 않는다
+        lookups = {
+            'businesses': self._resolve_business_names(sheet.persons['business_name'].unique()),
+            'charge_types': {},
+            'disposition_types': {},
+        }
+
+        dispositions = sheet.dispositions
+        for charge, detail_name in dispositions[['charge', 'charge_detail']].drop_duplicates().itertuples(index=False):
+            lookups['charge_types'][(charge, detail_name or None)] = self.common_processor.get_charge_id(charge, detail_name)
+        for disposition, detail_name in dispositions[['disposition', 'disposition_detail']].drop_duplicates().itertuples(index=False):
+            try:
+                lookups['disposition_types'][(disposition, detail_name or None)] = \
+                    self.common_processor.get_disposition_id(disposition, detail_name)
+            except Exception:
+                pass  # 없는 처분은 행을 넣을 때 실패로 기록된다
+        return lookups
+
+    def _lookup_pairs(self, resolved: Dict[Any, Optional[str]], names: pd.Series, details: pd.Series) -> np.ndarray:
+        # (이름, 세부이름) 조합마다 한 번만 조회해서 행 전체에 펼친다
+        codes, pairs = pd.factorize(pd.MultiIndex.from_arrays([names, details]))
+        ids = np.array([resolved.get((name, detail or None)) for name, detail in pairs], dtype=object)
+        return ids[codes]
+
+    def _process_case_frame_chunk(self, sheet: CaseSheet, lookups: Dict[str, Dict[Any, Optional[str]]]) -> bool:
         try:
-            for report in data:
-                business_id = self.business_processor.get_business_id(report["business"]["name"])
-                if not business_id:
-                   business_type_id = self.business_processor.get_business_type(report["business"]["type"], report["business"]["category"])
-                   biz_data = report["business"]
-                   insert_biz_data = {k: v for k, v in biz_data.items() if k != 'category'}
-                   insert_biz_data["business_type_id"] = business_type_id
-                   business_id = self.business_processor.insert_business_data(insert_biz_data)
-                
-                # Create report data dictionary
-                report_data = {
-                    "reported_at": report["reported_at"],
-                    "reported_to": report["reported_to"],
-                    "number": report["number"],
-                    "content_body": report["content_body"],
-                    "business_id": business_id
-                }
-                report_id = self.report_processor.insert_report_data(report_data)
-                
-                # 처분 날짜가 있으면 
-                if report["disposition"]["received_at"]:
-                    disposition_data = report["disposition"]
-                    disposition_data["report_id"] = report_id
-                    self.report_processor.insert_report_disposition(disposition_data)
-                    
+            case_inserts = [dict(zip(CASE_COLUMNS, values)) for values in zip(
+                *(sheet.cases[name].to_numpy(dtype=object) for name in CASE_COLUMNS)
+            )]
+            if self.upsert:
+                case_ids = self.case_processor.upsert_case_data_bulk(case_inserts)
+            else:
+                case_ids = self.case_processor.insert_case_data_bulk(case_inserts)
+            self._record_cases(case_ids)
+        except Exception as e:
+            self._record_failure(f"Error processing case data: {e}")
+            return False
+
+        persons = sheet.persons
+        person_inserts = [
+            {'name': name, 'role': role, 'business_id': lookups['businesses'].get(business_name), 'case_id': case_id}
+            for name, role, business_name, case_id in zip(
+                persons['name'].to_numpy(dtype=object),
+                persons['role'].to_numpy(dtype=object),
+                persons['business_name'].to_numpy(dtype=object),
+                np.asarray(case_ids, dtype=object)[persons['case_index'].to_numpy()],
+            )
+        ]
+        person_ids = []
+        for person_chunk in self._chunks(person_inserts):
+            try:
+                if self.upsert:
+                    person_ids += self.case_processor.upsert_case_person_data_bulk(person_chunk)
+                else:
+                    person_ids += self.case_processor.insert_case_person_data_bulk(person_chunk)
+                self._count_inserted('case_person', len(person_chunk))
+            except Exception as e:
+                self._record_failure(f"Error processing persons data: {e}")
+                return False
+
+        dispositions = sheet.dispositions
+        charge_ids = self._lookup_pairs(lookups['charge_types'], dispositions['charge'], dispositions['charge_detail'])
+        disposition_ids = self._lookup_pairs(lookups['disposition_types'], dispositions['disposition'], dispositions['disposition_detail'])
+        person_ids = np.asarray(person_ids, dtype=object)[dispositions['person_index'].to_numpy()]
+
+        # 조회되지 않은 죄목/처분이 있는 행은 기록만 하고 제외
+        success = True
+        missing = pd.isna(charge_ids) | pd.isna(disposition_ids)
+        unresolved = []
+        for person_id, disposition in zip(person_ids[missing], dispositions[missing].to_dict('records')):
+            self._record_failure(f"Person ID: {person_id} have no charge/disposition: {disposition}")
+            unresolved.append(('unknown charge/disposition', dict(disposition, person_id=person_id)))
+            success = False
+        self._quarantine('cases', unresolved)
+
+        keep = ~missing
+        disposition_inserts = [
+            {'fine_amount': fine_amount if fine_amount else 0, 'person_id': person_id, 'disposal_date': disposal_date,
+             'charge_id': charge_id, 'disposition_id': disposition_id}
+            for fine_amount, person_id, disposal_date, charge_id, disposition_id in zip(
+                dispositions['fine_amount'].to_numpy(dtype=object)[keep],
+                person_ids[keep],
+                dispositions['disposal_date'].to_numpy(dtype=object)[keep],
+                charge_ids[keep],
+                disposition_ids[keep],
+            )
+        ]
+
+        for disposition_chunk in self._chunks(disposition_inserts):
+            try:
+                if self.upsert:
+                    written = self.case_processor.upsert_case_person_dispositions_bulk(
+                        disposition_chunk, update=self.delta_index is not None
+                    )
+                else:
+                    written = len(self.case_processor.insert_case_person_dispositions_bulk(disposition_chunk))
+                self._count_inserted('case_person_dispositions', written)
+            except Exception as e:
+                self._record_failure(f"Error processing disposition data: {e}")
+                success = False
+        return success
+
+    def process_case_frame(self, sheet: CaseSheet, source_key: Optional[str] = None) -> bool:
+        """ExcelReader.case_frame_from_df 결과(CaseSheet)를 중첩 dict 로 바꾸지 않고 적재한다.
+
+        journal / rpc / 행 단위 방식은 중첩 dict 가 필요하므로 process_case_sheet_data 로 넘긴다.
+        delta_index 가 있으면 이전 업로드 이후 새로 생기거나 바뀐 행만 적재한다.
+        """
+        if self.delta_index is not None:
+            return self._process_case_delta(sheet, source_key)
+        return self._write_case_frame(sheet, source_key)
+
+    def _process_case_delta(self, sheet: CaseSheet, source_key: Optional[str] = None) -> bool:
+        # 이전 업로드의 fingerprint 와 비교해서 새 행과 내용이 바뀐 행(및 그 사건/피의자)만 쓴다
+        with self.metrics.stage('delta'):
+            keys, fingerprints = case_fingerprints(sheet, self._delta_occurrences)
+            changed = self.delta_index.changed(DELTA_DATASET, keys, fingerprints)
+        with self._stats_lock:
+            self.unchanged_rows += int(len(changed) - changed.sum())
+        if not changed.any():
+            return True
+
+        success = self._write_case_frame(sheet.take(changed), source_key)
+        # 적재에 실패한 sheet 는 기록하지 않아서 다음 업로드 때 다시 보낸다
+        if success:
+            self.delta_index.record(DELTA_DATASET, keys[changed], fingerprints[changed])
+        return success
+
+    def _write_case_frame(self, sheet: CaseSheet, source_key: Optional[str] = None) -> bool:
+        # ingest_case_sheet 함수는 기존 처분(벌금 등)을 덮어쓰지 않으므로 delta import 에서는 client 방식으로 쓴다
+        if (self.journal is not None and source_key is not None) or self.batch_size <= 0 \
+                or (self.ingest_mode == 'rpc' and self._rpc_available and self.delta_index is None):
+            return self.process_case_sheet_data(sheet.to_json(), source_key)
+        if len(sheet.persons) == 0:
+            return False
+
+        try:
+            with self.metrics.stage('resolve_lookups'):
+                lookups = self._prepare_frame_lookups(sheet)
         except Exception as e:
-            print(f"Error processing report data: {e}")
+            self._record_failure(f"Error processing business data: {e}")
             return False
+
+        size = self.current_batch_size()
+        chunks = [sheet.slice(start, start + size) for start in range(0, len(sheet), size)]
+        with self.metrics.stage('write_cases'):
+            return all(self._run_parallel(lambda chunk: self._process_case_frame_chunk(chunk, lookups), chunks))
+
+    def process_case_frames(self, sheets: Iterable[CaseSheet],
+                            on_batch: Optional[Callable[[Dict[str, int]], None]] = None,
+                            source_key: Optional[str] = None) -> Dict[str, int]:
+        """ExcelReader.iter_case_frames_from_csv 가 반환하는 CaseSheet 를 하나씩 적재한다. 전체 결과를 메모리에 들고 있지 않는다.
+
+        on_batch 가 주어지면 sheet 하나를 쓸 때마다 해당 sheet 의 집계를 넘겨준다.
+        rows_inserted 는 실제로 insert 된 처분(원본 CSV 행) 수, skipped_cases 는 journal 에 이미 적재된 것으로
+        기록되어 건너뛴 사건 수, unchanged_rows 는 delta import 에서 이전 업로드와 같아서 쓰지 않은 처분 수이다.
+        failure_count 는 실패로 기록된 수(_record_failure)이므로 dispositions - rows_inserted 와 다르다.
+        """
+        summary = collections.Counter({'cases': 0, 'persons': 0, 'dispositions': 0, 'rows_inserted': 0,
+                                       'skipped_cases': 0, 'unchanged_rows': 0, 'failure_count': 0, 'failed_batches': 0})
+        for sheet in sheets:
+            inserted_before = self.inserted_rows['case_person_dispositions']
+            skipped_before = self.skipped_records
+            unchanged_before = self.unchanged_rows
+            failures_before = self.failure_count
+            success = self.process_case_frame(sheet, source_key)
+            batch_summary = {
+                'cases': len(sheet.cases),
+                'persons': len(sheet.persons),
+                'dispositions': len(sheet.dispositions),
+                'rows_inserted': self.inserted_rows['case_person_dispositions'] - inserted_before,
+                'skipped_cases': self.skipped_records - skipped_before,
+                'unchanged_rows': self.unchanged_rows - unchanged_before,
+                'failure_count': self.failure_count - failures_before,
+                'failed_batches': 0 if success else 1,
+            }
+            summary.update(batch_summary)
+            if on_batch is not None:
+                on_batch(batch_summary)
+        return dict(summary)
+
+    def _resolve_businesses(self, businesses: List[Dict[str, Any]]) -> Dict[str, str]:
+        """업소 이름 -> id. 기존 업소는 in_() 조회로, 없는 업소는 업종과 함께 bulk insert 로 만든다.
+
+        업소 수와 관계없이 요청 수는 chunk 수만큼만 늘어난다. 결과는 lookup_cache 에도 들어간다.
+        """
+        by_name = {}
+        for business in businesses:
+            by_name.setdefault(business["name"], business)
+        businesses = by_name
+        ids = self.business_processor.get_business_ids(businesses)
+        missing = [business for name, business in businesses.items() if name not in ids]
+        if not missing:
+            return ids
+
+        types = {}
+        for business in missing:
+            types.setdefault(business["category"], business["type"])
+        type_ids = self.business_processor.get_business_type_ids(types)
+        rows = []
+        for business in missing:
+            insert_biz_data = {k: v for k, v in business.items() if k != 'category'}
+            insert_biz_data["business_type_id"] = type_ids[business["category"]]
+            rows.append(insert_biz_data)
+        for chunk in self._chunks(rows):
+            ids.update(zip((row["name"] for row in chunk), self.business_processor.insert_business_data_bulk(chunk)))
+        return ids
+
+    def _get_or_create_report_business(self, business: Dict[str, Any]) -> str:
+        business_id = self.business_processor.get_business_id(business["name"])
+        if not business_id:
+            business_type_id = self.business_processor.get_business_type(business["type"], business["category"])
+            insert_biz_data = {k: v for k, v in business.items() if k != 'category'}
+            insert_biz_data["business_type_id"] = business_type_id
+            business_id = self.business_processor.insert_business_data(insert_biz_data)
+        return business_id
+
+    def _process_report(self, report: Dict[str, Any]) -> bool:
+        business_id = self._get_or_create_report_business(report["business"])
+
+        # Create report data dictionary
+        report_data = {
+            "reported_at": report["reported_at"],
+            "reported_to": report["reported_to"],
+            "number": report["number"],
+            "content_body": report["content_body"],
+            "business_id": business_id
+        }
+        if self.upsert:
+            report_id = self.report_processor.upsert_report_data(report_data)
+        else:
+            report_id = self.report_processor.insert_report_data(report_data)
+        self._count_inserted('reports')
+
+        # 처분 날짜가 있으면 
+        if report["disposition"]["received_at"]:
+            disposition_data = report["disposition"]
+            disposition_data["report_id"] = report_id
+            if self.upsert:
+                self.report_processor.upsert_report_disposition(disposition_data)
+            else:
+                self.report_processor.insert_report_disposition(disposition_data)
+            self._count_inserted('report_dispositions')
         return True
+
+    def _process_report_isolated(self, report: Dict[str, Any]) -> bool:
+        # 신고 하나가 실패해도 나머지 신고는 계속 처리
+        try:
+            return self._process_report(report)
+        except Exception as e:
+            self._record_failure(f"Error processing report {report.get('number')}: {e}")
+            self._quarantine('reports', [(str(e), report)])
+            return False
+
+    def process_report_data(self, data: List[Dict[str, Any]], source_key: Optional[str] = None) -> bool:
+        if self.journal is not None and source_key is not None:
+            return self._process_journaled(data, source_key, self.process_report_data)
+
+        try:
+            # 업소는 같은 이름이 동시에 생성되지 않도록 신고 처리 전에 한꺼번에 조회/생성해 둔다.
+            # 이후 _process_report 의 업소 조회는 모두 lookup_cache 에서 끝난다
+            with self.metrics.stage('resolve_lookups'):
+                self._resolve_businesses([report["business"] for report in data])
+
+        except Exception as e:
+            self._record_failure(f"Error processing report data: {e}")
+            return False
+
+        with self.metrics.stage('write_reports'):
+            return all(self._run_parallel(self._process_report_isolated, data))
     
+    def process_report_frame(self, sheet: ReportSheet, source_key: Optional[str] = None) -> bool:
+        """ExcelReader.report_frame_from_df 가 반환하는 ReportSheet 를 chunk 단위 bulk 요청으로 적재한다.
+
+        업소는 시트 전체에서 한 번에 조회/생성하고, 신고/처리결과는 batch_size 개씩 multi-row 요청으로 쓴다.
+        journal 과 행 단위(batch_size <= 0) 모드는 중첩 dict 로 바꿔서 process_report_data 로 처리한다.
+        """
+        if (self.journal is not None and source_key is not None) or self.batch_size <= 0:
+            return self.process_report_data(sheet.to_json(), source_key)
+        if len(sheet) == 0:
+            return True
+
+        try:
+            with self.metrics.stage('resolve_lookups'):
+                businesses = records(sheet.businesses.drop_duplicates('name'), BUSINESS_COLUMNS)
+                business_ids = self._resolve_businesses([business_json(business) for business in businesses])
+        except Exception as e:
+            self._record_failure(f"Error processing report data: {e}")
+            return False
+
+        size = self.current_batch_size()
+        chunks = [sheet.slice(start, start + size) for start in range(0, len(sheet), size)]
+        with self.metrics.stage('write_reports'):
+            return all(self._run_parallel(lambda chunk: self._process_report_frame_chunk(chunk, business_ids), chunks))
+
+    def _process_report_frame_chunk(self, sheet: ReportSheet, business_ids: Dict[str, str]) -> bool:
+        # 신고 chunk 하나를 reports -> report_dispositions 순서로 bulk insert (처리일자가 있는 신고만 처리결과를 씀)
+        reports = sheet.reports
+        report_inserts = [
+            {'reported_at': reported_at, 'reported_to': reported_to, 'number': number, 'content_body': content_body,
+             'business_id': business_ids.get(business_name)}
+            for reported_at, reported_to, number, content_body, business_name in zip(
+                *(reports[name].to_numpy(dtype=object) for name in ('reported_at', 'reported_to', 'number', 'content_body')),
+                sheet.businesses['name'].to_numpy(dtype=object),
+            )
+        ]
+        try:
+            if self.upsert:
+                report_ids = self.report_processor.upsert_report_data_bulk(report_inserts)
+            else:
+                report_ids = self.report_processor.insert_report_data_bulk(report_inserts)
+            self._count_inserted('reports', len(report_ids))
+        except Exception as e:
+            if len(report_inserts) == 1:
+                self._record_failure(f"Error processing report {report_inserts[0]['number']}: {e}")
+                self._quarantine('reports', [(str(e), sheet.to_json()[0])])
+                return False
+            # 한 행 때문에 chunk 전체가 실패하지 않도록 행 단위로 다시 처리해서 실패한 신고만 quarantine 에 보관
+            logger.warning(f"Report batch failed, retrying row by row: {e}")
+            return all([self._process_report_isolated(report) for report in sheet.to_json()])
+
+        received = (sheet.dispositions['received_at'].to_numpy(dtype=object) != "")
+        disposition_inserts = [
+            dict(disposition, report_id=report_id)
+            for disposition, report_id in zip(
+                records(sheet.dispositions[received], REPORT_DISPOSITION_COLUMNS),
+                np.asarray(report_ids, dtype=object)[received],
+            )
+        ]
+        success = True
+        for disposition_chunk in self._chunks(disposition_inserts):
+            try:
+                if self.upsert:
+                    self.report_processor.upsert_report_disposition_bulk(disposition_chunk)
+                else:
+                    self.report_processor.insert_report_disposition_bulk(disposition_chunk)
+                self._count_inserted('report_dispositions', len(disposition_chunk))
+            except Exception as e:
+                self._record_failure(f"Error processing report disposition data: {e}")
+                self._quarantine('reports', [(str(e), disposition) for disposition in disposition_chunk])
+                success = False
+        return success
+
+    def _process_accusation(self, accusation: Dict[str, Any]) -> bool:
+        accusation_id = self.accusation_processor.insert_accusation_data(
+            accusation["business_id"], 
+            accusation["accused_at"], 
+            accusation["office"]
+        )
+        
+        for person in accusation["accused_person"]:
+            self.accusation_processor.insert_accused_person(
+                accusation_id, 
+                person["name"], 
+                person["role"]
+            )                    
+        for charge in accusation["charge"]:
+            charge_id = self.common_processor.get_charge_id(charge, None)
+            self.accusation_processor.insert_accusation_charge(accusation_id, charge_id)
+        return True
+
+    def _process_accusation_isolated(self, accusation: Dict[str, Any]) -> bool:
+        # 고발 하나가 실패해도 나머지 고발은 계속 처리
+        try:
+            return self._process_accusation(accusation)
+        except Exception as e:
+            self._record_failure(f"Error processing accusation data: {e}")
+            self._quarantine('accusations', [(str(e), accusation)])
+            return False
+
+    def _process_accusation_chunk(self, accusations: List[Dict[str, Any]]) -> bool:
+        # 고발 chunk 하나를 accusations -> accused_person -> accusation_charges 순서로 bulk insert
+        try:
+            accusation_ids = self.accusation_processor.insert_accusation_data_bulk([
+                {'business_id': accusation["business_id"], 'accused_at': accusation["accused_at"], 'office': accusation["office"]}
+                for accusation in accusations
+            ])
+            self._count_inserted('accusations', len(accusation_ids))
+        except Exception as e:
+            if len(accusations) == 1:
+                self._record_failure(f"Error processing accusation data: {e}")
+                self._quarantine('accusations', [(str(e), accusations[0])])
+                return False
+            # 한 행 때문에 chunk 전체가 실패하지 않도록 행 단위로 다시 처리해서 실패한 고발만 quarantine 에 보관
+            logger.warning(f"Accusation batch failed, retrying row by row: {e}")
+            return all([self._process_accusation_isolated(accusation) for accusation in accusations])
+
+        success = True
+        person_inserts = [
+            {'accusation_id': accusation_id, 'name': person["name"], 'role': person["role"]}
+            for accusation_id, accusation in zip(accusation_ids, accusations)
+            for person in accusation["accused_person"]
+        ]
+        for person_chunk in self._chunks(person_inserts):
+            try:
+                self.accusation_processor.insert_accused_person_bulk(person_chunk)
+                self._count_inserted('accused_person', len(person_chunk))
+            except Exception as e:
+                self._record_failure(f"Error processing accused person data: {e}")
+                self._quarantine('accusations', [(str(e), person) for person in person_chunk])
+                success = False
+
+        charge_inserts = [
+            {'accusation_id': accusation_id, 'charge_id': self._cached_charge_id(charge)}
+            for accusation_id, accusation in zip(accusation_ids, accusations)
+            for charge in accusation["charge"]
+        ]
+        for charge_chunk in self._chunks(charge_inserts):
+            try:
+                self.accusation_processor.insert_accusation_charge_bulk(charge_chunk)
+                self._count_inserted('accusation_charges', len(charge_chunk))
+            except Exception as e:
+                self._record_failure(f"Error processing accusation charge data: {e}")
+                self._quarantine('accusations', [(str(e), charge) for charge in charge_chunk])
+                success = False
+        return success
+
+    def _cached_charge_id(self, charge: str) -> Optional[str]:
+        # 보통은 캐시에서 끝나지만, 공유 캐시가 그 사이 만료/무효화되었으면 다시 조회한다
+        return self.lookup_cache.get('charge_types', (charge, None)) or self.common_processor.get_charge_id(charge, None)
+
     def process_accusation_data(self, data: List[Dict[str, Any]]) -> bool:
         try:
-            for accusation in data:
-                accusation_id = self.accusation_processor.insert_accusation_data(
-                    accusation["business_id"], 
-                    accusation["accused_at"], 
-                    accusation["office"]
-                )
-                
-                for person in accusation["accused_person"]:
-                    self.accusation_processor.insert_accused_person(
-                        accusation_id, 
-                        person["name"], 
-                        person["role"]
-                    )                    
-                for charge in accusation["charge"]:
-                    charge_id = self.common_processor.get_charge_id(charge, None)
-                    self.accusation_processor.insert_accusation_charge(accusation_id, charge_id)
-            return True
+            # 죄목은 동시에 생성되지 않도록 먼저 조회/생성 (죄명별 한 번)
+            with self.metrics.stage('resolve_lookups'):
+                charges = [charge for accusation in data for charge in accusation["charge"]]
+                if self.batch_size > 0:
+                    self.common_processor.get_charge_ids(charges)
+                else:
+                    for charge in dict.fromkeys(charges):
+                        self.common_processor.get_charge_id(charge, None)
+
+            with self.metrics.stage('write_accusations'):
+                if self.batch_size <= 0:
+                    return all(self._run_parallel(self._process_accusation_isolated, data))
+                # 요청 수가 사람/죄목 수가 아니라 batch_size 개 단위 chunk 수에 비례하도록 chunk 끼리만 병렬 처리
+                return all(self._run_parallel(self._process_accusation_chunk, list(self._chunks(data))))
         except Exception as e:
-            print(f"Error processing accusation data: {e}")
+            self._record_failure(f"Error processing accusation data: {e}")
             return False
-    
-    def process_accusation_sheet_data(self, data_array: List[Dict[str, Any]]) -> bool:
-        accusation_array = []
+
+    def _insert_accusation_business(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        business_data = data['business']
+        accusation_data = data['accusations']
         
-        for data in data_array:
-            business_data = data['business']
-            accusation_data = data['accusations']
+        try:
+            biz_insert = {k: v for k, v in business_data.items() if k != 'category'}
+            biz_insert['business_type_id'] = self.business_processor.get_business_type(
+                business_data['type'], 
+                business_data['category']
+            )
             
+            business_id = self.business_processor.insert_business_data(biz_insert)
+            accusation_data["business_id"] = business_id
+            return accusation_data
+        except Exception as e:
+            self._record_failure(f"Error processing business data: {e}")
+            return None
+
+    def _insert_accusation_businesses_rows(self, data_array: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # 업종은 동시에 생성되지 않도록 먼저 조회/생성
+        with self.metrics.stage('resolve_lookups'):
+            for data in data_array:
+                try:
+                    self.business_processor.get_business_type(data['business']['type'], data['business']['category'])
+                except Exception as e:
+                    self._record_failure(f"Error processing business data: {e}")
+
+        with self.metrics.stage('write_businesses'):
+            return [
+                accusation_data
+                for accusation_data in self._run_parallel(self._insert_accusation_business, data_array)
+                if accusation_data is not None
+            ]
+
+    def _insert_accusation_businesses(self, data_array: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # 고발 시트의 업소를 업종 조회/생성 후 chunk 단위로 bulk insert 하고, 성공한 chunk 의 고발에 business_id 를 채운다
+        with self.metrics.stage('resolve_lookups'):
+            types = {}
+            for data in data_array:
+                types.setdefault(data['business']['category'], data['business']['type'])
             try:
-                biz_insert = {k: v for k, v in business_data.items() if k != 'category'}
-                biz_insert['business_type_id'] = self.business_processor.get_business_type(
-                    business_data['type'], 
-                    business_data['category']
+                type_ids = self.business_processor.get_business_type_ids(types)
+            except Exception as e:
+                self._record_failure(f"Error processing business data: {e}")
+                return []
+
+        accusation_array = []
+        with self.metrics.stage('write_businesses'):
+            for chunk in self._chunks(data_array):
+                rows = []
+                for data in chunk:
+                    biz_insert = {k: v for k, v in data['business'].items() if k != 'category'}
+                    biz_insert['business_type_id'] = type_ids[data['business']['category']]
+                    rows.append(biz_insert)
+                try:
+                    business_ids = self.business_processor.insert_business_data_bulk(rows)
+                except Exception as e:
+                    self._record_failure(f"Error processing business data: {e}")
+                    continue
+                self._count_inserted('businesses', len(business_ids))
+                for data, business_id in zip(chunk, business_ids):
+                    data['accusations']["business_id"] = business_id
+                    accusation_array.append(data['accusations'])
+        return accusation_array
+
+    def process_accusation_frame(self, sheet: AccusationSheet) -> bool:
+        """ExcelReader.accusation_frame_from_df 가 반환하는 AccusationSheet 를 chunk 단위 bulk 요청으로 적재한다.
+
+        업종과 죄목은 시트 전체에서 고유값마다 한 번 조회/생성하고, 업소/고발/피고발인/죄목은 batch_size 개씩 쓴다.
+        행 단위(batch_size <= 0) 모드는 중첩 dict 로 바꿔서 process_accusation_sheet_data 로 처리한다.
+        """
+        if self.batch_size <= 0:
+            return self.process_accusation_sheet_data(sheet.to_json())
+        if len(sheet) == 0:
+            return False
+
+        try:
+            with self.metrics.stage('resolve_lookups'):
+                types = sheet.businesses[['category', 'type']].drop_duplicates('category')
+                type_ids = self.business_processor.get_business_type_ids(
+                    dict(zip(types['category'].to_numpy(dtype=object), types['type'].to_numpy(dtype=object)))
                 )
-                
-                business_id = self.business_processor.insert_business_data(biz_insert)
-                accusation_data["business_id"] = business_id
-                accusation_array.append(accusation_data)
+                charge_ids = self.common_processor.get_charge_ids(sheet.charges['charge'].unique())
+        except Exception as e:
+            self._record_failure(f"Error processing accusation data: {e}")
+            return False
+
+        size = self.current_batch_size()
+        chunks = [sheet.slice(start, start + size) for start in range(0, len(sheet), size)]
+        with self.metrics.stage('write_accusations'):
+            return all(self._run_parallel(
+                lambda chunk: self._process_accusation_frame_chunk(chunk, type_ids, charge_ids), chunks
+            ))
+
+    def _process_accusation_frame_chunk(self, sheet: AccusationSheet, type_ids: Dict[str, str],
+                                        charge_ids: Dict[str, str]) -> bool:
+        # 고발 chunk 하나를 businesses -> accusations -> accused_person -> accusation_charges 순서로 bulk insert
+        business_inserts = []
+        for business in records(sheet.businesses, BUSINESS_COLUMNS):
+            biz_insert = {k: v for k, v in business_json(business).items() if k != 'category'}
+            biz_insert['business_type_id'] = type_ids[business['category']]
+            business_inserts.append(biz_insert)
+        try:
+            business_ids = self.business_processor.insert_business_data_bulk(business_inserts)
+            self._count_inserted('businesses', len(business_ids))
+        except Exception as e:
+            self._record_failure(f"Error processing business data: {e}")
+            return False
+
+        accusation_inserts = [
+            dict(accusation, business_id=business_id)
+            for accusation, business_id in zip(records(sheet.accusations, ACCUSATION_COLUMNS), business_ids)
+        ]
+        try:
+            accusation_ids = np.asarray(self.accusation_processor.insert_accusation_data_bulk(accusation_inserts), dtype=object)
+            self._count_inserted('accusations', len(accusation_ids))
+        except Exception as e:
+            accusations = [
+                dict(data['accusations'], business_id=business_id) for data, business_id in zip(sheet.to_json(), business_ids)
+            ]
+            if len(accusations) == 1:
+                self._record_failure(f"Error processing accusation data: {e}")
+                self._quarantine('accusations', [(str(e), accusations[0])])
+                return False
+            # 한 행 때문에 chunk 전체가 실패하지 않도록 행 단위로 다시 처리해서 실패한 고발만 quarantine 에 보관
+            logger.warning(f"Accusation batch failed, retrying row by row: {e}")
+            return all([self._process_accusation_isolated(accusation) for accusation in accusations])
+
+        success = True
+        persons = sheet.persons
+        person_inserts = [
+            {'accusation_id': accusation_id, 'name': name, 'role': role}
+            for accusation_id, name, role in zip(
+                accusation_ids[persons['accusation_index'].to_numpy()],
+                persons['name'].to_numpy(dtype=object),
+                persons['role'].to_numpy(dtype=object),
+            )
+        ]
+        for person_chunk in self._chunks(person_inserts):
+            try:
+                self.accusation_processor.insert_accused_person_bulk(person_chunk)
+                self._count_inserted('accused_person', len(person_chunk))
             except Exception as e:
-                print(f"Error processing business data: {e}")
-        
+                self._record_failure(f"Error processing accused person data: {e}")
+                self._quarantine('accusations', [(str(e), person) for person in person_chunk])
+                success = False
+
+        charges = sheet.charges
+        charge_inserts = [
+            {'accusation_id': accusation_id, 'charge_id': charge_ids.get(charge)}
+            for accusation_id, charge in zip(
+                accusation_ids[charges['accusation_index'].to_numpy()],
+                charges['charge'].to_numpy(dtype=object),
+            )
+        ]
+        for charge_chunk in self._chunks(charge_inserts):
+            try:
+                self.accusation_processor.insert_accusation_charge_bulk(charge_chunk)
+                self._count_inserted('accusation_charges', len(charge_chunk))
+            except Exception as e:
+                self._record_failure(f"Error processing accusation charge data: {e}")
+                self._quarantine('accusations', [(str(e), charge) for charge in charge_chunk])
+                success = False
+        return success
+
+    def process_accusation_sheet_data(self, data_array: List[Dict[str, Any]]) -> bool:
+        # batch_size 가 0 이하이면 업소/고발/피고발인/죄목을 행 단위로 insert (기존 방식)
+        if self.batch_size > 0:
+            accusation_array = self._insert_accusation_businesses(data_array)
+        else:
+            accusation_array = self._insert_accusation_businesses_rows(data_array)
+
         if accusation_array:
             return self.process_accusation_data(accusation_array)
         return False
-    
\ No newline at end of file
@@ -0,0 +1,109 @@
+import collections
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from case_sheet import CaseSheet, CASE_COLUMNS, PERSON_COLUMNS, DISPOSITION_COLUMNS, object_values
+
+# 이전 업로드에서 적재한 사건 시트 행의 fingerprint 를 로컬 SQLite 파일에 기록 (delta import)
+DEFAULT_DELTA_INDEX_PATH = os.path.join(tempfile.gettempdir(), 'dasi_delta_index.sqlite3')
+
+# 행을 구분하는 열: 사건번호 + 피의자 + 처분. DB 의 자연키(cases.number, case_person(case_id, name),
+# case_person_dispositions(person, 죄목, 처분, 처분일자))와 같아서 같은 key 의 행은 upsert 로 같은 DB 행에 쓰인다
+KEY_COLUMNS = ['number', 'name', 'charge', 'charge_detail', 'disposition', 'disposition_detail', 'disposal_date']
+
+def case_fingerprints(sheet: CaseSheet, occurrences: Optional[collections.Counter] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """처분(원본 행)마다 (key hash, 행 전체 내용 hash)를 int64 배열로 반환한다.
+
+    같은 업로드에 KEY_COLUMNS 가 같은 행이 여러 번 나오면 몇 번째 행인지를 key 에 섞어서 행마다 fingerprint 를 따로 기록한다
+    (그렇지 않으면 마지막 fingerprint 만 남아서 다음 업로드마다 나머지 행을 바뀐 행으로 다시 보낸다).
+    occurrences 를 넘기면 앞선 sheet 에서 나온 key 별 횟수를 이어서 센다 (CSV chunk 로 나뉜 업로드).
+    """
+    dispositions = sheet.dispositions
+    person_index = dispositions['person_index'].to_numpy()
+    case_index = sheet.persons['case_index'].to_numpy()[person_index]
+    rows = pd.DataFrame({
+        **{name: object_values(sheet.cases[name])[case_index] for name in CASE_COLUMNS},
+        **{name: object_values(sheet.persons[name])[person_index] for name in PERSON_COLUMNS},
+        **{name: object_values(dispositions[name]) for name in DISPOSITION_COLUMNS},
+    }).astype(str)
+    # SQLite INTEGER 에 그대로 넣을 수 있도록 uint64 hash 를 int64 로 해석
+    keys = pd.util.hash_pandas_object(rows[KEY_COLUMNS], index=False).to_numpy().view(np.int64)
+    ordinals = pd.Series(keys).groupby(keys).cumcount().to_numpy()
+    if occurrences is not None:
+        ordinals += np.array([occurrences[key] for key in keys.tolist()], dtype=np.int64)
+        occurrences.update(keys.tolist())
+    # 첫 번째 행은 key 를 그대로 써서 이전에 기록한 fingerprint 와 계속 맞춘다
+    repeated = ordinals > 0
+    if repeated.any():
+        keys = keys.copy()
+        keys[repeated] = pd.util.hash_pandas_object(
+            pd.DataFrame({'key': keys[repeated], 'ordinal': ordinals[repeated]}), index=False
+        ).to_numpy().view(np.int64)
+    fingerprints = pd.util.hash_pandas_object(rows, index=False).to_numpy().view(np.int64)
+    return keys, fingerprints
+
+class DeltaIndex:
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv('DELTA_INDEX_PATH') or DEFAULT_DELTA_INDEX_PATH
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS row_fingerprints (
+                    dataset TEXT NOT NULL,
+                    row_key INTEGER NOT NULL,
+                    fingerprint INTEGER NOT NULL,
+                    imported_at REAL NOT NULL,
+                    PRIMARY KEY (dataset, row_key)
+                ) WITHOUT ROWID
+            ''')
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def changed(self, dataset: str, keys: np.ndarray, fingerprints: np.ndarray) -> np.ndarray:
+        """처음 보는 key 이거나 내용이 바뀐 행은 True 인 bool 배열.
+
+        기록 전체를 읽지 않고 이 batch 의 key 만 임시 테이블에 넣어 primary key 로 join 해서 조회한다
+        (CSV chunk 마다 호출되므로 누적된 기록 크기와 관계없이 batch 크기만큼만 읽는다).
+        """
+        with self._connect() as conn:
+            conn.execute('CREATE TEMP TABLE IF NOT EXISTS batch_keys (row_key INTEGER PRIMARY KEY)')
+            conn.execute('DELETE FROM batch_keys')
+            conn.executemany('INSERT OR IGNORE INTO batch_keys (row_key) VALUES (?)', ((key,) for key in keys.tolist()))
+            known = np.array(
+                conn.execute(
+                    'SELECT f.row_key, f.fingerprint FROM batch_keys b '
+                    'JOIN row_fingerprints f ON f.dataset = ? AND f.row_key = b.row_key',
+                    (dataset,)
+                ).fetchall(),
+                dtype=np.int64
+            ).reshape(-1, 2)
+        positions = pd.Index(known[:, 0]).get_indexer(keys)
+        changed = positions < 0
+        seen = ~changed
+        changed[seen] = known[positions[seen], 1] != fingerprints[seen]
+        return changed
+
+    def record(self, dataset: str, keys: np.ndarray, fingerprints: np.ndarray) -> None:
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO row_fingerprints (dataset, row_key, fingerprint, imported_at) VALUES (?, ?, ?, ?)',
+                [(dataset, key, fingerprint, now) for key, fingerprint in zip(keys.tolist(), fingerprints.tolist())]
+            )
+
+    def count(self, dataset: str) -> int:
+        with self._connect() as conn:
+            return conn.execute('SELECT COUNT(*) FROM row_fingerprints WHERE dataset = ?', (dataset,)).fetchone()[0]
+
+    def reset(self, dataset: str) -> None:
+        # 전체를 다시 적재해야 할 때 기록 삭제
+        with self._lock, self._connect() as conn:
+            conn.execute('DELETE FROM row_fingerprints WHERE dataset = ?', (dataset,))
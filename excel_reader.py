@@ -1,7 +1,178 @@
 import os 
+import re
+import csv
 import sys 
+import functools
+import time
+import numpy as np
 import pandas as pd
 import db_processor
+from metrics import Metrics, REGISTRY
+from case_sheet import CaseSheet, ReportSheet, AccusationSheet, CASE_COLUMNS, PERSON_COLUMNS, DISPOSITION_COLUMNS
+from validation import validate_frame
+from upload_cache import PeekableReader
+
+# 스트리밍 모드에서 한 번에 읽을 CSV 행 수
+DEFAULT_CSV_CHUNKSIZE = 50000
+
+CASE_SHEET = "2024 고발 처분내역"
+REPORT_SHEET = "2024신고"
+ACCUSATION_SHEET = "2024 고발"
+
+# 시트 종류(batch import, POST /upload/<kind>) -> 워크북의 시트 이름
+SHEET_KINDS = {
+    'cases': CASE_SHEET,
+    'reports': REPORT_SHEET,
+    'accusations': ACCUSATION_SHEET,
+}
+WORKBOOK_EXTENSIONS = ('.xlsx', '.xlsm', '.xls')
+CSV_EXTENSIONS = ('.csv',)
+
+# 시트별 읽기 스키마 (열 번호 기준)
+#   usecols: 변환 함수가 인덱스로 참조하는 앞쪽 열 개수 (그 뒤의 열은 읽지 않음)
+#   dtype:   문자열 열은 str, 값 종류가 적은 열(기관, 부서, 죄목, 처분, 업종 등)은 category 로 읽는다.
+#            날짜 열과 벌금은 지정하지 않아 엑셀의 날짜/숫자 타입을 그대로 유지
+#   dates:   변환할 때 열 전체를 한 번에 "%Y-%m-%d" 문자열로 바꾸는 날짜 열
+SHEET_SCHEMAS = {
+    CASE_SHEET: {
+        'usecols': 15,
+        'dtype': {0: str, 1: str, 2: 'category', 3: str, 5: 'category', 6: 'category', 7: str, 8: str,
+                  9: 'category', 10: 'category', 11: 'category', 12: 'category', 14: str},
+        'dates': [4],
+    },
+    REPORT_SHEET: {
+        'usecols': 16,
+        'dtype': {1: 'category', 2: str, 3: str, 5: str, 6: str, 7: 'category', 8: 'category',
+                  9: 'category', 10: 'category', 11: str, 12: str, 13: 'category', 14: str},
+        'dates': [0, 15],
+    },
+    ACCUSATION_SHEET: {
+        'usecols': 8,
+        'dtype': {0: str, 2: str, 3: 'category', 4: 'category', 6: str, 7: 'category'},
+        'dates': [],
+    },
+}
+SHEET_COLUMNS = {name: schema['usecols'] for name, schema in SHEET_SCHEMAS.items()}
+
+def select_excel_engine():
+    # EXCEL_ENGINE 으로 지정하지 않으면 설치되어 있는 경우 calamine(Rust) 엔진을 사용
+    engine = os.getenv('EXCEL_ENGINE')
+    if engine:
+        return engine
+    try:
+        import python_calamine  # noqa: F401
+        return "calamine"
+    except ImportError:
+        return "openpyxl"
+
+EXCEL_ENGINE = select_excel_engine()
+
+def format_date_column(column):
+    # 날짜는 "%Y-%m-%d" 문자열로, 그 외 값은 str() 로, 빈 값은 "" 로 변환
+    if pd.api.types.is_datetime64_any_dtype(column):
+        # 엑셀에서 날짜 타입으로 읽힌 열은 열 전체를 한 번에 변환
+        formatted = column.dt.strftime("%Y-%m-%d").to_numpy(dtype=object)
+        formatted[pd.isna(formatted)] = ""
+        return formatted
+    # 그 외(CSV 문자열, 날짜와 문자열이 섞인 열)는 같은 값을 한 번만 변환
+    codes, uniques = pd.factorize(column, use_na_sentinel=False)
+    formatted = np.array(
+        ["" if pd.isna(value) else value.strftime("%Y-%m-%d") if isinstance(value, pd.Timestamp) else str(value)
+         for value in uniques],
+        dtype=object
+    )
+    return formatted[codes]
+
+def fill_blank(df):
+    # 문자열(object)/category 열의 빈 값만 "" 로 채운다. 숫자/날짜 열은 타입을 유지하고 column_values 에서 "" 로 바꾼다
+    # fillna("") 전에 category 열에 "" 를 category 로 추가 (없는 값으로는 채울 수 없음)
+    for name in df.columns[df.dtypes == 'category']:
+        if "" not in df[name].cat.categories:
+            df[name] = df[name].cat.add_categories([""])
+    columns = df.select_dtypes(['object', 'category']).columns
+    if len(columns):
+        df[columns] = df[columns].fillna("")
+    return df
+
+def column_values(df, index):
+    # index 번째 열을 object 배열로 꺼낸다. 숫자/날짜 열의 빈 값(NaN, NaT)도 "" 로 바꾼다
+    values = df.iloc[:, index].to_numpy(dtype=object)
+    values[pd.isna(values)] = ""
+    return values
+
+def format_date_columns(df, sheet_name):
+    # 스키마의 날짜 열을 열 단위로 문자열로 바꿔 둔다 (행마다 isinstance/strftime 하지 않도록)
+    for index in SHEET_SCHEMAS[sheet_name]['dates']:
+        if index < df.shape[1]:
+            df[df.columns[index]] = format_date_column(df.iloc[:, index])
+    return df
+
+def read_options(sheet_name, column_count=None):
+    # 스키마의 usecols/dtype. 열 수를 알면 실제로 있는 열까지만 지정
+    schema = SHEET_SCHEMAS[sheet_name]
+    usecols = schema['usecols'] if column_count is None else min(schema['usecols'], column_count)
+    return {
+        'usecols': range(usecols),
+        'dtype': {index: dtype for index, dtype in schema['dtype'].items() if index < usecols},
+    }
+
+class KeywordClassifier:
+    """값에 포함된 키워드로 분류한다. 여러 키워드가 포함되어 있으면 mapping 에 먼저 정의된 키워드를 사용한다.
+
+    모든 키워드를 하나의 정규식으로 컴파일해서 한 번의 스캔으로 찾고, 같은 원본 값의 결과는 캐시한다.
+    """
+    def __init__(self, mapping, default=None, strip_spaces=True):
+        self.mapping = mapping
+        self.default = default
+        self.strip_spaces = strip_spaces
+        self._priority = {keyword: index for index, keyword in enumerate(mapping)}
+        # lookahead 로 감싸서 겹치는 위치의 키워드도 모두 찾음
+        self._pattern = re.compile("(?=(" + "|".join(re.escape(keyword) for keyword in mapping) + "))")
+        self.classify = functools.lru_cache(maxsize=4096)(self._classify)
+
+    def _classify(self, data):
+        text = data.replace(" ", "") if self.strip_spaces else data
+        keywords = [match.group(1) for match in self._pattern.finditer(text)]
+        if not keywords:
+            return self.default
+        return self.mapping[min(keywords, key=self._priority.__getitem__)]
+
+    def map_series(self, series):
+        # 열 전체를 분류할 때는 고유값만 분류해서 매핑
+        codes, uniques = pd.factorize(series, use_na_sentinel=False)
+        values = np.array([self.classify(value) for value in uniques], dtype=object)
+        return pd.Series(values[codes], index=series.index)
+
+REPORT_DISPOSITIONS = KeywordClassifier({
+    "단속예정" : 29,
+    "단속완료" : 30,
+    "정황없음" : 31,
+    "자진정비" : 32,
+    "각하(중복)" : 33,
+    "각하(미유통)": 51,
+    "확인불가" : 34,
+    "접속차단" : 35,
+    "청소년유해매체물표시" : 36,
+    "처리종결": 52
+}, default=None)  # 기타
+
+REPORT_TYPES = KeywordClassifier({
+    "성매매업소운영": 1,
+    "성매매알선광고": 2,
+    "성매매구인광고": 3,
+    "불법옥외광고물": 4
+}, default=5)  # 기타
+
+AGENCIES = KeywordClassifier({
+    "법원": "court",
+    "경찰": "police",
+    "검찰": "prosecutor"
+}, default="other", strip_spaces=False)
+
+# 업소 주소가 URL 이면 온라인 업소 (Helper.distribute_address 와 동일)
+ADDRESS_TYPES = KeywordClassifier({
+    "https://": "online"
+}, default="offline", strip_spaces=False)
 
 class Helper:
     def __init__(self):
@@ -57,11 +228,9 @@ class Helper:
         return case_json
     
     def make_report_json(self, data):
+        # 날짜 열(0, 15)은 report_data_to_json 에서 열 단위로 "%Y-%m-%d" 문자열로 바꿔 둔다
         report_json = {}
-        if pd.isna(data[0]):
-            report_json['reported_at'] = ''
-        else:
-            report_json['reported_at'] = data[0].strftime("%Y-%m-%d") if isinstance(data[0], pd.Timestamp) else str(data[0])
+        report_json['reported_at'] = data[0]
         report_json['reported_to'] = data[1]
         report_json['number'] = data[2]
         report_json['content_body'] = data[6]
@@ -72,10 +241,7 @@ class Helper:
         disposition_json['office_dept'] = data[10]
         disposition_json['officer'] = data[11]
         disposition_json['office_tel'] = data[12]
-        if pd.isna(data[15]):
-            disposition_json['received_at'] = ''
-        else:
-            disposition_json['received_at'] = data[15].strftime("%Y-%m-%d") if isinstance(data[15], pd.Timestamp) else str(data[15])
+        disposition_json['received_at'] = data[15]
         disposition_json['disposition_id'] = self.distribute_report_disposition(data[13])
         disposition_json['content_body'] = data[14]
         report_json['disposition'] = disposition_json
@@ -83,275 +249,342 @@ class Helper:
         return report_json
 
     def distribute_report_disposition(self, data):
-        results = {
-            "단속예정" : 29,
-            "단속완료" : 30,
-            "정황없음" : 31,
-            "자진정비" : 32,
-            "각하(중복)" : 33,
-            "각하(미유통)": 51,
-            "확인불가" : 34,
-            "접속차단" : 35,
-            "청소년유해매체물표시" : 36,
-            "처리종결": 52
-        }
-        for result in results:
-            if result in data.replace(" ", ""):
-                return results[result]
-        return None # 기타
+        return REPORT_DISPOSITIONS.classify(data)
     
     def distribute_report_type(self, data):
-        results = {
-            "성매매업소운영": 1,
-            "성매매알선광고": 2,
-            "성매매구인광고": 3,
-            "불법옥외광고물": 4
-        }
-        for result in results:
-            if result in data.replace(" ", ""):
-                return results[result]
-        return 5 # 기타
+        return REPORT_TYPES.classify(data)
         
     def distribute_agency(self, data):
-        if "법원" in data:
-            return "court"
-        elif "경찰" in data:
-            return "police"
-        elif "검찰" in data:
-            return "prosecutor"
-        else:
-            return "other"
+        return AGENCIES.classify(data)
         
 class ExcelReader:
-    def __init__(self):
-        pass
+    def __init__(self, engine=None, metrics=None, quarantine=None, source=None):
+        self.engine = engine or EXCEL_ENGINE
+        # 단계별 소요 시간 (read_excel, read_csv, group_cases, to_json ...)
+        self.metrics = metrics if metrics is not None else Metrics(REGISTRY)
+        # 검증에 실패한 행은 변환하지 않고 quarantine(validation.Quarantine)에 source 이름으로 보관
+        self.quarantine = quarantine
+        self.source = source
+        self.rejected_rows = 0
+        # 거부된 행의 이유 일부 (업로드 응답의 failures 에 넣는다)
+        self.rejections = []
+        # (파일 경로, 수정 시각) -> 시트 이름별 DataFrame. 같은 파일의 다른 시트를 변환할 때 다시 파싱하지 않는다.
+        self._workbooks = {}
+
+    def read_workbook(self, file_path, sheet_names=None):
+        """워크북을 한 번만 열어서 필요한 시트들을 함께 읽는다. 경로로 받은 파일은 결과를 재사용한다."""
+        sheet_names = list(sheet_names or SHEET_COLUMNS)
+        cache_key = None
+        if isinstance(file_path, (str, os.PathLike)):
+            cache_key = (os.path.abspath(file_path), os.path.getmtime(file_path))
+            cached = self._workbooks.get(cache_key, {})
+            if all(name in cached for name in sheet_names):
+                return {name: cached[name] for name in sheet_names}
+
+        sheets = {}
+        with self.metrics.stage('read_excel'), pd.ExcelFile(file_path, engine=self.engine) as workbook:
+            for name in sheet_names:
+                if name not in workbook.sheet_names:
+                    continue
+                try:
+                    if name in SHEET_SCHEMAS:
+                        sheets[name] = workbook.parse(name, **read_options(name))
+                    else:
+                        sheets[name] = workbook.parse(name)
+                except pd.errors.ParserError:
+                    # 열 수가 기대보다 적은 시트는 전체를 읽음
+                    sheets[name] = workbook.parse(name)
+
+        if cache_key is not None:
+            self._workbooks = {cache_key: {**self._workbooks.get(cache_key, {}), **sheets}}
+        return sheets
+
+    def clear_cache(self):
+        self._workbooks = {}
+
+    def validate(self, df, kind):
+        """필수 값, 날짜, 숫자 열을 검증해서 유효한 행만 반환한다. 거부된 행은 quarantine 에 이유와 함께 저장한다."""
+        with self.metrics.stage('validate'):
+            valid, rejected = validate_frame(df, kind)
+        if rejected.empty:
+            return valid
+        self.rejected_rows += len(rejected)
+        room = db_processor.DEFAULT_FAILURE_SAMPLES - len(self.rejections)
+        for row, reason in zip(rejected['row'][:max(room, 0)], rejected['reason'][:max(room, 0)]):
+            self.rejections.append(f"Row {row} rejected: {reason}")
+        if self.quarantine is not None:
+            self.quarantine.add_frame(self.source, kind, rejected)
+        else:
+            for row, reason in zip(rejected['row'][:5], rejected['reason'][:5]):
+                print(f"{row}행 검증 실패: {reason}")
+        print(f"검증에 실패한 {len(rejected)}개 행을 제외했습니다.")
+        return valid
         
     def read_excel_file(self, file_path, sheet_name=None):
         try:
-            df = pd.read_excel(file_path, sheet_name=sheet_name)
+            if sheet_name is not None and not isinstance(sheet_name, (list, int)):
+                return self.read_workbook(file_path, [sheet_name])[sheet_name]
+            with self.metrics.stage('read_excel'):
+                df = pd.read_excel(file_path, sheet_name=sheet_name, engine=self.engine)
             return df
         except Exception as e:
             print(f"파일을 읽는 중 오류가 발생했습니다: {e}")
             return None
+
+    def read_sheet(self, file_path, kind, csv=False):
+        """시트 종류별 변환 결과 (CaseSheet, ReportSheet, AccusationSheet). 읽지 못하면 None.
+
+        csv=True 이면 file_path 를 그 시트 하나를 내보낸 CSV 로 읽는다 (경로 또는 파일 객체).
+        """
+        if csv:
+            readers = {
+                'cases': self.case_frame_from_csv,
+                'reports': self.report_frame_from_csv,
+                'accusations': self.accusation_frame_from_csv,
+            }
+            return readers[kind](file_path)
+        converters = {
+            'cases': self.case_frame_from_df,
+            'reports': self.report_frame_from_df,
+            'accusations': self.accusation_frame_from_df,
+        }
+        df = self.read_excel_file(file_path, SHEET_KINDS[kind])
+        return None if df is None else converters[kind](df)
+
+    def workbook_to_json(self, file_url):
+        # 사건/신고/고발 시트를 워크북 한 번 파싱으로 모두 변환
+        self.read_workbook(file_url)
+        return {
+            "cases": self.case_data_to_json(file_url),
+            "reports": self.report_data_to_json(file_url),
+            "accusations": self.accusation_data_to_json(file_url),
+        }
     
     def case_data_to_json(self, file_url, sheet_name=None):
-        df = self.read_excel_file(file_url, "2024 고발 처분내역")
-        df.fillna("", inplace=True)
-
+        df = self.read_excel_file(file_url, sheet_name or CASE_SHEET)
         if df is None:
             print("파일을 읽는 중 오류가 발생했습니다.")
             return None
-        else:
-            excel_data = df.to_numpy()
-            data_array = []
-            
-            prev_case_id = ""
-            current_case = None
-            
-            for row in excel_data:
-                case_id = row[3]  # 사건번호
-                
-                # 처분 정보 생성
-                disposition = {
-                    "charge": row[9],  # 죄목
-                    "charge_detail": row[10], #세부죄목
-                    "disposition": row[11],   # 처분결과
-                    "disposition_detail": row[12], #처분일자
-                    "disposal_date": row[4].strftime("%Y-%m-%d") if isinstance(row[4], pd.Timestamp) else str(row[4]), #처분일자
-                    "fine_amount": row[13]
-                }
-                
-                # 피의자 정보 추출
-                name = "성명불상" if row[1] == "" else row[1]
-                 
-                # 같은 사건인지 확인
-                if case_id != prev_case_id:
-                    # 이전 사건 데이터가 있으면 배열에 추가
-                    if current_case is not None:
-                        data_array.append(current_case)
-                    
-                    # 새 사건 초기화
-                    current_case = {
-                        "case": Helper().make_case_json(row),
-                        "persons": [{
-                            "business_name": row[0],
-                            "name": name,
-                            "role": row[2],
-                            "dispositions": [disposition]
-                        }]
-                    }
-                else:
-                    # 같은 사건의 피의자 정보 처리
-                    person_exists = False
-                    for person in current_case["persons"]:
-                        if person["name"] == name:
-                            # 기존 피의자에 처분 추가
-                            person["dispositions"].append(disposition)
-                            person_exists = True
-                            break
-                    
-                    # 새로운 피의자인 경우
-                    if not person_exists:
-                        current_case["persons"].append({
-                            "business_name": row[0],
-                            "name": name,
-                            "role": row[2],
-                            "dispositions": [disposition]
-                        })
-                
-                # 현재 사건번호 저장
-                prev_case_id = case_id
-            
-            # 마지막 사건 데이터 추가
-            if current_case is not None:
-                data_array.append(current_case)
-
-            return data_array
+        return self.process_csv_data(df)
     
     def report_data_to_json(self, file_url, sheet_name=None):
-        df = self.read_excel_file(file_url, "2024신고")
+        df = self.read_excel_file(file_url, sheet_name or REPORT_SHEET)
         if df is None:
             print("파일을 읽는 중 오류가 발생했습니다.")
             return None
-        else:
-            df.fillna("", inplace=True)
-            excel_data = df.to_numpy()
-            data_array = []
-            
-            for row in excel_data:
-                result_json = Helper().make_report_json(row)
-                business_json = Helper().make_business_json_for_report(row)
-                result_json['business'] = business_json
-                data_array.append(result_json)
-                
-            print(data_array)
-            return data_array
-            
+        return self.report_data_from_df(df)
+
+    def report_data_from_csv(self, file_path):
+        sheet = self.report_frame_from_csv(file_path)
+        return None if sheet is None else sheet.to_json()
+
+    def report_frame_from_csv(self, file_path):
+        df = self.read_csv_file(file_path, REPORT_SHEET)
+        if df is None:
+            print("CSV 파일을 읽는 중 오류가 발생했습니다.")
+            return None
+        return self.report_frame_from_df(df)
+
+    def report_data_from_df(self, df):
+        return self.report_frame_from_df(df).to_json()
+
+    def report_frame_from_df(self, df):
+        """신고 시트 DataFrame 을 ReportSheet(열 기반 표현)로 변환한다. 분류 열은 고유값만 분류한다."""
+        df = self.validate(df, 'reports')
+        format_date_columns(df, REPORT_SHEET)
+        fill_blank(df)
+
+        def column(index):
+            return column_values(df, index)
+
+        with self.metrics.stage('build_reports'):
+            addresses = column(5)
+            return ReportSheet.from_columns(
+                {
+                    "reported_at": column(0),
+                    "reported_to": column(1),
+                    "number": column(2),
+                    "content_body": column(6),
+                    "report_type_id": REPORT_TYPES.map_series(df.iloc[:, 7]).to_numpy(),
+                },
+                {
+                    "name": column(3),
+                    "category": column(8),
+                    "type": ADDRESS_TYPES.map_series(pd.Series(addresses)).to_numpy(),
+                    "address": addresses,
+                },
+                {
+                    "office": column(9),
+                    "office_dept": column(10),
+                    "officer": column(11),
+                    "office_tel": column(12),
+                    "received_at": column(15),
+                    "disposition_id": REPORT_DISPOSITIONS.map_series(df.iloc[:, 13]).to_numpy(),
+                    "content_body": column(14),
+                },
+            )
+
     def accusation_data_to_json(self, file_url, sheet_name=None):
-        df = self.read_excel_file(file_url, "2024 고발")
+        df = self.read_excel_file(file_url, sheet_name or ACCUSATION_SHEET)
         if df is None:
             print("파일을 읽는 중 오류가 발생했습니다.")
             return None
-        else:
-            df.fillna("", inplace=True)
-            excel_data = df.to_numpy()
-            data_array = []
-            
-            prev_name = ""
-            current_data = None
-            
-            for row in excel_data:
-                same_business_flag = prev_name == row[0]
-                
-                accusation_json = {}
-                name, role = Helper().substr_people(row[2])
-    
-                accusation_json['name'] = name
-                accusation_json['role'] = role
-                
-                # 새로운 비즈니스인 경우
-                if not same_business_flag:
-                    # 이전 비즈니스 데이터가 있으면 배열에 추가
-                    if current_data is not None:
-                        data_array.append(current_data)
-                    
-                    # 새 비즈니스 데이터 초기화
-                    current_data = {
-                        "business": Helper().make_business_json(row),
-                        "accusations": {
-                            "accused_at": row[5],
-                            "office": row[7],
-                            "accused_person":[accusation_json],
-                            "charge": [row[3]]
-                        }
-                    }
-                else:
-                    # 같은 비즈니스의 다른 고발 사항이면 배열에 추가
-                    current_data["accusations"]["accused_person"].append(accusation_json)
-                    if row[3] not in current_data["accusations"]["charge"]:
-                        current_data["accusations"]["charge"].append(row[3])  # 중복이 아닌 경우만 추가  # 중복이 아닌 경우만 추가
-                
-                # 현재 비즈니스 이름 저장
-                prev_name = row[0]
-            
-            # 마지막 비즈니스 데이터 추가
-            if current_data is not None:
-                data_array.append(current_data)
-                
-            return data_array
+        return self.accusation_data_from_df(df)
+
+    def accusation_data_from_csv(self, file_path):
+        sheet = self.accusation_frame_from_csv(file_path)
+        return None if sheet is None else sheet.to_json()
+
+    def accusation_frame_from_csv(self, file_path):
+        df = self.read_csv_file(file_path, ACCUSATION_SHEET)
+        if df is None:
+            print("CSV 파일을 읽는 중 오류가 발생했습니다.")
+            return None
+        return self.accusation_frame_from_df(df)
+
+    def accusation_data_from_df(self, df):
+        return self.accusation_frame_from_df(df).to_json()
+
+    def accusation_frame_from_df(self, df):
+        """고발 시트 DataFrame 을 AccusationSheet(열 기반 표현)로 변환한다.
+
+        업소 이름이 바뀌는 지점마다 새 고발이 되고 (연속된 행만 같은 고발로 묶음),
+        고발마다 죄목은 처음 나온 순서대로 중복 없이 남긴다.
+        """
+        df = self.validate(df, 'accusations')
+        fill_blank(df)
+
+        def column(index):
+            return column_values(df, index)
+
+        with self.metrics.stage('build_accusations'):
+            business_names = column(0)
+            changed = np.ones(len(business_names), dtype=bool)
+            changed[1:] = business_names[1:] != business_names[:-1]
+            accusation_codes = np.cumsum(changed) - 1
+            accusation_rows = np.flatnonzero(changed)
+
+            # "구분(이름)" 형태의 피고발인 열은 고유값만 나눈다
+            codes, uniques = pd.factorize(df.iloc[:, 2], use_na_sentinel=False)
+            helper = Helper()
+            people = [helper.substr_people(value) for value in uniques]
+            names = np.array([name for name, _ in people], dtype=object)[codes]
+            roles = np.array([role for _, role in people], dtype=object)[codes]
+
+            charges = pd.DataFrame({"charge": column(3), "accusation_index": accusation_codes}).drop_duplicates()
+            addresses = column(6)[accusation_rows]
+            return AccusationSheet.from_columns(
+                {
+                    "accused_at": column(5)[accusation_rows],
+                    "office": column(7)[accusation_rows],
+                },
+                {
+                    "name": business_names[accusation_rows],
+                    "category": column(4)[accusation_rows],
+                    "type": ADDRESS_TYPES.map_series(pd.Series(addresses)).to_numpy(),
+                    "address": addresses,
+                },
+                {"name": names, "role": roles, "accusation_index": accusation_codes},
+                {
+                    "charge": charges["charge"].to_numpy(dtype=object),
+                    "accusation_index": charges["accusation_index"].to_numpy(),
+                },
+            )
+
     def process_csv_data(self, df):
+        sheet = self.case_frame_from_df(df)
+        with self.metrics.stage('to_json'):
+            return sheet.to_json()
 
-        df.fillna("", inplace=True)
-        excel_data = df.to_numpy()
-        data_array = []
-        
-        prev_case_id = ""
-        current_case = None
-        
-        for row in excel_data:
-            # CSV 파일의 열 구조에 맞게 인덱스 조정 필요
-            case_id = row[3]  # 사건번호 (CSV 파일 구조에 맞게 조정 필요)
-            
-            # 처분 정보 생성
-            disposition = {
-                "charge": row[9],  # 죄목
-                "charge_detail": row[10], # 세부죄목
-                "disposition": row[11],   # 처분결과
-                "disposition_detail": row[12], # 처분일자
-                "disposal_date": row[4].strftime("%Y-%m-%d") if isinstance(row[4], pd.Timestamp) else str(row[4]), # 처분일자
-                "fine_amount": row[13]
-            }
-            
-            # 피의자 정보 추출
-            name = "성명불상" if row[1] == "" else row[1]
-            
-            # 같은 사건인지 확인
-            if case_id != prev_case_id:
-                # 이전 사건 데이터가 있으면 배열에 추가
-                if current_case is not None:
-                    data_array.append(current_case)
-                
-                # 새 사건 초기화
-                current_case = {
-                    "case": Helper().make_case_json(row),
-                    "persons": [{
-                        "business_name": row[0],
-                        "name": name,
-                        "role": row[2],
-                        "dispositions": [disposition]
-                    }]
-                }
-            else:
-                # 같은 사건의 피의자 정보 처리
-                person_exists = False
-                for person in current_case["persons"]:
-                    if person["name"] == name:
-                        # 기존 피의자에 처분 추가
-                        person["dispositions"].append(disposition)
-                        person_exists = True
-                        break
-                
-                # 새로운 피의자인 경우
-                if not person_exists:
-                    current_case["persons"].append({
-                        "business_name": row[0],
-                        "name": name,
-                        "role": row[2],
-                        "dispositions": [disposition]
-                    })
-            
-            # 현재 사건번호 저장
-            prev_case_id = case_id
-        
-        # 마지막 사건 데이터 추가
-        if current_case is not None:
-            data_array.append(current_case)
+    def case_frame_from_df(self, df):
+        """사건 시트 DataFrame 을 사건 -> 피의자 -> 처분 구조의 CaseSheet(열 기반 표현)로 변환한다."""
+        with self.metrics.stage('group_cases'):
+            return self._group_cases(df)
+
+    def _group_cases(self, df):
+        df = self.validate(df, 'cases')
+        format_date_columns(df, CASE_SHEET)
+        fill_blank(df)
+        if df.empty:
+            empty = np.array([], dtype=object)
+            return CaseSheet.from_columns(
+                {name: empty for name in CASE_COLUMNS},
+                {**{name: empty for name in PERSON_COLUMNS}, 'case_index': np.array([], dtype=np.int64)},
+                {**{name: empty for name in DISPOSITION_COLUMNS}, 'person_index': np.array([], dtype=np.int64)},
+            )
 
-        return data_array
+        # 필요한 열만 object 배열로 꺼냄 (행 전체를 to_numpy 하지 않음)
+        def column(index):
+            return column_values(df, index)
 
-    def read_csv_file(self, file_path):
+        # 사건번호가 바뀌는 지점마다 새 사건 (연속된 행만 같은 사건으로 묶음)
+        case_ids = column(3)
+        case_changed = np.ones(len(case_ids), dtype=bool)
+        case_changed[1:] = case_ids[1:] != case_ids[:-1]
+        case_codes = np.cumsum(case_changed) - 1
+        case_rows = np.flatnonzero(case_changed)
+
+        # 피의자 정보 추출
+        names = column(1)
+        names[names == ""] = "성명불상"
+
+        # 사건 안에서 같은 이름의 피의자는 하나로 묶음 (처음 등장한 순서 유지)
+        person_codes = pd.DataFrame({"case": case_codes, "name": names}).groupby(
+            ["case", "name"], sort=False
+        ).ngroup().to_numpy()
+        _, person_rows = np.unique(person_codes, return_index=True)
+
+        # 처분은 피의자 순서로 정렬 (같은 피의자 안에서는 원본 행 순서 유지)
+        disposition_order = np.argsort(person_codes, kind="stable")
+
+        offices = column(5)[case_rows]
+        return CaseSheet.from_columns(
+            {
+                "number": case_ids[case_rows],
+                "agency": AGENCIES.map_series(pd.Series(offices)).to_numpy(),
+                "office": offices,
+                "office_dept": column(6)[case_rows],
+                "office_tel": column(8)[case_rows],
+                "officer": column(7)[case_rows],
+                "memo": column(14)[case_rows],
+            },
+            {
+                "business_name": column(0)[person_rows],
+                "name": names[person_rows],
+                "role": column(2)[person_rows],
+                "case_index": case_codes[person_rows],
+            },
+            {
+                "charge": column(9)[disposition_order],  # 죄목
+                "charge_detail": column(10)[disposition_order],  # 세부죄목
+                "disposition": column(11)[disposition_order],  # 처분결과
+                "disposition_detail": column(12)[disposition_order],  # 세부처분결과
+                "disposal_date": column(4)[disposition_order],  # 처분일자 (format_date_columns 에서 문자열로 변환)
+                "fine_amount": column(13)[disposition_order],
+                "person_index": person_codes[disposition_order],
+            },
+        )
+
+    def _read_csv(self, file_path, sheet_name=CASE_SHEET, **kwargs):
+        # 머리글의 열 수를 먼저 읽어서 시트 스키마(usecols, dtype)를 실제로 있는 열까지만 지정한다.
+        # 열이 모자란 파일도 끝까지 읽고, 검증 단계(validate)에서 행마다 이유와 함께 거부된다
+        if isinstance(file_path, (str, os.PathLike)):
+            with open(file_path, 'rb') as file:
+                header = file.readline()
+        else:
+            # 업로드 스트림은 되감을 수 없으므로 미리 읽은 머리글을 다시 앞에 붙여서 넘긴다
+            file_path = PeekableReader(file_path)
+            header = file_path.peek_line()
+        if isinstance(header, bytes):
+            header = header.decode('utf-8-sig', errors='replace')
+        column_count = len(next(csv.reader([header]), []))
+        return pd.read_csv(file_path, header=0, **read_options(sheet_name, column_count), **kwargs)  # 첫 번째 행을 헤더로 사용
+
+    def read_csv_file(self, file_path, sheet_name=CASE_SHEET):
+        # sheet_name 은 CSV 로 내보낸 시트의 종류 (기본값은 사건 시트)
         try:
-            df = pd.read_csv(file_path, header=0)  # 첫 번째 행을 헤더로 사용
+            with self.metrics.stage('read_csv'):
+                df = self._read_csv(file_path, sheet_name)
             return df
         except Exception as e:
             print(f"CSV 파일을 읽는 중 오류가 발생했습니다: {e}")
@@ -364,6 +597,51 @@ class ExcelReader:
             return None
         return self.process_csv_data(df)
 
+    def case_frame_from_csv(self, file_path):
+        df = self.read_csv_file(file_path)
+        if df is None:
+            print("CSV 파일을 읽는 중 오류가 발생했습니다.")
+            return None
+        return self.case_frame_from_df(df)
+
+    def iter_case_frames_from_csv(self, file_path, chunksize=DEFAULT_CSV_CHUNKSIZE):
+        """CSV 를 chunksize 행씩 읽으면서 완성된 사건들을 CaseSheet 로 반환하는 iterator.
+
+        file_path 는 경로 또는 파일 객체. 사건은 chunk 경계를 넘을 수 있으므로
+        각 chunk 의 마지막 사건은 다음 chunk 와 합친 뒤에 반환한다.
+        머리글을 읽을 수 없는 파일(빈 파일 등)은 빈 결과로 성공 처리되지 않도록 호출할 때 바로 ValueError 를 던진다.
+        """
+        chunks = self._read_csv(file_path, chunksize=chunksize)
+        return self._iter_case_frames(chunks)
+
+    def _iter_case_frames(self, chunks):
+        pending = None
+        while True:
+            with self.metrics.stage('read_csv'):
+                chunk = next(chunks, None)
+            if chunk is None:
+                break
+            if pending is not None:
+                # index 는 원본 행 번호를 유지 (검증 실패 행의 위치 표시용)
+                chunk = pd.concat([pending, chunk])
+            if chunk.shape[1] <= 3:
+                # 사건번호 열이 없는 파일은 사건으로 나눌 수 없다. 검증 단계에서 모든 행이 거부된다
+                yield self.case_frame_from_df(chunk.copy())
+                continue
+
+            # 마지막 사건이 시작되는 행 찾기 (process_csv_data 와 같은 기준으로 비교)
+            case_ids = chunk.iloc[:, 3].fillna("").to_numpy(dtype=object)
+            case_starts = np.flatnonzero(case_ids[1:] != case_ids[:-1]) + 1
+            last_case_start = case_starts[-1] if len(case_starts) else 0
+
+            pending = chunk.iloc[last_case_start:]
+            if last_case_start > 0:
+                yield self.case_frame_from_df(chunk.iloc[:last_case_start].copy())
+
+        # 마지막 사건 데이터 반환
+        if pending is not None and not pending.empty:
+            yield self.case_frame_from_df(pending.copy())
+
 if __name__ == "__main__":
     excel_reader = ExcelReader()
     # data = excel_reader.case_data_to_json('./dasi_data.xlsx')
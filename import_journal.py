@@ -0,0 +1,69 @@
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Dict, Any, Iterable, List, Optional, Set
+
+# 파일별로 DB 에 적재가 끝난 레코드의 hash 를 로컬 SQLite 파일에 기록
+DEFAULT_JOURNAL_PATH = os.path.join(tempfile.gettempdir(), 'dasi_import_journal.sqlite3')
+
+def record_hash(record: Dict[str, Any]) -> str:
+    # 같은 원본 행에서 만들어진 레코드는 항상 같은 hash 를 갖도록 key 를 정렬해서 직렬화
+    payload = json.dumps(record, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+class ImportJournal:
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv('IMPORT_JOURNAL_PATH') or DEFAULT_JOURNAL_PATH
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS imported_records (
+                    source_key TEXT NOT NULL,
+                    record_hash TEXT NOT NULL,
+                    imported_at REAL NOT NULL,
+                    PRIMARY KEY (source_key, record_hash)
+                )
+            ''')
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def completed(self, source_key: str, hashes: Iterable[str]) -> Set[str]:
+        """hashes 중 source_key 파일에서 이미 적재가 끝난 것만 반환한다."""
+        hashes = list(hashes)
+        done = set()
+        with self._connect() as conn:
+            # SQLite 의 변수 개수 제한을 넘지 않도록 나눠서 조회
+            for i in range(0, len(hashes), 500):
+                chunk = hashes[i:i + 500]
+                placeholders = ', '.join('?' for _ in chunk)
+                rows = conn.execute(
+                    f'SELECT record_hash FROM imported_records WHERE source_key = ? AND record_hash IN ({placeholders})',
+                    [source_key] + chunk
+                ).fetchall()
+                done.update(row[0] for row in rows)
+        return done
+
+    def mark_done(self, source_key: str, hashes: List[str]) -> None:
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                'INSERT OR IGNORE INTO imported_records (source_key, record_hash, imported_at) VALUES (?, ?, ?)',
+                [(source_key, record, now) for record in hashes]
+            )
+
+    def checkpoint(self, source_key: str) -> Dict[str, Any]:
+        with self._connect() as conn:
+            count, last_imported_at = conn.execute(
+                'SELECT COUNT(*), MAX(imported_at) FROM imported_records WHERE source_key = ?', (source_key,)
+            ).fetchone()
+        return {'source_key': source_key, 'records': count, 'last_imported_at': last_imported_at}
+
+    def reset(self, source_key: str) -> None:
+        # 파일을 처음부터 다시 적재해야 할 때 기록 삭제
+        with self._lock, self._connect() as conn:
+            conn.execute('DELETE FROM imported_records WHERE source_key = ?', (source_key,))
@@ -0,0 +1,114 @@
+import os
+import json
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from typing import Dict, Any, Iterator, List, Optional
+
+# 비동기 업로드 작업 상태를 로컬 SQLite 파일에 저장
+DEFAULT_JOB_STORE_PATH = os.path.join(tempfile.gettempdir(), 'dasi_jobs.sqlite3')
+
+class JobStore:
+    COUNTERS = ('rows_parsed', 'rows_inserted', 'failures')
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv('JOB_STORE_PATH') or DEFAULT_JOB_STORE_PATH
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    filename TEXT,
+                    status TEXT NOT NULL,
+                    rows_parsed INTEGER NOT NULL DEFAULT 0,
+                    rows_inserted INTEGER NOT NULL DEFAULT 0,
+                    failures INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL
+                )
+            ''')
+            # keep_data=true 로 업로드한 경우에만 파싱 결과를 레코드 단위로 저장 (/jobs/<id>/data)
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS job_data (
+                    job_id TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    payload TEXT NOT NULL,
+                    PRIMARY KEY (job_id, seq)
+                )
+            ''')
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def create(self, filename: str) -> str:
+        job_id = uuid.uuid4().hex
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                'INSERT INTO jobs (id, filename, status, created_at) VALUES (?, ?, ?, ?)',
+                (job_id, filename, 'queued', time.time())
+            )
+        return job_id
+
+    def start(self, job_id: str) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute('UPDATE jobs SET status = ?, started_at = ? WHERE id = ?', ('running', time.time(), job_id))
+
+    def finish(self, job_id: str, error: Optional[str] = None) -> None:
+        status = 'failed' if error else 'done'
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                'UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?',
+                (status, error, time.time(), job_id)
+            )
+
+    def increment(self, job_id: str, **counts: int) -> None:
+        # rows_parsed, rows_inserted, failures 만 누적
+        columns = [column for column in self.COUNTERS if counts.get(column)]
+        if not columns:
+            return
+        assignments = ', '.join(f'{column} = {column} + ?' for column in columns)
+        with self._lock, self._connect() as conn:
+            conn.execute(f'UPDATE jobs SET {assignments} WHERE id = ?', [counts[column] for column in columns] + [job_id])
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        if row is None:
+            return None
+
+        job = dict(row)
+        # 초당 처리 행 수 (진행 중이면 현재 시각 기준)
+        elapsed = None
+        if job['started_at'] is not None:
+            elapsed = (job['finished_at'] or time.time()) - job['started_at']
+        job['elapsed_seconds'] = round(elapsed, 3) if elapsed is not None else None
+        job['rows_per_second'] = round(job['rows_inserted'] / elapsed, 1) if elapsed else None
+        return job
+
+    def append_data(self, job_id: str, records: List[Dict[str, Any]]) -> None:
+        with self._lock, self._connect() as conn:
+            start = conn.execute('SELECT COALESCE(MAX(seq) + 1, 0) FROM job_data WHERE job_id = ?', (job_id,)).fetchone()[0]
+            conn.executemany(
+                'INSERT INTO job_data (job_id, seq, payload) VALUES (?, ?, ?)',
+                [(job_id, start + i, json.dumps(record, ensure_ascii=False, default=str)) for i, record in enumerate(records)]
+            )
+
+    def count_data(self, job_id: str) -> int:
+        with self._connect() as conn:
+            return conn.execute('SELECT COUNT(*) FROM job_data WHERE job_id = ?', (job_id,)).fetchone()[0]
+
+    def iter_data(self, job_id: str, offset: int = 0, limit: Optional[int] = None) -> Iterator[str]:
+        """저장된 레코드를 순서대로 JSON 문자열로 반환한다 (다시 파싱하지 않음)."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                'SELECT payload FROM job_data WHERE job_id = ? AND seq >= ? ORDER BY seq LIMIT ?',
+                (job_id, offset, -1 if limit is None else limit)
+            )
+            for row in rows:
+                yield row['payload']
@@ -0,0 +1,137 @@
+import bisect
+import collections
+import contextlib
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# DB 요청 지연 시간 histogram 의 구간 상한 (초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        # 마지막 칸은 +Inf
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        # 정확한 값 대신 해당 순위가 들어 있는 구간의 상한을 반환
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+class Metrics:
+    """파이프라인 단계별 소요 시간과 테이블/연산별 DB 요청 수, 지연 시간을 모은다.
+
+    요청 하나(업로드 하나)마다 Metrics 를 만들어 응답에 summary() 를 담고,
+    parent(기본값은 프로세스 전체의 REGISTRY)에도 같은 값을 누적해서 /metrics 로 노출한다.
+    """
+
+    def __init__(self, parent: Optional['Metrics'] = None):
+        self.parent = parent
+        self._lock = threading.Lock()
+        self.stages: Dict[str, List[float]] = collections.defaultdict(lambda: [0, 0.0])  # stage -> [calls, seconds]
+        self.requests: Dict[Tuple[str, str], Histogram] = collections.defaultdict(Histogram)
+        self.rows: Dict[Tuple[str, str], int] = collections.Counter()
+        self.errors: Dict[Tuple[str, str], int] = collections.Counter()
+
+    def record_stage(self, name: str, seconds: float) -> None:
+        with self._lock:
+            stage = self.stages[name]
+            stage[0] += 1
+            stage[1] += seconds
+        if self.parent is not None:
+            self.parent.record_stage(name, seconds)
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_stage(name, time.perf_counter() - start)
+
+    def record_request(self, table: str, operation: str, seconds: float, rows: int = 0, error: bool = False) -> None:
+        key = (table, operation)
+        with self._lock:
+            self.requests[key].observe(seconds)
+            self.rows[key] += rows
+            if error:
+                self.errors[key] += 1
+        if self.parent is not None:
+            self.parent.record_request(table, operation, seconds, rows, error)
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = {
+                name: {'calls': calls, 'seconds': round(seconds, 4)}
+                for name, (calls, seconds) in self.stages.items()
+            }
+            db = {}
+            for (table, operation), histogram in sorted(self.requests.items()):
+                db[f'{table}.{operation}'] = {
+                    'requests': histogram.count,
+                    'errors': self.errors[(table, operation)],
+                    'rows': self.rows[(table, operation)],
+                    'seconds': round(histogram.sum, 4),
+                    'p50_seconds': histogram.quantile(0.5),
+                    'p95_seconds': histogram.quantile(0.95),
+                }
+        return {
+            'stages': stages,
+            'db': db,
+            'db_requests': sum(item['requests'] for item in db.values()),
+            'db_seconds': round(sum(item['seconds'] for item in db.values()), 4),
+        }
+
+    def render_prometheus(self, prefix: str = 'dasi') -> str:
+        """Prometheus text exposition format (0.0.4)."""
+        lines = []
+        with self._lock:
+            lines.append(f'# HELP {prefix}_stage_seconds_total Time spent in each pipeline stage.')
+            lines.append(f'# TYPE {prefix}_stage_seconds_total counter')
+            for name, (_, seconds) in sorted(self.stages.items()):
+                lines.append(f'{prefix}_stage_seconds_total{{stage="{name}"}} {seconds}')
+            lines.append(f'# HELP {prefix}_stage_runs_total Number of times each pipeline stage ran.')
+            lines.append(f'# TYPE {prefix}_stage_runs_total counter')
+            for name, (calls, _) in sorted(self.stages.items()):
+                lines.append(f'{prefix}_stage_runs_total{{stage="{name}"}} {calls}')
+
+            lines.append(f'# HELP {prefix}_db_request_seconds Supabase request latency by table and operation.')
+            lines.append(f'# TYPE {prefix}_db_request_seconds histogram')
+            for (table, operation), histogram in sorted(self.requests.items()):
+                labels = f'table="{table}",operation="{operation}"'
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + (float('inf'),), histogram.counts):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{prefix}_db_request_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+                lines.append(f'{prefix}_db_request_seconds_sum{{{labels}}} {histogram.sum}')
+                lines.append(f'{prefix}_db_request_seconds_count{{{labels}}} {histogram.count}')
+
+            lines.append(f'# HELP {prefix}_db_request_errors_total Failed Supabase requests by table and operation.')
+            lines.append(f'# TYPE {prefix}_db_request_errors_total counter')
+            for (table, operation), count in sorted(self.errors.items()):
+                lines.append(f'{prefix}_db_request_errors_total{{table="{table}",operation="{operation}"}} {count}')
+
+            lines.append(f'# HELP {prefix}_db_rows_total Rows returned by Supabase requests by table and operation.')
+            lines.append(f'# TYPE {prefix}_db_rows_total counter')
+            for (table, operation), count in sorted(self.rows.items()):
+                lines.append(f'{prefix}_db_rows_total{{table="{table}",operation="{operation}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+# 프로세스 전체 누적값 (/metrics). 서버리스 환경에서는 인스턴스별 값이다.
+REGISTRY = Metrics()
@@ -0,0 +1,114 @@
+-- 사건 시트 전체(ExcelReader.process_csv_data 결과)를 한 번의 호출로 적재하는 함수.
+-- DataProcessor(ingest_mode='rpc') 가 supabase.rpc('ingest_case_sheet', {'payload': [...]}) 로 호출한다.
+--
+-- payload 형식:
+--   [{"case": {"number": ..., "agency": ..., "office": ..., "office_dept": ..., "office_tel": ..., "officer": ..., "memo": ...},
+--     "persons": [{"business_name": ..., "name": ..., "role": ...,
+--                  "dispositions": [{"charge": ..., "charge_detail": ..., "disposition": ..., "disposition_detail": ...,
+--                                    "disposal_date": ..., "fine_amount": ...}]}]}]
+--
+-- 업소/죄목은 없으면 생성하고, 등록되지 않은 처분결과는 해당 처분만 건너뛴다.
+-- 모든 insert 는 함수 호출 하나의 트랜잭션 안에서 실행된다.
+--
+-- 로컬 Postgres 에서 확인: psql "$DATABASE_URL" -f migrations/20261018000000_ingest_case_sheet.sql
+--   select public.ingest_case_sheet('[...]'::jsonb);
+
+create index if not exists businesses_name_idx on public.businesses (name);
+create index if not exists charge_types_name_idx on public.charge_types (name, detail_name);
+create index if not exists disposition_types_name_idx on public.disposition_types (name, detail_name);
+
+create or replace function public.ingest_case_sheet(payload jsonb)
+returns jsonb
+language plpgsql
+as $$
+declare
+    case_item jsonb;
+    person_item jsonb;
+    disposition_item jsonb;
+    v_case_id public.cases.id%type;
+    v_person_id public.case_person.id%type;
+    v_business_id public.businesses.id%type;
+    v_charge_id public.charge_types.id%type;
+    v_disposition_id public.disposition_types.id%type;
+    v_charge_detail text;
+    v_disposition_detail text;
+    case_ids jsonb := '[]'::jsonb;
+    person_count integer := 0;
+    disposition_count integer := 0;
+    skipped jsonb := '[]'::jsonb;
+begin
+    for case_item in select value from jsonb_array_elements(payload) loop
+        insert into public.cases (number, agency, office, office_dept, office_tel, officer, memo)
+        select r.number, r.agency, r.office, r.office_dept, r.office_tel, r.officer, r.memo
+        from jsonb_populate_record(null::public.cases, case_item -> 'case') r
+        returning id into v_case_id;
+        case_ids := case_ids || to_jsonb(v_case_id);
+
+        for person_item in select value from jsonb_array_elements(coalesce(case_item -> 'persons', '[]'::jsonb)) loop
+            select id into v_business_id
+            from public.businesses
+            where name = person_item ->> 'business_name'
+            limit 1;
+            if v_business_id is null then
+                insert into public.businesses (name)
+                values (person_item ->> 'business_name')
+                returning id into v_business_id;
+            end if;
+
+            insert into public.case_person (name, role, business_id, case_id)
+            select r.name, r.role, v_business_id, v_case_id
+            from jsonb_populate_record(null::public.case_person, person_item) r
+            returning id into v_person_id;
+            person_count := person_count + 1;
+
+            for disposition_item in select value from jsonb_array_elements(coalesce(person_item -> 'dispositions', '[]'::jsonb)) loop
+                -- detail_name 이 비어 있으면 이름만으로 조회 (CommonProcessor.get_charge_id 와 동일)
+                v_charge_detail := nullif(disposition_item ->> 'charge_detail', '');
+                select id into v_charge_id
+                from public.charge_types
+                where name = disposition_item ->> 'charge'
+                  and (v_charge_detail is null or detail_name = v_charge_detail)
+                limit 1;
+                if v_charge_id is null then
+                    insert into public.charge_types (name, detail_name)
+                    values (disposition_item ->> 'charge', disposition_item ->> 'charge_detail')
+                    returning id into v_charge_id;
+                end if;
+
+                v_disposition_detail := nullif(disposition_item ->> 'disposition_detail', '');
+                select id into v_disposition_id
+                from public.disposition_types
+                where name = disposition_item ->> 'disposition'
+                  and (v_disposition_detail is null or detail_name = v_disposition_detail)
+                limit 1;
+                if v_disposition_id is null then
+                    skipped := skipped || jsonb_build_object(
+                        'person_id', v_person_id,
+                        'disposition', disposition_item ->> 'disposition',
+                        'disposition_detail', disposition_item ->> 'disposition_detail'
+                    );
+                    continue;
+                end if;
+
+                insert into public.case_person_dispositions (fine_amount, person_id, disposal_date, charge_id, disposition_id)
+                select r.fine_amount, v_person_id, r.disposal_date, v_charge_id, v_disposition_id
+                from jsonb_populate_record(
+                    null::public.case_person_dispositions,
+                    jsonb_build_object(
+                        'fine_amount', coalesce(nullif(disposition_item ->> 'fine_amount', ''), '0'),
+                        'disposal_date', disposition_item -> 'disposal_date'
+                    )
+                ) r;
+                disposition_count := disposition_count + 1;
+            end loop;
+        end loop;
+    end loop;
+
+    return jsonb_build_object(
+        'case_ids', case_ids,
+        'persons', person_count,
+        'dispositions', disposition_count,
+        'skipped_dispositions', skipped
+    );
+end;
+$$;
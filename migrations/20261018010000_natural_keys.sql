@@ -0,0 +1,12 @@
+-- DataProcessor 가 사건/피의자/처분/신고를 쓸 때 사용하는 upsert 기준 자연키.
+-- 이 인덱스를 만든 DB 에서 UPSERT_NATURAL_KEYS=true 로 설정한다 (journal, delta import 는 항상 upsert).
+-- 피의자 자연키는 20261018011000_case_person_person_key.sql 에서 만든다 (성명불상 피의자는 자연키에서 제외).
+-- 기존 데이터에 중복이 있으면 인덱스 생성이 실패하므로 먼저 중복을 정리해야 한다.
+--   select number, count(*) from public.cases group by number having count(*) > 1;
+--   select number, count(*) from public.reports group by number having count(*) > 1;
+
+create unique index if not exists cases_number_key on public.cases (number);
+create unique index if not exists reports_number_key on public.reports (number);
+create unique index if not exists report_dispositions_report_id_key on public.report_dispositions (report_id);
+create unique index if not exists case_person_dispositions_natural_key
+    on public.case_person_dispositions (person_id, charge_id, disposition_id, disposal_date);
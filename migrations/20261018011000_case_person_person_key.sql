@@ -0,0 +1,124 @@
+-- 피의자 자연키를 (case_id, name) 에서 (case_id, person_key) 로 바꾼다.
+-- person_key 는 이름이 비어 있거나 성명불상인 피의자에서 null 이 되므로, 한 사건의 서로 다른 성명불상 피의자가
+-- 하나로 합쳐지지 않고 항상 새 행으로 들어간다 (unique index 에서 null 은 서로 겹치지 않는다).
+-- DataProcessor.upsert_case_person_data_bulk 와 ingest_case_sheet 는 on conflict (case_id, person_key) 를 쓴다.
+-- ingest_case_sheet 가 반환하는 dispositions 는 실제로 insert 된 처분 수이다 (이미 있는 처분은 제외).
+--
+-- 기존 데이터에 이름 있는 피의자의 중복이 있으면 인덱스 생성이 실패하므로 먼저 중복을 정리해야 한다.
+--   select case_id, person_key, count(*) from public.case_person
+--   where person_key is not null group by case_id, person_key having count(*) > 1;
+--
+-- 로컬 Postgres 에서 확인: psql "$DATABASE_URL" -f migrations/20261018011000_case_person_person_key.sql
+
+drop index if exists public.case_person_case_id_name_key;
+
+alter table public.case_person add column if not exists person_key text
+    generated always as (
+        case when name is null or btrim(name) = '' or name like '성명불상%' then null else name end
+    ) stored;
+
+create unique index if not exists case_person_case_id_person_key_key on public.case_person (case_id, person_key);
+
+create or replace function public.ingest_case_sheet(payload jsonb)
+returns jsonb
+language plpgsql
+as $$
+declare
+    case_item jsonb;
+    person_item jsonb;
+    disposition_item jsonb;
+    v_case_id public.cases.id%type;
+    v_person_id public.case_person.id%type;
+    v_business_id public.businesses.id%type;
+    v_charge_id public.charge_types.id%type;
+    v_disposition_id public.disposition_types.id%type;
+    v_charge_detail text;
+    v_disposition_detail text;
+    case_ids jsonb := '[]'::jsonb;
+    person_count integer := 0;
+    disposition_count integer := 0;
+    v_inserted integer;
+    skipped jsonb := '[]'::jsonb;
+begin
+    for case_item in select value from jsonb_array_elements(payload) loop
+        insert into public.cases (number, agency, office, office_dept, office_tel, officer, memo)
+        select r.number, r.agency, r.office, r.office_dept, r.office_tel, r.officer, r.memo
+        from jsonb_populate_record(null::public.cases, case_item -> 'case') r
+        on conflict (number) do update set
+            agency = excluded.agency, office = excluded.office, office_dept = excluded.office_dept,
+            office_tel = excluded.office_tel, officer = excluded.officer, memo = excluded.memo
+        returning id into v_case_id;
+        case_ids := case_ids || to_jsonb(v_case_id);
+
+        for person_item in select value from jsonb_array_elements(coalesce(case_item -> 'persons', '[]'::jsonb)) loop
+            select id into v_business_id
+            from public.businesses
+            where name = person_item ->> 'business_name'
+            limit 1;
+            if v_business_id is null then
+                insert into public.businesses (name)
+                values (person_item ->> 'business_name')
+                returning id into v_business_id;
+            end if;
+
+            insert into public.case_person (name, role, business_id, case_id)
+            select r.name, r.role, v_business_id, v_case_id
+            from jsonb_populate_record(null::public.case_person, person_item) r
+            on conflict (case_id, person_key) do update set role = excluded.role, business_id = excluded.business_id
+            returning id into v_person_id;
+            person_count := person_count + 1;
+
+            for disposition_item in select value from jsonb_array_elements(coalesce(person_item -> 'dispositions', '[]'::jsonb)) loop
+                -- detail_name 이 비어 있으면 이름만으로 조회 (CommonProcessor.get_charge_id 와 동일)
+                v_charge_detail := nullif(disposition_item ->> 'charge_detail', '');
+                select id into v_charge_id
+                from public.charge_types
+                where name = disposition_item ->> 'charge'
+                  and (v_charge_detail is null or detail_name = v_charge_detail)
+                limit 1;
+                if v_charge_id is null then
+                    insert into public.charge_types (name, detail_name)
+                    values (disposition_item ->> 'charge', disposition_item ->> 'charge_detail')
+                    returning id into v_charge_id;
+                end if;
+
+                v_disposition_detail := nullif(disposition_item ->> 'disposition_detail', '');
+                select id into v_disposition_id
+                from public.disposition_types
+                where name = disposition_item ->> 'disposition'
+                  and (v_disposition_detail is null or detail_name = v_disposition_detail)
+                limit 1;
+                if v_disposition_id is null then
+                    skipped := skipped || jsonb_build_object(
+                        'person_id', v_person_id,
+                        'disposition', disposition_item ->> 'disposition',
+                        'disposition_detail', disposition_item ->> 'disposition_detail'
+                    );
+                    continue;
+                end if;
+
+                insert into public.case_person_dispositions (fine_amount, person_id, disposal_date, charge_id, disposition_id)
+                select r.fine_amount, v_person_id, r.disposal_date, v_charge_id, v_disposition_id
+                from jsonb_populate_record(
+                    null::public.case_person_dispositions,
+                    jsonb_build_object(
+                        'fine_amount', coalesce(nullif(disposition_item ->> 'fine_amount', ''), '0'),
+                        'disposal_date', disposition_item -> 'disposal_date'
+                    )
+                ) r
+                on conflict (person_id, charge_id, disposition_id, disposal_date) do nothing;
+                -- 이미 있는 처분(do nothing)은 세지 않는다 (실제로 insert 된 행 수)
+                get diagnostics v_inserted = row_count;
+                disposition_count := disposition_count + v_inserted;
+            end loop;
+        end loop;
+    end loop;
+
+    return jsonb_build_object(
+        'case_ids', case_ids,
+        'persons', person_count,
+        'dispositions', disposition_count,
+        'skipped_dispositions', skipped
+    );
+end;
+$$;
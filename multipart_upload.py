@@ -0,0 +1,94 @@
+from typing import Iterator, Optional
+
+from werkzeug.exceptions import BadRequest, RequestEntityTooLarge
+from werkzeug.sansio.multipart import Data, Epilogue, Field, File, MultipartDecoder, NeedData
+
+from upload_cache import CHUNK_SIZE
+
+# 업로드 요청에 들어 있을 수 있는 multipart part(파일, 폼 필드) 최대 개수
+MAX_PARTS = 16
+
+class MultipartFileReader:
+    """multipart/form-data 요청 본문에서 파일 필드 하나를 임시 파일 없이 읽는 파일 객체.
+
+    request.files 는 본문 전체를 파싱해서 (500KB 가 넘으면 임시 파일에) 복사해 둔 뒤에야 쓸 수 있다.
+    이 객체는 요청 스트림을 chunk 단위로 읽으면서 파일 필드의 내용만 돌려주므로,
+    pandas.read_csv 에 넘기면 업로드를 받는 동안 파싱한다. 다른 폼 필드는 무시한다.
+    """
+
+    def __init__(self, stream, boundary: str, field: str = 'file', max_size: Optional[int] = None,
+                 chunk_size: int = CHUNK_SIZE):
+        self.stream = stream
+        self.field = field
+        self.max_size = max_size
+        self.chunk_size = chunk_size
+        self.decoder = MultipartDecoder(boundary.encode('latin-1'), max_parts=MAX_PARTS)
+        self.filename: Optional[str] = None
+        # 지금까지 읽은 요청 본문 크기 (Content-Length 없이 chunked 로 보낸 요청도 max_size 로 제한)
+        self.received = 0
+        self._buffer = bytearray()
+        self._part = None
+        self._done = False
+        # 파일 필드의 머리글(파일 이름)까지 읽어 둔다
+        while self.filename is None and not self._done:
+            self._receive()
+        if self.filename is None:
+            raise BadRequest(f'No {field} part')
+
+    def _receive(self) -> None:
+        chunk = self.stream.read(self.chunk_size)
+        self.received += len(chunk)
+        if self.max_size is not None and self.received > self.max_size:
+            raise RequestEntityTooLarge()
+        self.decoder.receive_data(chunk or None)
+        try:
+            event = self.decoder.next_event()
+            while not isinstance(event, NeedData):
+                if isinstance(event, (Field, File)):
+                    self._part = event
+                    if isinstance(event, File) and event.name == self.field and self.filename is None:
+                        self.filename = event.filename
+                elif isinstance(event, Data) and self._is_file_part():
+                    self._buffer += event.data
+                    if not event.more_data:
+                        # 파일 필드를 다 읽었으면 나머지 본문은 읽지 않는다
+                        self._done = True
+                        return
+                elif isinstance(event, Epilogue):
+                    self._done = True
+                    return
+                event = self.decoder.next_event()
+        except ValueError as e:
+            raise BadRequest(f'Invalid multipart body: {e}')
+        if not chunk:
+            raise BadRequest('Incomplete multipart body')
+
+    def _is_file_part(self) -> bool:
+        return isinstance(self._part, File) and self._part.name == self.field and self._part.filename == self.filename
+
+    def read(self, size: int = -1) -> bytes:
+        while (size is None or size < 0 or len(self._buffer) < size) and not self._done:
+            self._receive()
+        if size is None or size < 0:
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    def readline(self) -> bytes:
+        while b'\n' not in self._buffer and not self._done:
+            self._receive()
+        end = self._buffer.find(b'\n') + 1 or len(self._buffer)
+        data = bytes(self._buffer[:end])
+        del self._buffer[:end]
+        return data
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            line = self.readline()
+            if not line:
+                return
+            yield line
+
+    def readable(self) -> bool:
+        return True
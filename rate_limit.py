@@ -0,0 +1,79 @@
+import random
+import threading
+import time
+from typing import Optional
+
+class TokenBucket:
+    """초당 rate 개의 요청을 허용하고, 쉬고 있던 동안 쌓인 여유분은 burst 개까지만 한 번에 쓴다.
+
+    여러 스레드(DataProcessor 의 동시 작업자)가 같은 bucket 을 공유해서 전체 요청 속도를 제한한다.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        if rate <= 0:
+            raise ValueError('rate must be positive')
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1, int(rate))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, tokens: float = 1) -> float:
+        """tokens 개를 쓸 수 있을 때까지 기다린다. 기다린 시간(초)을 반환한다."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return waited
+                delay = (tokens - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+class RetryPolicy:
+    """실패한 요청을 최대 attempts 번까지 보내고, 재시도 사이에는 지수적으로 늘어나는 간격 안에서 무작위로 기다린다.
+
+    간격에 jitter 를 넣어서 동시에 실패한 작업자들이 같은 순간에 다시 요청하지 않도록 한다 (full jitter).
+    """
+
+    def __init__(self, attempts: int = 4, base: float = 0.5, cap: float = 30.0):
+        self.attempts = max(1, attempts)
+        self.base = base
+        self.cap = cap
+
+    def delay(self, attempt: int) -> float:
+        """attempt 번째(0 부터) 실패 후 기다릴 시간(초)."""
+        return random.uniform(0, min(self.cap, self.base * 2 ** attempt))
+
+class AdaptiveBatchSize:
+    """요청 결과에 따라 한 번에 보낼 행 수를 조절한다 (AIMD).
+
+    과부하 오류(error=True)가 나면 절반으로 줄이고, 응답 시간이 target_seconds 보다 길면 3/4 로 줄이고,
+    짧으면 step 씩 늘린다. 여러 스레드가 같은 객체를 공유한다.
+    """
+
+    def __init__(self, initial: int, minimum: Optional[int] = None, maximum: Optional[int] = None,
+                 target_seconds: float = 1.0, step: Optional[int] = None):
+        if initial <= 0:
+            raise ValueError('initial must be positive')
+        self.minimum = minimum if minimum is not None else max(1, initial // 10)
+        self.maximum = maximum if maximum is not None else initial * 4
+        self.size = min(max(initial, self.minimum), self.maximum)
+        self.target_seconds = target_seconds
+        self.step = step if step is not None else max(1, initial // 10)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, error: bool = False) -> None:
+        with self._lock:
+            if error:
+                self.size = max(self.minimum, self.size // 2)
+            elif seconds > self.target_seconds:
+                self.size = max(self.minimum, self.size * 3 // 4)
+            else:
+                self.size = min(self.maximum, self.size + self.step)
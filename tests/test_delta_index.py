@@ -0,0 +1,43 @@
+import collections
+
+import pandas as pd
+
+from benchmarks.reference import edge_case_frame
+from delta_index import DeltaIndex, case_fingerprints
+from excel_reader import ExcelReader
+
+def duplicate_key_frame():
+    # 사건번호/피의자/죄목/처분/처분일자가 같고 벌금만 다른 두 행 (delta key 가 같다)
+    frame = edge_case_frame()
+    duplicate = frame.iloc[[0]].assign(**{frame.columns[13]: 700000})
+    return pd.concat([frame.iloc[:1], duplicate, frame.iloc[1:]], ignore_index=True)
+
+def test_duplicate_keys_keep_every_fingerprint(tmp_path):
+    sheet = ExcelReader().case_frame_from_df(duplicate_key_frame())
+    index = DeltaIndex(str(tmp_path / 'delta.sqlite3'))
+    keys, fingerprints = case_fingerprints(sheet)
+    assert len(set(keys.tolist())) == len(keys)
+
+    assert index.changed('cases', keys, fingerprints).all()
+    index.record('cases', keys, fingerprints)
+    assert not index.changed('cases', *case_fingerprints(sheet)).any()
+
+def test_duplicate_keys_across_sheets(tmp_path):
+    # CSV chunk 로 나뉜 업로드: 같은 key 의 두 행이 서로 다른 sheet 에 들어간다
+    frame = duplicate_key_frame()
+    reader = ExcelReader()
+    sheets = [reader.case_frame_from_df(frame.iloc[:1].copy()), reader.case_frame_from_df(frame.iloc[1:].copy())]
+    index = DeltaIndex(str(tmp_path / 'delta.sqlite3'))
+
+    def run():
+        occurrences = collections.Counter()
+        changed = 0
+        for sheet in sheets:
+            keys, fingerprints = case_fingerprints(sheet, occurrences)
+            changed += int(index.changed('cases', keys, fingerprints).sum())
+            index.record('cases', keys, fingerprints)
+        return changed
+
+    assert run() == len(frame)
+    assert run() == 0
+    assert index.count('cases') == len(frame)
@@ -0,0 +1,45 @@
+import pandas as pd
+import pytest
+
+from benchmarks import synthetic
+from benchmarks.reference import edge_case_frame, legacy_process_csv_data
+from excel_reader import ExcelReader
+
+# ExcelReader._group_cases 가 benchmarks/reference.py 의 기존 loop 와 같은 중첩 dict 를 만드는지 확인한다
+# (python -m benchmarks.run --check 와 같은 비교를 테스트로 실행)
+# 기존 loop 는 숫자 열에도 fillna("") 를 하므로 reference 의 FutureWarning 은 무시한다
+pytestmark = pytest.mark.filterwarnings('ignore::FutureWarning:benchmarks.reference')
+
+def group_cases(df):
+    return ExcelReader()._group_cases(df).to_json()
+
+def synthetic_frame(rows, seed):
+    # 워크북에서 읽은 것처럼 처분일자가 datetime 인 DataFrame
+    return pd.DataFrame(list(synthetic.case_rows(rows, seed)), columns=synthetic.CASE_HEADER)
+
+@pytest.mark.parametrize('rows, seed', [(1, 0), (200, 0), (1000, 1)])
+def test_synthetic_frame(rows, seed):
+    frame = synthetic_frame(rows, seed)
+    assert group_cases(frame.copy()) == legacy_process_csv_data(frame.copy())
+
+@pytest.mark.parametrize('rows, seed', [(200, 0), (1000, 1)])
+def test_synthetic_csv(tmp_path, rows, seed):
+    path = synthetic.write_case_csv(str(tmp_path / 'cases.csv'), rows, seed)
+    reader = ExcelReader()
+    assert group_cases(reader.read_csv_file(path)) == legacy_process_csv_data(pd.read_csv(path, header=0))
+
+def test_synthetic_csv_chunks(tmp_path):
+    # chunk 경계를 넘는 사건은 다음 chunk 와 합쳐서 반환하므로 이어 붙이면 한 번에 읽은 결과와 같다
+    path = synthetic.write_case_csv(str(tmp_path / 'cases.csv'), 500, 2)
+    sheets = ExcelReader().iter_case_frames_from_csv(path, chunksize=37)
+    assert [case for sheet in sheets for case in sheet.to_json()] == legacy_process_csv_data(pd.read_csv(path, header=0))
+
+def test_edge_case_frame():
+    frame = edge_case_frame()
+    assert group_cases(frame.copy()) == legacy_process_csv_data(frame.copy())
+
+def test_edge_case_csv(tmp_path):
+    path = str(tmp_path / 'edge_cases.csv')
+    edge_case_frame().to_csv(path, index=False)
+    reader = ExcelReader()
+    assert group_cases(reader.read_csv_file(path)) == legacy_process_csv_data(pd.read_csv(path, header=0))
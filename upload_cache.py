@@ -0,0 +1,175 @@
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, BinaryIO, Dict, Optional, Tuple
+
+# 같은 내용의 파일을 다시 업로드하면 DB 에 다시 쓰지 않고 이전 결과를 돌려주기 위한 캐시.
+# 키는 업로드 내용의 sha256 이고, 값은 업로드 응답(import 결과 요약)이다.
+DEFAULT_UPLOAD_CACHE_PATH = os.path.join(tempfile.gettempdir(), 'dasi_upload_cache.sqlite3')
+# 항목 유지 시간(초), 최대 항목 수, 저장된 결과의 최대 전체 크기(byte)
+DEFAULT_UPLOAD_CACHE_TTL = int(os.getenv('UPLOAD_CACHE_TTL', str(24 * 60 * 60)))
+DEFAULT_UPLOAD_CACHE_MAX_ENTRIES = int(os.getenv('UPLOAD_CACHE_MAX_ENTRIES', '1000'))
+DEFAULT_UPLOAD_CACHE_MAX_BYTES = int(os.getenv('UPLOAD_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+
+# 업로드를 디스크에 쓰거나 스트림으로 읽을 때의 chunk 크기
+CHUNK_SIZE = 1024 * 1024
+
+class HashingReader:
+    """파일 객체를 감싸서 읽은 내용의 sha256 과 크기를 함께 계산한다 (stream 업로드용)."""
+
+    def __init__(self, stream: BinaryIO):
+        self.stream = stream
+        self.hash = hashlib.sha256()
+        self.size = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.stream.read(size)
+        self.hash.update(data)
+        self.size += len(data)
+        return data
+
+    def __iter__(self):
+        # pandas 가 줄 단위로 읽는 경우
+        for line in self.stream:
+            self.hash.update(line)
+            self.size += len(line)
+            yield line
+
+    @property
+    def digest(self) -> str:
+        return self.hash.hexdigest()
+
+class PeekableReader:
+    """파일 객체의 첫 줄(머리글)을 미리 읽어 볼 수 있게 감싼다. 미리 읽은 내용은 read() 에서 다시 앞에 붙여서 돌려준다.
+
+    되감을 수 없는 업로드 스트림에서 CSV 의 열 수를 알아낸 뒤 같은 스트림을 pandas 에 넘기는 데 쓴다.
+    바이너리(bytes)와 텍스트(str) 파일 객체를 모두 받는다.
+    """
+
+    def __init__(self, stream: BinaryIO, chunk_size: int = CHUNK_SIZE):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        # 미리 읽었지만 아직 read() 로 돌려주지 않은 내용 (stream 과 같은 타입)
+        self._buffer = None
+
+    def peek_line(self):
+        if self._buffer is None:
+            self._buffer = self.stream.read(self.chunk_size)
+        newline = b'\n' if isinstance(self._buffer, bytes) else '\n'
+        while newline not in self._buffer:
+            data = self.stream.read(self.chunk_size)
+            if not data:
+                break
+            self._buffer += data
+        end = self._buffer.find(newline) + 1 or len(self._buffer)
+        return self._buffer[:end]
+
+    def read(self, size: int = -1):
+        if not self._buffer:
+            return self.stream.read(size)
+        if size is None or size < 0:
+            data = self._buffer + self.stream.read()
+            self._buffer = self._buffer[:0]
+            return data
+        data = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return data
+
+    def readable(self) -> bool:
+        return True
+
+def save_upload(stream: BinaryIO, suffix: str = '') -> Tuple[str, str, int]:
+    """업로드 스트림을 임시 파일에 쓰면서 sha256 을 계산한다. (경로, digest, 크기)를 반환한다.
+
+    파일 이름은 클라이언트가 보낸 이름이 아니라 mkstemp 로 만들기 때문에 같은 이름의 업로드끼리 겹치지 않는다.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                file.write(chunk)
+                size += len(chunk)
+    except Exception:
+        os.remove(path)
+        raise
+    return path, digest.hexdigest(), size
+
+class UploadCache:
+    def __init__(self, path: Optional[str] = None, ttl: int = DEFAULT_UPLOAD_CACHE_TTL,
+                 max_entries: int = DEFAULT_UPLOAD_CACHE_MAX_ENTRIES, max_bytes: int = DEFAULT_UPLOAD_CACHE_MAX_BYTES):
+        self.path = path or os.getenv('UPLOAD_CACHE_PATH') or DEFAULT_UPLOAD_CACHE_PATH
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS uploads (
+                    digest TEXT PRIMARY KEY,
+                    filename TEXT,
+                    upload_size INTEGER NOT NULL,
+                    result TEXT NOT NULL,
+                    result_size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used_at REAL NOT NULL
+                )
+            ''')
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, digest: str) -> Optional[Dict[str, Any]]:
+        """digest 에 해당하는 이전 결과. 없거나 TTL 이 지났으면 None."""
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute('SELECT result, created_at FROM uploads WHERE digest = ?', (digest,)).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl:
+                conn.execute('DELETE FROM uploads WHERE digest = ?', (digest,))
+                return None
+            conn.execute('UPDATE uploads SET last_used_at = ? WHERE digest = ?', (now, digest))
+        return json.loads(row[0])
+
+    def put(self, digest: str, filename: str, upload_size: int, result: Dict[str, Any]) -> None:
+        payload = json.dumps(result, ensure_ascii=False, default=str)
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO uploads (digest, filename, upload_size, result, result_size, created_at, last_used_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (digest, filename, upload_size, payload, len(payload.encode('utf-8')), now, now)
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        # TTL 이 지난 항목을 지우고, 항목 수/전체 크기 제한을 넘으면 가장 오래 사용되지 않은 항목부터 삭제
+        conn.execute('DELETE FROM uploads WHERE created_at < ?', (now - self.ttl,))
+        count, total = conn.execute('SELECT COUNT(*), COALESCE(SUM(result_size), 0) FROM uploads').fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        evicted = []
+        for digest, result_size in conn.execute('SELECT digest, result_size FROM uploads ORDER BY last_used_at'):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            evicted.append((digest,))
+            count -= 1
+            total -= result_size
+        conn.executemany('DELETE FROM uploads WHERE digest = ?', evicted)
+
+    def invalidate(self, digest: Optional[str] = None) -> None:
+        with self._lock, self._connect() as conn:
+            if digest is None:
+                conn.execute('DELETE FROM uploads')
+            else:
+                conn.execute('DELETE FROM uploads WHERE digest = ?', (digest,))
@@ -0,0 +1,163 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# 검증에 실패한 행을 이유와 함께 로컬 SQLite 파일에 보관 (나머지 행은 그대로 적재)
+DEFAULT_QUARANTINE_PATH = os.path.join(tempfile.gettempdir(), 'dasi_quarantine.sqlite3')
+
+# 시트 종류별 검증 규칙 (열 번호 기준, ExcelReader 의 변환 함수가 참조하는 열)
+#   columns:  변환 함수가 참조하는 열 개수
+#   required: 비어 있으면 안 되는 열
+#   dates:    값이 있으면 날짜로 해석할 수 있어야 하는 열 (빈 날짜는 처분 전 사건 등에서 정상적으로 나온다)
+#   numbers:  값이 있으면 숫자여야 하는 열
+SCHEMAS = {
+    'cases': {
+        'columns': 15,
+        'required': {3: 'case number', 9: 'charge', 11: 'disposition'},
+        'dates': {4: 'disposal date'},
+        'numbers': {13: 'fine amount'},
+    },
+    'reports': {
+        'columns': 16,
+        'required': {2: 'report number', 3: 'business name'},
+        'dates': {0: 'reported date', 15: 'received date'},
+        'numbers': {},
+    },
+    'accusations': {
+        'columns': 8,
+        'required': {0: 'business name', 3: 'charge'},
+        'dates': {5: 'accused date'},
+        'numbers': {},
+    },
+}
+
+def _blank(column: pd.Series) -> np.ndarray:
+    # NaN, None, 공백 문자열을 빈 값으로 본다
+    values = column.to_numpy(dtype=object)
+    blank = pd.isna(values)
+    strings = np.array([isinstance(value, str) for value in values], dtype=bool)
+    if strings.any():
+        blank[strings] = np.char.strip(values[strings].astype(str)) == ''
+    return blank
+
+def _unparseable_dates(column: pd.Series) -> np.ndarray:
+    # 같은 값은 한 번만 해석 (format_date_column 과 같은 방식)
+    codes, uniques = pd.factorize(column, use_na_sentinel=False)
+    parsed = pd.to_datetime(pd.Series(uniques, dtype=object), errors='coerce', format='mixed')
+    return parsed.isna().to_numpy()[codes]
+
+def validate_frame(df: pd.DataFrame, kind: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """시트 DataFrame 을 열 단위로 검증해서 (유효한 행, 거부된 행)을 반환한다.
+
+    거부된 행에는 원본 열과 함께 row(엑셀/CSV 의 행 번호, 머리글 포함)와 reason 열이 붙는다.
+    """
+    schema = SCHEMAS[kind]
+    # 기본 index(0 부터)를 쓰는 DataFrame 이면 index + 2 가 원본 파일의 행 번호
+    if pd.api.types.is_integer_dtype(df.index):
+        row_numbers = df.index.to_numpy() + 2
+    else:
+        row_numbers = np.arange(len(df)) + 2
+
+    if df.shape[1] < schema['columns']:
+        rejected = df.copy()
+        rejected['row'] = row_numbers
+        rejected['reason'] = f"expected {schema['columns']} columns, found {df.shape[1]}"
+        # 빈 결과에도 날짜 변환 등을 대입하므로 원본의 view 가 아닌 복사본을 돌려준다 (SettingWithCopyWarning)
+        return df.iloc[0:0].copy(), rejected
+
+    reasons = np.full(len(df), '', dtype=object)
+
+    def reject(mask: np.ndarray, reason: str) -> None:
+        if mask.any():
+            reasons[mask] = reasons[mask] + np.where(reasons[mask] == '', '', '; ') + reason
+
+    for index, name in schema['required'].items():
+        reject(_blank(df.iloc[:, index]), f'missing {name}')
+    for index, name in schema['dates'].items():
+        column = df.iloc[:, index]
+        blank = _blank(column)
+        reject(~blank & _unparseable_dates(column.where(~blank, None)), f'invalid {name}')
+    for index, name in schema['numbers'].items():
+        column = df.iloc[:, index]
+        blank = _blank(column)
+        reject(~blank & pd.to_numeric(column.where(~blank, None), errors='coerce').isna().to_numpy(), f'invalid {name}')
+
+    invalid = reasons != ''
+    if not invalid.any():
+        return df, df.iloc[0:0]
+    rejected = df[invalid].copy()
+    rejected['row'] = row_numbers[invalid]
+    rejected['reason'] = reasons[invalid]
+    return df[~invalid].copy(), rejected
+
+class Quarantine:
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv('QUARANTINE_PATH') or DEFAULT_QUARANTINE_PATH
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS quarantined_rows (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    source TEXT,
+                    kind TEXT NOT NULL,
+                    row_number INTEGER,
+                    reason TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS quarantined_rows_source_idx ON quarantined_rows (source)')
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def add(self, source: Optional[str], kind: str, rows: Iterable[Tuple[Optional[int], str, Any]]) -> int:
+        """(행 번호 또는 None, 이유, 원본 값) 목록을 저장하고 저장한 개수를 반환한다."""
+        now = time.time()
+        values = [
+            (source, kind, None if row_number is None else int(row_number), reason,
+             json.dumps(payload, ensure_ascii=False, default=str), now)
+            for row_number, reason, payload in rows
+        ]
+        if values:
+            with self._lock, self._connect() as conn:
+                conn.executemany(
+                    'INSERT INTO quarantined_rows (source, kind, row_number, reason, payload, created_at) VALUES (?, ?, ?, ?, ?, ?)',
+                    values
+                )
+        return len(values)
+
+    def add_frame(self, source: Optional[str], kind: str, rejected: pd.DataFrame) -> int:
+        # validate_frame 이 반환한 거부된 행 (원본 열 + row, reason)
+        columns = [column for column in rejected.columns if column not in ('row', 'reason')]
+        records = rejected[columns].astype(object).where(rejected[columns].notna(), None).to_dict('records')
+        return self.add(source, kind, zip(rejected['row'], rejected['reason'], records))
+
+    def count(self, source: Optional[str] = None) -> int:
+        with self._connect() as conn:
+            if source is None:
+                return conn.execute('SELECT COUNT(*) FROM quarantined_rows').fetchone()[0]
+            return conn.execute('SELECT COUNT(*) FROM quarantined_rows WHERE source = ?', (source,)).fetchone()[0]
+
+    def iter_rows(self, source: Optional[str] = None, limit: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        query = 'SELECT source, kind, row_number, reason, payload, created_at FROM quarantined_rows'
+        params: List[Any] = []
+        if source is not None:
+            query += ' WHERE source = ?'
+            params.append(source)
+        query += ' ORDER BY id LIMIT ?'
+        params.append(-1 if limit is None else limit)
+        with self._connect() as conn:
+            for row in conn.execute(query, params):
+                item = dict(row)
+                item['payload'] = json.loads(item['payload'])
+                yield item